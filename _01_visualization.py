@@ -1,11 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+from array import array
 import csv
 from collections import defaultdict
+import bisect
+import heapq
 import math
 import os
+import tempfile
+import time
 from datetime import datetime, timedelta
 import configparser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import escape
+from _scheduler import BackgroundScheduler, LiveFilter
 try:
     from tkcalendar import Calendar
 except ImportError:
@@ -19,25 +27,30 @@ try:
     from reportlab.lib.units import inch
     from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
     from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    from reportlab.graphics.shapes import Drawing, Line, Rect, String, Group
     REPORTLAB_AVAILABLE = True
 except ImportError:
     REPORTLAB_AVAILABLE = False
     print("ReportLab not installed. PDF export will be disabled.")
     print("Install with: pip install reportlab")
 
+# Joining PDF sections rendered in parallel
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+    print("pypdf not installed. PDF reports will be built in a single pass.")
+    print("Install with: pip install pypdf")
 
-# Добавьте к существующим импортам:
+# Cross-frequency graph analytics
 try:
-    from reportlab.graphics import renderPDF
-    from reportlab.graphics.shapes import Drawing, Line, Rect, String, Group
-    from reportlab.graphics.charts.textlabels import Label
-    from svglib.svglib import svg2rlg
-    import svgwrite
-    SVG_AVAILABLE = True
+    import igraph
+    IGRAPH_AVAILABLE = True
 except ImportError:
-    SVG_AVAILABLE = False
-    print("svgwrite not installed. SVG export will be disabled.")
-    print("Install with: pip install svgwrite svglib")
+    IGRAPH_AVAILABLE = False
+    print("python-igraph not installed. Global graph ranking will be disabled.")
+    print("Install with: pip install igraph")
 
 
 def load_data_directory():
@@ -57,515 +70,554 @@ def load_data_directory():
         return r'C:\Users\dotignore\Documents\Python\examplaone_krakenSDR_web\data'
 
 
+class SvgStreamWriter:
+    """Writes SVG elements straight to a buffered file; styling comes from shared CSS classes"""
+    
+    def __init__(self, filename, width, height, style):
+        self.file = open(filename, 'w', encoding='utf-8', buffering=1024 * 1024)
+        self.file.write('<?xml version="1.0" encoding="utf-8"?>\n'
+                        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}px" height="{height:.0f}px" '
+                        f'viewBox="0 0 {width:.0f} {height:.0f}">\n'
+                        f'<defs><style>\n{style}</style></defs>\n'
+                        f'<rect class="bg" x="0" y="0" width="{width:.0f}" height="{height:.0f}"/>\n')
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        if not self.file.closed:
+            self.file.write('</svg>\n')
+            self.file.close()
+    
+    def rect(self, x, y, width, height, css_class):
+        self.file.write(f'<rect class="{css_class}" x="{x:.1f}" y="{y:.1f}" '
+                        f'width="{width:.1f}" height="{height:.1f}"/>\n')
+    
+    def line(self, x1, y1, x2, y2, css_class):
+        self.file.write(f'<line class="{css_class}" x1="{x1:.1f}" y1="{y1:.1f}" '
+                        f'x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+    
+    def text(self, x, y, text, css_class):
+        self.file.write(f'<text class="{css_class}" x="{x:.1f}" y="{y:.1f}">{escape(str(text))}</text>\n')
+    
+    def write_cell(self, cell):
+        """One network cell prepared by VectorExporter.build_svg_cell"""
+        x = cell['x']
+        y = cell['y']
+        center_x = x + cell['width'] / 2
+        
+        self.rect(x, y, cell['width'], cell['height'], "cell")
+        self.text(center_x, y + 15, cell['filename'], "title")
+        self.text(center_x, y + 30, cell['frequency'], "freq")
+        self.text(cell['left_x'] + cell['node_width'] / 2, y + 45, "FROM", "header")
+        self.text(cell['right_x'] + cell['node_width'] / 2, y + 45, "TO", "header")
+        
+        if cell['empty']:
+            self.text(center_x, y + 80, cell['empty'], "empty")
+            return
+        
+        for x1, y1, x2, y2, css_class in cell['lines']:
+            self.line(x1, y1, x2, y2, css_class)
+        
+        # Nodes: rectangle, id and [count] outside the column
+        node_width = cell['node_width']
+        node_height = cell['node_height']
+        for column, node_x, count_x, count_class in (('from', cell['left_x'], cell['left_x'] - 5, "count-from"),
+                                                      ('to', cell['right_x'], cell['right_x'] + node_width + 5, "count-to")):
+            for node, node_y, count, selected in cell[column]:
+                self.rect(node_x, node_y, node_width, node_height, "node sel" if selected else "node")
+                self.text(node_x + node_width / 2, node_y + node_height / 2 + 3, str(node).rjust(8), "id")
+                self.text(count_x, node_y + node_height / 2 + 3, f"[{count}]", count_class)
+        
+        if cell['note']:
+            self.text(cell['left_x'], cell['note_y'], cell['note'], "note")
+
+
+def write_svg_file(filename, width, height, style, cells):
+    """Stream cells into one SVG file (module level so worker processes can run it)"""
+    with SvgStreamWriter(filename, width, height, style) as svg:
+        for cell in cells:
+            svg.write_cell(cell)
+    return filename
+
+
 class VectorExporter:
     """Class for exporting network visualization to vector formats"""
     
     def __init__(self, visualizer):
         self.visualizer = visualizer
+    
+    def get_svg_style(self):
+        """Shared CSS classes - elements carry only a class name"""
+        v = self.visualizer
+        style = (
+            f".bg{{fill:#ffffff}}\n"
+            f".cell{{fill:none;stroke:#cccccc;stroke-width:1}}\n"
+            f".title{{font:bold 10px Arial;text-anchor:middle}}\n"
+            f".freq{{font:bold 14px Arial;text-anchor:middle}}\n"
+            f".header{{font:bold 12px Arial;text-anchor:middle}}\n"
+            f".empty{{font:10px Arial;fill:#999999;text-anchor:middle}}\n"
+            f".note{{font:8px Arial;fill:#999999}}\n"
+            f".line{{stroke:{v.line_color}}}\n"
+            f".line.sel{{stroke:{v.highlight_line_color}}}\n"
+            f".node{{fill:{v.node_bg};stroke:{v.node_border};stroke-width:1}}\n"
+            f".node.sel{{fill:{v.selected_bg}}}\n"
+            f".id{{font:9px monospace;text-anchor:middle}}\n"
+            f".count-from{{font:9px monospace;fill:{v.count_color};text-anchor:end}}\n"
+            f".count-to{{font:9px monospace;fill:{v.count_color};text-anchor:start}}\n"
+        )
+        # Line widths are graded, so one class per grade covers every line
+        for width in sorted(set(v.line_width_grades.values()) | {2.0}):
+            style += f".w{int(width * 10)}{{stroke-width:{width}}}\n"
+        return style
+    
+    def build_svg_cell(self, cell):
+        """Plain-data description of one cell, laid out like the on-screen view at zoom 1"""
+        v = self.visualizer
+        data = cell['data']
+        file_idx = cell['file_idx']
+        svg_cell = {
+            'x': cell['x'],
+            'y': cell['y'],
+            'width': cell['width'],
+            'height': cell['height'],
+            'filename': data['filename'],
+            'frequency': data['frequency'],
+            'left_x': cell['x'] + 50,
+            'right_x': cell['x'] + 50 + v.column_distance,
+            'node_width': v.node_width,
+            'node_height': v.node_height,
+            'empty': None,
+            'note': None
+        }
+        
+        if not data['connections']:
+            svg_cell['empty'] = "No data in date range"
+            return svg_cell
         
+        layout = v.layout_network_cell(data, cell['x'], cell['y'], 1.0)
+        page_network = layout['page']
+        if not page_network['from_nodes'] and not page_network['to_nodes']:
+            svg_cell['empty'] = "No nodes at these ranks"
+            return svg_cell
+        
+        selected_from = v.selected_items.get(file_idx, {}).get('from', set())
+        selected_to = v.selected_items.get(file_idx, {}).get('to', set())
+        from_positions = layout['from_positions']
+        to_positions = layout['to_positions']
+        
+        lines = []
+        for (from_node, to_node), count in page_network['lines']:
+            width = v.get_line_width_by_count(count)
+            css_class = "line"
+            if from_node in selected_from and to_node in selected_to:
+                width = max(width, 2.0)
+                css_class = "line sel"
+            lines.append((layout['left_x'] + v.node_width, from_positions[from_node] + v.node_height / 2,
+                          layout['right_x'], to_positions[to_node] + v.node_height / 2,
+                          f"{css_class} w{int(width * 10)}"))
+        svg_cell['lines'] = lines
+        
+        svg_cell['from'] = [(node, y, data['from_counts'][node], node in selected_from)
+                            for node, y in from_positions.items()]
+        svg_cell['to'] = [(node, y, data['to_counts'][node], node in selected_to)
+                          for node, y in to_positions.items()]
+        
+        if page_network['hidden_nodes'] or page_network['hidden_lines']:
+            svg_cell['note'] = f"{page_network['hidden_nodes']} nodes and {page_network['hidden_lines']} lines hidden"
+            svg_cell['note_y'] = layout['note_y'] + 3
+        return svg_cell
+    
     def export_to_svg(self, filename):
         """Export network visualization to SVG file"""
         try:
-            # Получаем данные для отрисовки
-            data_to_draw = self.visualizer.filtered_file_data if self.visualizer.filtered_file_data else self.visualizer.file_data
-            data_to_draw = [data for idx, data in enumerate(data_to_draw) if idx in self.visualizer.selected_files]
-            
-            # Фильтруем файлы с "No data in date range" - исключаем файлы без соединений
-            data_to_draw = [data for data in data_to_draw if data.get('connections') and len(data['connections']) > 0]
-            
+            data_to_draw = self.visualizer.get_datasets_to_draw()
             if not data_to_draw:
                 return False
             
-            # Вычисляем размеры
-            rows, cols = self.visualizer.calculate_grid_dimensions(len(data_to_draw))
-            total_width = cols * (self.visualizer.cell_width + self.visualizer.cell_padding) + self.visualizer.cell_padding
-            
-            # Вычисляем высоту
-            total_height = 0
-            for row_idx in range(rows):
-                max_height = 0
-                for col_idx in range(cols):
-                    file_idx = row_idx * cols + col_idx
-                    if file_idx < len(data_to_draw):
-                        data = data_to_draw[file_idx]
-                        num_nodes = max(len(data['from_counts']), len(data['to_counts']))
-                        cell_height = (self.visualizer.cell_top_margin + 
-                                     num_nodes * (self.visualizer.node_height + self.visualizer.node_spacing) + 
-                                     self.visualizer.cell_padding)
-                        max_height = max(max_height, cell_height)
-                total_height += max_height + self.visualizer.cell_padding
-            
-            # Создаем SVG документ
-            dwg = svgwrite.Drawing(filename, size=(f'{total_width}px', f'{total_height}px'))
-            dwg.viewbox(0, 0, total_width, total_height)
-            
-            # Добавляем белый фон
-            dwg.add(dwg.rect((0, 0), (total_width, total_height), fill='white'))
-            
-            # Рисуем каждую сеть
-            current_y = self.visualizer.cell_padding
-            for row_idx in range(rows):
-                current_x = self.visualizer.cell_padding
-                row_height = 0
-                
-                for col_idx in range(cols):
-                    file_idx = row_idx * cols + col_idx
-                    if file_idx < len(data_to_draw):
-                        data = data_to_draw[file_idx]
-                        cell_height = self._draw_network_svg(dwg, data, current_x, current_y, file_idx)
-                        row_height = max(row_height, cell_height)
-                    
-                    current_x += self.visualizer.cell_width + self.visualizer.cell_padding
-                
-                current_y += row_height + self.visualizer.cell_padding
-            
-            # Сохраняем файл
-            dwg.save()
+            # Same grid as the canvas, at zoom 1
+            cells, grid = self.visualizer.compute_network_grid(data_to_draw, 1.0)
+            total_width, total_height = grid['size']
+            write_svg_file(filename, total_width, total_height, self.get_svg_style(),
+                           (self.build_svg_cell(cell) for cell in cells))
             return True
             
         except Exception as e:
             print(f"Error exporting to SVG: {e}")
             return False
     
-    def _draw_network_svg(self, dwg, data, x_offset, y_offset, file_idx):
-        """Draw single network in SVG"""
-        # Параметры
-        node_width = self.visualizer.node_width
-        node_height = self.visualizer.node_height
-        node_spacing = self.visualizer.node_spacing
-        column_distance = self.visualizer.column_distance
-        
-        # Позиции колонок
-        left_x = x_offset + 50
-        right_x = left_x + column_distance
-        
-        # Рамка ячейки
-        cell_height = self.visualizer.cell_top_margin + max(len(data['from_counts']), len(data['to_counts'])) * (node_height + node_spacing) + self.visualizer.cell_padding
-        dwg.add(dwg.rect((x_offset, y_offset), (self.visualizer.cell_width, cell_height), 
-                         fill='none', stroke='#cccccc', stroke_width=1))
-        
-        # Заголовок
-        dwg.add(dwg.text(data['filename'], 
-                         insert=(x_offset + self.visualizer.cell_width // 2, y_offset + 15),
-                         text_anchor='middle', font_size='10px', font_weight='bold'))
-        
-        # Частота
-        dwg.add(dwg.text(data['frequency'],
-                         insert=(x_offset + self.visualizer.cell_width // 2, y_offset + 30),
-                         text_anchor='middle', font_size='14px', font_weight='bold'))
-        
-        # Заголовки колонок
-        dwg.add(dwg.text('FROM', 
-                         insert=(left_x + node_width // 2, y_offset + 45),
-                         text_anchor='middle', font_size='12px', font_weight='bold'))
-        dwg.add(dwg.text('TO',
-                         insert=(right_x + node_width // 2, y_offset + 45),
-                         text_anchor='middle', font_size='12px', font_weight='bold'))
-        
-        if not data['connections']:
-            dwg.add(dwg.text('No data in date range',
-                            insert=(x_offset + self.visualizer.cell_width // 2, y_offset + 80),
-                            text_anchor='middle', font_size='10px', fill='#999999'))
-            return cell_height
-        
-        # Сортированные узлы
-        from_nodes = sorted(data['from_counts'].keys(), 
-                          key=lambda x: data['from_counts'][x], reverse=True)
-        to_nodes = sorted(data['to_counts'].keys(),
-                        key=lambda x: data['to_counts'][x], reverse=True)
-        
-        # Позиции узлов
-        from_positions = {}
-        to_positions = {}
-        
-        y = y_offset + 60
-        for node in from_nodes:
-            from_positions[node] = y
-            y += node_height + node_spacing
-        
-        y = y_offset + 60
-        for node in to_nodes:
-            to_positions[node] = y
-            y += node_height + node_spacing
-        
-        # Максимум для нормализации
-        max_conn = max(data['connections'].values()) if data['connections'] else 1
-        
-        # Получаем выделенные узлы
-        selected_from = self.visualizer.selected_items.get(file_idx, {}).get('from', set())
-        selected_to = self.visualizer.selected_items.get(file_idx, {}).get('to', set())
-        
-        # Рисуем линии соединений
-        for (from_node, to_node), count in data['connections'].items():
-            if from_node in from_positions and to_node in to_positions:
-                normalized = count / max_conn
-                width = self.visualizer.min_line_width + normalized * (self.visualizer.max_line_width - self.visualizer.min_line_width)
-                
-                x1 = left_x + node_width
-                y1 = from_positions[from_node] + node_height // 2
-                x2 = right_x
-                y2 = to_positions[to_node] + node_height // 2
-                
-                line_color = self.visualizer.highlight_line_color if (from_node in selected_from and to_node in selected_to) else self.visualizer.line_color
-                
-                dwg.add(dwg.line((x1, y1), (x2, y2), stroke=line_color, stroke_width=width))
-        
-        # Рисуем узлы FROM
-        for node, y in from_positions.items():
-            bg_color = self.visualizer.selected_bg if node in selected_from else self.visualizer.node_bg
-            
-            # Прямоугольник узла
-            dwg.add(dwg.rect((left_x, y), (node_width, node_height),
-                            fill=bg_color, stroke=self.visualizer.node_border, stroke_width=1))
-            
-            # Текст узла
-            dwg.add(dwg.text(str(node).rjust(8),
-                            insert=(left_x + node_width // 2, y + node_height // 2 + 3),
-                            text_anchor='middle', font_family='monospace', font_size='9px'))
-            
-            # Счетчик
-            dwg.add(dwg.text(f'[{data["from_counts"][node]}]',
-                            insert=(left_x - 5, y + node_height // 2 + 3),
-                            text_anchor='end', font_family='monospace', font_size='9px',
-                            fill=self.visualizer.count_color))
-        
-        # Рисуем узлы TO
-        for node, y in to_positions.items():
-            bg_color = self.visualizer.selected_bg if node in selected_to else self.visualizer.node_bg
-            
-            # Прямоугольник узла
-            dwg.add(dwg.rect((right_x, y), (node_width, node_height),
-                            fill=bg_color, stroke=self.visualizer.node_border, stroke_width=1))
-            
-            # Текст узла
-            dwg.add(dwg.text(str(node).rjust(8),
-                            insert=(right_x + node_width // 2, y + node_height // 2 + 3),
-                            text_anchor='middle', font_family='monospace', font_size='9px'))
-            
-            # Счетчик
-            dwg.add(dwg.text(f'[{data["to_counts"][node]}]',
-                            insert=(right_x + node_width + 5, y + node_height // 2 + 3),
-                            text_anchor='start', font_family='monospace', font_size='9px',
-                            fill=self.visualizer.count_color))
-        
-        return cell_height
+    def prepare_svg_files(self, directory):
+        """Arguments of write_svg_file for one SVG per shown file (main thread)"""
+        style = self.get_svg_style()
+        jobs = []
+        for data in self.visualizer.get_datasets_to_draw():
+            cells, grid = self.visualizer.compute_network_grid([data], 1.0)
+            total_width, total_height = grid['size']
+            filename = os.path.join(directory, os.path.splitext(data['filename'])[0] + ".svg")
+            jobs.append((filename, total_width, total_height, style, [self.build_svg_cell(cells[0])]))
+        return jobs
+    
+    def write_svg_files(self, jobs, token=None, progress=None):
+        """Write prepared SVG files in parallel worker processes; returns the written paths"""
+        written = []
+        with ProcessPoolExecutor() as pool:
+            futures = [pool.submit(write_svg_file, *job) for job in jobs]
+            try:
+                for future in as_completed(futures):
+                    written.append(future.result())
+                    if progress:
+                        progress(len(written), len(jobs))
+                    if token:
+                        token.check()
+            finally:
+                # Cancelled or failed - don't start the remaining files
+                for future in futures:
+                    future.cancel()
+        return written
 
 
+# PDF report layout
+PDF_NODES_TO_SHOW = 40  # Nodes per column in the network drawing
+PDF_LINES_TO_SHOW = 150  # Strongest lines between shown nodes
+PDF_TABLE_CHUNK_ROWS = 60  # Rows per connection table chunk (header repeats on every chunk)
 
 
+def get_pdf_styles():
+    """Sample stylesheet with the report styles"""
+    styles = getSampleStyleSheet()
+    
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Title'],
+        fontSize=16,
+        spaceAfter=30,
+        textColor=colors.HexColor('#000080')
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='Subtitle',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.HexColor('#333333'),
+        spaceAfter=20,
+        alignment=TA_CENTER
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#000080'),
+        spaceBefore=20,
+        spaceAfter=10
+    ))
+    return styles
 
 
+def create_pdf_document(filename):
+    """A4 portrait document used for the report and its sections"""
+    return SimpleDocTemplate(
+        filename,
+        pagesize=A4,
+        rightMargin=50,
+        leftMargin=50,
+        topMargin=50,
+        bottomMargin=30,
+    )
 
 
-class PDFExporter:
-    """Class for exporting network data to PDF with vector graphics"""
+def build_network_drawing(network, page_width, page_height):
+    """Create ReportLab drawing for single network from PDFExporter.get_network_spec()"""
+    # Используем всю доступную ширину страницы
+    margin = 30
+    available_width = page_width - (2 * margin)
+    available_height = min(600, page_height - 150)  # Увеличиваем высоту для 40 узлов
     
-    def __init__(self, visualizer):
-        self.visualizer = visualizer
-        self.styles = getSampleStyleSheet()
-        self.setup_custom_styles()
-    
-    def setup_custom_styles(self):
-        """Setup custom PDF styles"""
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Title'],
-            fontSize=16,
-            spaceAfter=30,
-            textColor=colors.HexColor('#000080')
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='Subtitle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#333333'),
-            spaceAfter=20,
-            alignment=TA_CENTER
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#000080'),
-            spaceBefore=20,
-            spaceAfter=10
-        ))
-    
-    def create_network_drawing(self, data, file_idx, page_width, page_height):
-        """Create ReportLab drawing for single network - exactly 40 nodes"""
-        from reportlab.graphics.shapes import Drawing, Line, Rect, String, Group
-        
-        # Используем всю доступную ширину страницы
-        margin = 30
-        available_width = page_width - (2 * margin)
-        available_height = min(600, page_height - 150)  # Увеличиваем высоту для 40 узлов
-        
-        # Создаем Drawing
-        drawing = Drawing(available_width, available_height)
-        
-        # Параметры визуализации
-        node_width = 80
-        node_height = 14  # Уменьшаем высоту узла чтобы поместилось 40
-        node_spacing = 1   # Минимальный отступ
-        column_distance = available_width - node_width - 100
-        
-        # Позиции колонок
-        left_x = 50
-        right_x = available_width - node_width - 50
-        
-        # Заголовки колонок
-        drawing.add(String(left_x + node_width // 2, available_height - 20, 
-                        'FROM', textAnchor='middle', fontSize=12, fontName='Helvetica-Bold'))
-        drawing.add(String(right_x + node_width // 2, available_height - 20, 
-                        'TO', textAnchor='middle', fontSize=12, fontName='Helvetica-Bold'))
-        
-        if not data['connections']:
-            drawing.add(String(available_width // 2, available_height // 2, 
-                            'No data in date range', 
-                            textAnchor='middle', fontSize=10, fillColor=colors.grey))
-            return drawing
-        
-        # РОВНО 40 узлов FROM и 40 узлов TO
-        NODES_TO_SHOW = 40
-        
-        # Получаем топ-40 FROM узлов
-        from_nodes = sorted(data['from_counts'].keys(), 
-                        key=lambda x: data['from_counts'][x], reverse=True)[:NODES_TO_SHOW]
-        
-        # Получаем топ-40 TO узлов
-        to_nodes = sorted(data['to_counts'].keys(),
-                        key=lambda x: data['to_counts'][x], reverse=True)[:NODES_TO_SHOW]
-        
-        # Если узлов меньше 40, дополняем пустыми местами
-        while len(from_nodes) < NODES_TO_SHOW and len(from_nodes) < len(data['from_counts']):
-            from_nodes = list(data['from_counts'].keys())[:NODES_TO_SHOW]
-            break
-        
-        while len(to_nodes) < NODES_TO_SHOW and len(to_nodes) < len(data['to_counts']):
-            to_nodes = list(data['to_counts'].keys())[:NODES_TO_SHOW]
-            break
-        
-        # Позиции узлов - размещаем ровно 40
-        from_positions = {}
-        to_positions = {}
-        
-        start_y = available_height - 40
-        total_height_needed = NODES_TO_SHOW * (node_height + node_spacing)
-        
-        # Вычисляем начальную позицию чтобы узлы были по центру
-        if total_height_needed < (available_height - 60):
-            start_y = available_height - 40
+    drawing = Drawing(available_width, available_height)
+    
+    # Параметры визуализации
+    node_width = 80
+    node_height = 14  # Уменьшаем высоту узла чтобы поместилось 40
+    node_spacing = 1   # Минимальный отступ
+    
+    # Позиции колонок
+    left_x = 50
+    right_x = available_width - node_width - 50
+    
+    # Заголовки колонок
+    drawing.add(String(left_x + node_width // 2, available_height - 20, 
+                    'FROM', textAnchor='middle', fontSize=12, fontName='Helvetica-Bold'))
+    drawing.add(String(right_x + node_width // 2, available_height - 20, 
+                    'TO', textAnchor='middle', fontSize=12, fontName='Helvetica-Bold'))
+    
+    if not network['from_nodes']:
+        drawing.add(String(available_width // 2, available_height // 2, 
+                        'No data in date range', 
+                        textAnchor='middle', fontSize=10, fillColor=colors.grey))
+        return drawing
+    
+    start_y = available_height - 40
+    total_height_needed = PDF_NODES_TO_SHOW * (node_height + node_spacing)
+    if total_height_needed >= (available_height - 60):
+        # Если не помещается, уменьшаем высоту узлов
+        node_height = ((available_height - 60) / PDF_NODES_TO_SHOW) - node_spacing
+        node_height = max(node_height, 10)  # Минимум 10 пикселей высота
+    
+    from_positions = {}
+    for i, (node, count) in enumerate(network['from_nodes']):
+        from_positions[node] = start_y - i * (node_height + node_spacing)
+    
+    to_positions = {}
+    for i, (node, count) in enumerate(network['to_nodes']):
+        to_positions[node] = start_y - i * (node_height + node_spacing)
+    
+    max_conn = network['max_conn']
+    selected_from = network['selected_from']
+    selected_to = network['selected_to']
+    
+    # Рисуем линии соединений
+    for from_node, to_node, count in network['lines']:
+        normalized = count / max_conn
+        line_width = 0.2 + normalized * 2.5
+        
+        x1 = left_x + node_width
+        y1 = from_positions[from_node] - node_height // 2
+        x2 = right_x
+        y2 = to_positions[to_node] - node_height // 2
+        
+        if from_node in selected_from and to_node in selected_to:
+            line_color = colors.red
+            line_width = max(line_width, 1.5)
         else:
-            # Если не помещается, уменьшаем высоту узлов
-            node_height = ((available_height - 60) / NODES_TO_SHOW) - node_spacing
-            node_height = max(node_height, 10)  # Минимум 10 пикселей высота
-        
-        # Размещаем FROM узлы
-        y = start_y
-        for i, node in enumerate(from_nodes):
-            if i >= NODES_TO_SHOW:  # Ограничиваем ровно 40
-                break
-            from_positions[node] = y
-            y -= (node_height + node_spacing)
-        
-        # Размещаем TO узлы
-        y = start_y
-        for i, node in enumerate(to_nodes):
-            if i >= NODES_TO_SHOW:  # Ограничиваем ровно 40
-                break
-            to_positions[node] = y
-            y -= (node_height + node_spacing)
-        
-        # Максимум для нормализации
-        max_conn = max(data['connections'].values()) if data['connections'] else 1
-        
-        # Получаем выделенные узлы
-        selected_from = self.visualizer.selected_items.get(file_idx, {}).get('from', set())
-        selected_to = self.visualizer.selected_items.get(file_idx, {}).get('to', set())
-        
-        # Показываем топ соединения между отображаемыми узлами
-        connections_to_draw = []
-        for (from_node, to_node), count in data['connections'].items():
-            if from_node in from_positions and to_node in to_positions:
-                connections_to_draw.append(((from_node, to_node), count))
-        
-        # Сортируем и берем топ-150
-        connections_to_draw.sort(key=lambda x: x[1], reverse=True)
-        connections_to_draw = connections_to_draw[:150]
-        
-        # Рисуем линии соединений
-        for (from_node, to_node), count in connections_to_draw:
-            normalized = count / max_conn
-            line_width = 0.2 + normalized * 2.5
-            
-            x1 = left_x + node_width
-            y1 = from_positions[from_node] - node_height // 2
-            x2 = right_x
-            y2 = to_positions[to_node] - node_height // 2
-            
-            if from_node in selected_from and to_node in selected_to:
-                line_color = colors.red
-                line_width = max(line_width, 1.5)
-            else:
-                line_color = colors.Color(0.7, 0.7, 0.7, alpha=0.4)
-            
-            drawing.add(Line(x1, y1, x2, y2, strokeColor=line_color, strokeWidth=line_width))
+            line_color = colors.Color(0.7, 0.7, 0.7, alpha=0.4)
         
-        # Рисуем FROM узлы
-        for i, (node, y) in enumerate(from_positions.items()):
-            if i >= NODES_TO_SHOW:
-                break
-                
-            if node in selected_from:
+        drawing.add(Line(x1, y1, x2, y2, strokeColor=line_color, strokeWidth=line_width))
+    
+    font_size = min(8, node_height - 4)  # Адаптивный размер шрифта
+    
+    # Узлы FROM (счетчик слева) и TO (счетчик справа)
+    for nodes, positions, selected, x, count_x, anchor in (
+            (network['from_nodes'], from_positions, selected_from, left_x, left_x - 5, 'end'),
+            (network['to_nodes'], to_positions, selected_to, right_x, right_x + node_width + 5, 'start')):
+        for node, count in nodes:
+            y = positions[node]
+            if node in selected:
                 fill_color = colors.yellow
                 stroke_width = 1
             else:
                 fill_color = colors.Color(0.95, 0.95, 0.95)
                 stroke_width = 0.5
             
-            # Прямоугольник узла
-            drawing.add(Rect(left_x, y - node_height, node_width, node_height,
+            drawing.add(Rect(x, y - node_height, node_width, node_height,
                         fillColor=fill_color, strokeColor=colors.black, strokeWidth=stroke_width))
             
-            # Текст узла
             node_str = str(node)[:10].rjust(8)
-            font_size = min(8, node_height - 4)  # Адаптивный размер шрифта
-            drawing.add(String(left_x + node_width // 2, y - node_height // 2 - 2,
+            drawing.add(String(x + node_width // 2, y - node_height // 2 - 2,
                             node_str, textAnchor='middle', fontSize=font_size, fontName='Courier'))
             
-            # Счетчик слева
-            drawing.add(String(left_x - 5, y - node_height // 2 - 2,
-                            f'[{data["from_counts"][node]}]',
-                            textAnchor='end', fontSize=font_size, fontName='Helvetica',
+            drawing.add(String(count_x, y - node_height // 2 - 2,
+                            f'[{count}]',
+                            textAnchor=anchor, fontSize=font_size, fontName='Helvetica',
                             fillColor=colors.grey))
+    
+    # Легенда - указываем ТОЧНОЕ количество
+    drawing.add(String(available_width // 2, 10,
+                    f'Showing exactly {len(network["from_nodes"])} FROM nodes, {len(network["to_nodes"])} TO nodes, {len(network["lines"])} connections',
+                    textAnchor='middle', fontSize=7, fillColor=colors.grey))
+    
+    return drawing
+
+
+def build_connection_tables(section, styles):
+    """All connections of one file as fixed-size table chunks with repeated headers"""
+    elements = []
+    
+    elements.append(Paragraph(f"All Connections: {section['filename']}", styles['SectionHeader']))
+    elements.append(Paragraph(f"Frequency: {section['frequency']}", styles['Normal']))
+    elements.append(Spacer(1, 0.1*inch))
+    
+    sorted_connections = sorted(section['connections'].items(), key=lambda x: x[1], reverse=True)
+    
+    if not sorted_connections:
+        elements.append(Paragraph("<i>No connections in the selected date range</i>", styles['Normal']))
+        return elements
+    
+    elements.append(Paragraph(f"Total connections: {len(sorted_connections)}", styles['Normal']))
+    elements.append(Spacer(1, 0.1*inch))
+    
+    table_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Courier'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # № - по центру
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),    # FROM - слева
+        ('ALIGN', (2, 0), (2, -1), 'LEFT'),    # TO - слева
+        ('ALIGN', (3, 0), (3, -1), 'CENTER'),  # Count - по центру
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 1)]),
+        ('LEFTPADDING', (0, 0), (-1, -1), 3),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ])
+    header = ["#", "FROM", "TO", "Count"]
+    
+    # Небольшие таблицы верстаются быстро; заголовок повторяется при переносе на новую страницу
+    for start in range(0, len(sorted_connections), PDF_TABLE_CHUNK_ROWS):
+        rows = [[str(start + i + 1), str(from_id), str(to_id), str(count)]
+                for i, ((from_id, to_id), count)
+                in enumerate(sorted_connections[start:start + PDF_TABLE_CHUNK_ROWS])]
+        
+        conn_table = Table([header] + rows,
+                           colWidths=[0.6*inch, 3.2*inch, 3.2*inch, 0.8*inch],
+                           repeatRows=1)
+        conn_table.setStyle(table_style)
+        elements.append(conn_table)
+    
+    return elements
+
+
+def build_pdf_section(section, styles):
+    """Flowables of one file: network drawing followed by its connection table"""
+    page_width, page_height = A4
+    
+    elements = [
+        Paragraph(f"Network Visualization: {section['filename']}", styles['SectionHeader']),
+        Paragraph(f"Frequency: {section['frequency']}", styles['Normal']),
+        Spacer(1, 0.1*inch),
+        build_network_drawing(section['network'], page_width, page_height),
+        Spacer(1, 0.1*inch),
+        Paragraph(f"<i>Showing top {PDF_NODES_TO_SHOW} nodes and top {PDF_LINES_TO_SHOW} connections</i>",
+                  styles['Normal']),
+        PageBreak(),
+    ]
+    elements.extend(build_connection_tables(section, styles))
+    return elements
+
+
+def render_pdf_section(filename, section):
+    """Build one section PDF (runs in a worker process)"""
+    create_pdf_document(filename).build(build_pdf_section(section, get_pdf_styles()))
+    return filename
+
+
+def merge_pdf_files(filename, parts):
+    """Concatenate section PDFs into one file"""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(part)
+    with open(filename, "wb") as f:
+        writer.write(f)
+
+
+class PDFExporter:
+    """Class for exporting network data to PDF with vector graphics"""
+    
+    def __init__(self, visualizer):
+        self.visualizer = visualizer
+        self.styles = get_pdf_styles()
+    
+    def get_network_spec(self, data, file_idx):
+        """Top nodes and lines of one network for build_network_drawing (main thread)"""
+        from_nodes = heapq.nlargest(PDF_NODES_TO_SHOW, data['from_counts'].items(), key=lambda item: item[1])
+        to_nodes = heapq.nlargest(PDF_NODES_TO_SHOW, data['to_counts'].items(), key=lambda item: item[1])
+        
+        # Линии только между показанными узлами, через список смежности
+        shown_to = {node for node, count in to_nodes}
+        lines = [(from_node, to_node, count)
+                 for from_node, from_count in from_nodes
+                 for to_node, count in data['from_adjacency'].get(from_node, ())
+                 if to_node in shown_to]
+        lines = heapq.nlargest(PDF_LINES_TO_SHOW, lines, key=lambda line: line[2])
+        
+        selection = self.visualizer.selected_items.get(file_idx, {})
+        return {
+            'from_nodes': from_nodes,
+            'to_nodes': to_nodes,
+            'lines': lines,
+            'max_conn': max(data['connections'].values()) if data['connections'] else 1,
+            'selected_from': set(selection.get('from', ())),
+            'selected_to': set(selection.get('to', ())),
+        }
+    
+    def get_title_elements(self):
+        """Title page flowables: header, filters and statistics (main thread)"""
+        elements = []
         
-        # Рисуем TO узлы
-        for i, (node, y) in enumerate(to_positions.items()):
-            if i >= NODES_TO_SHOW:
-                break
-                
-            if node in selected_to:
-                fill_color = colors.yellow
-                stroke_width = 1
-            else:
-                fill_color = colors.Color(0.95, 0.95, 0.95)
-                stroke_width = 0.5
-            
-            # Прямоугольник узла
-            drawing.add(Rect(right_x, y - node_height, node_width, node_height,
-                        fillColor=fill_color, strokeColor=colors.black, strokeWidth=stroke_width))
-            
-            # Текст узла
-            node_str = str(node)[:10].rjust(8)
-            font_size = min(8, node_height - 4)
-            drawing.add(String(right_x + node_width // 2, y - node_height // 2 - 2,
-                            node_str, textAnchor='middle', fontSize=font_size, fontName='Courier'))
-            
-            # Счетчик справа
-            drawing.add(String(right_x + node_width + 5, y - node_height // 2 - 2,
-                            f'[{data["to_counts"][node]}]',
-                            textAnchor='start', fontSize=font_size, fontName='Helvetica',
-                            fillColor=colors.grey))
+        elements.append(Paragraph("DMR Network Connections Report", self.styles['CustomTitle']))
+        
+        date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        elements.append(Paragraph(f"Generated: {date_str}", self.styles['Subtitle']))
         
-        # Легенда - указываем ТОЧНОЕ количество
-        actual_from_count = min(len(from_nodes), NODES_TO_SHOW)
-        actual_to_count = min(len(to_nodes), NODES_TO_SHOW)
+        elements.append(Spacer(1, 0.2*inch))
         
-        legend_y = 10
-        drawing.add(String(available_width // 2, legend_y,
-                        f'Showing exactly {actual_from_count} FROM nodes, {actual_to_count} TO nodes, {len(connections_to_draw)} connections',
-                        textAnchor='middle', fontSize=7, fillColor=colors.grey))
+        # Информация о фильтрах
+        elements.extend(self.get_filter_info())
         
-        return drawing
+        # Статистика
+        elements.extend(self.get_statistics())
+        
+        return elements
     
-
+    def prepare_pdf_sections(self):
+        """Picklable description of each shown file's section (main thread)"""
+        data_source = self.visualizer.filtered_file_data if self.visualizer.filtered_file_data else self.visualizer.file_data
+        data_to_draw = [data for idx, data in enumerate(data_source) if idx in self.visualizer.selected_files]
+        
+        return [{
+            'filename': data['filename'],
+            'frequency': data['frequency'],
+            'network': self.get_network_spec(data, data['dataset_id']),
+            'connections': data['connections'],
+        } for data in data_to_draw]
     
-    def export_to_pdf(self, filename):
-        """Export current view to PDF with vector graphics"""
-        try:
-            # Используем портретную ориентацию
-            doc = SimpleDocTemplate(
-                filename,
-                pagesize=A4,
-                rightMargin=50,
-                leftMargin=50,
-                topMargin=50,
-                bottomMargin=30,
-            )
-            
-            # Получаем размер страницы
-            page_width, page_height = A4
-            
-            elements = []
-            
-            # Титульная страница
-            title = Paragraph("DMR Network Connections Report", self.styles['CustomTitle'])
-            elements.append(title)
-            
-            date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            subtitle = Paragraph(f"Generated: {date_str}", self.styles['Subtitle'])
-            elements.append(subtitle)
-            
-            elements.append(Spacer(1, 0.2*inch))
-            
-            # Информация о фильтрах
-            elements.extend(self.get_filter_info())
-            
-            # Статистика
-            elements.extend(self.get_statistics())
-            
-            # Выбираем данные для отрисовки
-            data_source = self.visualizer.filtered_file_data if self.visualizer.filtered_file_data else self.visualizer.file_data
-            data_to_draw = [data for idx, data in enumerate(data_source) if idx in self.visualizer.selected_files]
-            
-            # Визуализация для каждого файла
-            for idx, data in enumerate(data_to_draw):
+    def export_to_pdf(self, filename, title_elements, sections, token=None, progress=None):
+        """Render the report; file sections are built in worker processes and joined when pypdf is installed"""
+        if not PYPDF_AVAILABLE:
+            # Один документ в текущем потоке
+            elements = list(title_elements)
+            for section in sections:
                 elements.append(PageBreak())
-                
-                # Заголовок файла
-                elements.append(Paragraph(f"Network Visualization: {data['filename']}", 
-                                        self.styles['SectionHeader']))
-                elements.append(Paragraph(f"Frequency: {data['frequency']}", 
-                                        self.styles['Normal']))
-                elements.append(Spacer(1, 0.1*inch))
-                
-                # Находим индекс файла
-                file_idx = None
-                for orig_idx in self.visualizer.selected_files:
-                    if self.visualizer.file_data[orig_idx] == data or \
-                    (self.visualizer.filtered_file_data and 
-                        orig_idx < len(self.visualizer.filtered_file_data) and 
-                        self.visualizer.filtered_file_data[orig_idx] == data):
-                        file_idx = orig_idx
-                        break
-                
-                if file_idx is not None:
-                    drawing = self.create_network_drawing(data, file_idx, page_width, page_height)
-                    elements.append(drawing)
-                
-                elements.append(Spacer(1, 0.1*inch))
-                
-                # ИЗМЕНЕНО: отображаем 40 узлов и 150 соединений
-                elements.append(Paragraph(f"<i>Showing top 40 nodes and top 150 connections</i>", 
-                                        self.styles['Normal']))
-            
-            # Детальные таблицы соединений
-            elements.append(PageBreak())
-            elements.append(Paragraph("Connection Details", self.styles['SectionHeader']))
-            elements.extend(self.get_connection_tables())
-            
-            # Создаем PDF
-            doc.build(elements)
+                elements.extend(build_pdf_section(section, self.styles))
+                if token:
+                    token.check()
+            create_pdf_document(filename).build(elements)
+            if progress:
+                progress(len(sections), len(sections))
             print(f"PDF saved successfully to: {filename}")
             return True
+        
+        # Временные части рядом с итоговым файлом
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(filename))) as temp_dir:
+            title_path = os.path.join(temp_dir, "title.pdf")
+            part_paths = [os.path.join(temp_dir, f"section_{idx:04d}.pdf") for idx in range(len(sections))]
             
-        except Exception as e:
-            print(f"Error exporting to PDF: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+            with ProcessPoolExecutor() as pool:
+                futures = [pool.submit(render_pdf_section, path, section)
+                           for path, section in zip(part_paths, sections)]
+                try:
+                    # Title page is built here while the pool renders the sections
+                    create_pdf_document(title_path).build(list(title_elements))
+                    for done, future in enumerate(as_completed(futures), 1):
+                        future.result()
+                        if progress:
+                            progress(done, len(sections))
+                        if token:
+                            token.check()
+                finally:
+                    # Cancelled or failed - don't start the remaining sections
+                    for future in futures:
+                        future.cancel()
+            
+            merge_pdf_files(filename, [title_path] + part_paths)
+        
+        print(f"PDF saved successfully to: {filename}")
+        return True
     
     def get_filter_info(self):
         """Get filter information for PDF"""
@@ -671,106 +723,6 @@ class PDFExporter:
         elements.append(Spacer(1, 0.2*inch))
         
         return elements
-    
-    def get_connection_tables(self):
-        """Get ALL connection tables with full page width"""
-        elements = []
-        
-        data_source = self.visualizer.filtered_file_data if self.visualizer.filtered_file_data else self.visualizer.file_data
-        data_to_export = [data for idx, data in enumerate(data_source) if idx in self.visualizer.selected_files]
-        
-        for data in data_to_export:
-            if elements:
-                elements.append(PageBreak())
-            
-            elements.append(Paragraph(f"All Connections: {data['filename']}", self.styles['SectionHeader']))
-            elements.append(Paragraph(f"Frequency: {data['frequency']}", self.styles['Normal']))
-            elements.append(Spacer(1, 0.1*inch))
-            
-            sorted_connections = sorted(data['connections'].items(), key=lambda x: x[1], reverse=True)
-            
-            if sorted_connections:
-                elements.append(Paragraph(f"Total connections: {len(sorted_connections)}", self.styles['Normal']))
-                elements.append(Spacer(1, 0.1*inch))
-                
-                rows_per_page = 60  # Увеличиваем количество строк на странице
-                
-                for page_num in range(0, len(sorted_connections), rows_per_page):
-                    if page_num > 0:
-                        elements.append(PageBreak())
-                        elements.append(Paragraph(f"Connections: {data['filename']} (continued)", 
-                                                self.styles['SectionHeader']))
-                    
-                    page_connections = sorted_connections[page_num:page_num + rows_per_page]
-                    
-                    connection_rows = []
-                    for i, ((from_id, to_id), count) in enumerate(page_connections):
-                        connection_rows.append([
-                            str(page_num + i + 1),
-                            str(from_id),
-                            str(to_id),
-                            str(count)
-                        ])
-                    
-                    # Используем всю ширину страницы для таблицы
-                    # A4 = 595 points width, с полями 50 points = 495 points доступно
-                    available_width = 495
-                    
-                    header = ["#", "FROM", "TO", "Count"]
-                    # Распределяем ширину колонок для максимального использования пространства
-                    conn_table = Table([header] + connection_rows, 
-                                    colWidths=[
-                                        0.6*inch,      # № - узкая колонка
-                                        3.2*inch,      # FROM - широкая колонка
-                                        3.2*inch,      # TO - широкая колонка  
-                                        0.8*inch       # Count - узкая колонка
-                                    ])
-                    
-                    conn_table.setStyle(TableStyle([
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTNAME', (0, 1), (-1, -1), 'Courier'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 9),
-                        ('FONTSIZE', (0, 1), (-1, -1), 8),
-                        ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # № - по центру
-                        ('ALIGN', (1, 0), (1, -1), 'LEFT'),    # FROM - слева
-                        ('ALIGN', (2, 0), (2, -1), 'LEFT'),    # TO - слева
-                        ('ALIGN', (3, 0), (3, -1), 'CENTER'),  # Count - по центру
-                        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 1)]),
-                        ('LEFTPADDING', (0, 0), (-1, -1), 3),
-                        ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-                        ('TOPPADDING', (0, 0), (-1, -1), 2),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                    ]))
-                    
-                    elements.append(conn_table)
-                    
-                    # Номер страницы
-                    page_info = f"Page {page_num // rows_per_page + 1} of {(len(sorted_connections) - 1) // rows_per_page + 1}"
-                    elements.append(Spacer(1, 0.05*inch))
-                    elements.append(Paragraph(f"<i>{page_info}</i>", self.styles['Normal']))
-            
-            else:
-                no_data = Paragraph("<i>No connections in the selected date range</i>", self.styles['Normal'])
-                elements.append(no_data)
-            
-            elements.append(Spacer(1, 0.1*inch))
-        
-        return elements
-
-
-
-
-
-
-
-
-
-
-
-
-
 
 
 class DateMaskEntry(tk.Frame):
@@ -1132,6 +1084,272 @@ class DateMaskEntry(tk.Frame):
         return self.entry.get()
 
 
+class IdentifierIndex:
+    """Search index over {identifier: count} - postings of 1-3 character grams for substring search"""
+    def __init__(self, counts):
+        # Display order: most active identifiers first
+        self.items = sorted(counts.items(), key=lambda x: x[1], reverse=True)
+        self.keys = [str(identifier).lower() for identifier, count in self.items]
+        
+        # Counts are descending, so "count >= min" is a prefix found by bisect on negated counts
+        self.neg_counts = [-count for identifier, count in self.items]
+        
+        # Substring index - see build_substring_index
+        self.grams = None
+        self.count_groups = None
+    
+    def build_substring_index(self):
+        """Postings of every 1-3 character gram of the ids and ids grouped by count (slowest part, no Tk calls)"""
+        grams = defaultdict(list)
+        for i, key in enumerate(self.keys):
+            for gram in {key[j:j + size] for size in (1, 2, 3) for j in range(len(key) - size + 1)}:
+                grams[gram].append(i)
+        
+        count_groups = defaultdict(list)
+        for i, (identifier, count) in enumerate(self.items):
+            count_groups[str(count)].append(i)
+        
+        self.grams = grams
+        self.count_groups = count_groups
+    
+    def substring_matches(self, term):
+        if self.grams is None:
+            self.build_substring_index()
+        
+        # Terms up to 3 characters are grams themselves - their postings are the answer
+        if len(term) <= 3:
+            return self.grams.get(term, [])
+        
+        # Longer terms: candidates from the rarest trigram, then checked directly
+        postings = min((self.grams.get(term[j:j + 3], []) for j in range(len(term) - 2)), key=len)
+        return [i for i in postings if term in self.keys[i]]
+    
+    def count_matches(self, term):
+        if self.count_groups is None:
+            self.build_substring_index()
+        return [i for count_text, indices in self.count_groups.items() if term in count_text for i in indices]
+    
+    def search(self, term, min_count=0):
+        """Indices in display order whose id (or count) matches term and count >= min_count"""
+        limit = bisect.bisect_right(self.neg_counts, -min_count) if min_count > 0 else len(self.items)
+        term = term.strip().lower()
+        if not term:
+            return range(limit)
+        
+        matches = set(self.substring_matches(term))
+        matches.update(self.count_matches(term))
+        return sorted(i for i in matches if i < limit)
+
+
+class IdentifierList(tk.Frame):
+    """Virtual checkbox list - only rows in view are drawn, selection is a bitset over the index"""
+    def __init__(self, parent, index, selected, title="ID", on_change=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.index = index
+        self.on_change = on_change
+        self.row_height = 18
+        self.render_pending = False
+        
+        # One byte per identifier in index order
+        self.bits = bytearray(identifier in selected for identifier, count in index.items)
+        
+        header = tk.Frame(self, bg="#e0e0e0")
+        header.pack(fill=tk.X)
+        tk.Label(header, text="✓", bg="#e0e0e0", font=("Arial", 9, "bold"),
+                width=3).pack(side=tk.LEFT)
+        tk.Label(header, text=title, bg="#e0e0e0", font=("Arial", 9, "bold"),
+                anchor="w").pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Label(header, text="Count", bg="#e0e0e0", font=("Arial", 9, "bold"),
+                width=8).pack(side=tk.RIGHT)
+        
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        
+        self.scrollbar = tk.Scrollbar(body, orient=tk.VERTICAL)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.canvas = tk.Canvas(body, bg="white", highlightthickness=0,
+                               yscrollincrement=self.row_height,
+                               yscrollcommand=self.on_yscroll)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.config(command=self.canvas.yview)
+        
+        self.canvas.bind("<Configure>", lambda e: self.schedule_render())
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Button-4>", self.on_mousewheel)  # Linux scroll up
+        self.canvas.bind("<Button-5>", self.on_mousewheel)  # Linux scroll down
+        
+        self.set_visible(range(len(index.items)))
+    
+    def set_visible(self, indices):
+        """Show only these index positions (search result)"""
+        self.visible = indices
+        self.canvas.config(scrollregion=(0, 0, 0, len(indices) * self.row_height))
+        self.canvas.yview_moveto(0)
+        self.schedule_render()
+    
+    def search(self, term, min_count=0):
+        self.set_visible(self.index.search(term, min_count))
+    
+    def on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_render()
+    
+    def on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -3
+        elif event.num == 5:
+            delta = 3
+        else:
+            delta = -3 if event.delta > 0 else 3
+        self.canvas.yview_scroll(delta, "units")
+    
+    def schedule_render(self):
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render_rows)
+    
+    def render_rows(self):
+        """Draw the rows inside the viewport"""
+        self.render_pending = False
+        self.canvas.delete("row")
+        
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // self.row_height))
+        last = min(len(self.visible), int((top + self.canvas.winfo_height()) // self.row_height) + 1)
+        width = self.canvas.winfo_width()
+        for row in range(first, last):
+            self.draw_row(row, width)
+    
+    def draw_row(self, row, width):
+        i = self.visible[row]
+        identifier, count = self.index.items[i]
+        y = row * self.row_height
+        middle = y + self.row_height / 2
+        tags = ("row", f"row_{row}")
+        
+        if self.bits[i]:
+            self.canvas.create_rectangle(0, y, width, y + self.row_height,
+                                        fill="#e8f5e9", outline="", tags=tags)
+        self.canvas.create_text(12, middle, text="☑" if self.bits[i] else "☐",
+                               font=("Arial", 10), tags=tags)
+        self.canvas.create_text(28, middle, text=str(identifier), anchor="w",
+                               font=("Arial", 9), tags=tags)
+        self.canvas.create_text(width - 8, middle, text=str(count), anchor="e",
+                               font=("Arial", 9), fill="#606060", tags=tags)
+    
+    def on_click(self, event):
+        """Toggle the clicked row"""
+        row = int(self.canvas.canvasy(event.y) // self.row_height)
+        if 0 <= row < len(self.visible):
+            self.bits[self.visible[row]] ^= 1
+            self.canvas.delete(f"row_{row}")
+            self.draw_row(row, self.canvas.winfo_width())
+            if self.on_change:
+                self.on_change()
+    
+    def set_visible_selected(self, value):
+        """Select or deselect every row of the current search result"""
+        if len(self.visible) == len(self.bits):
+            self.bits = bytearray([value]) * len(self.bits)
+        else:
+            for i in self.visible:
+                self.bits[i] = value
+        self.schedule_render()
+        if self.on_change:
+            self.on_change()
+    
+    def selected_count(self):
+        return self.bits.count(1)
+    
+    def selected_ids(self):
+        items = self.index.items
+        return {items[i][0] for i, bit in enumerate(self.bits) if bit}
+
+
+class GlobalGraph:
+    """Subscriber graph of all loaded files: IDs as integer nodes, edge weights summed over frequencies"""
+    # Light fills for the largest communities/components; the rest keep the default node colour
+    PALETTE = ["#aec7e8", "#ffbb78", "#98df8a", "#ff9896", "#c5b0d5", "#c49c94",
+               "#f7b6d2", "#dbdb8d", "#9edae5", "#d9d9d9", "#bcbddc", "#fdd0a2"]
+    
+    # Exact betweenness is O(V*E); bigger graphs only count paths up to this length
+    BETWEENNESS_EXACT_NODES = 5000
+    BETWEENNESS_CUTOFF = 3
+    
+    def __init__(self, file_data, version):
+        self.version = version
+        self.node_ids = []  # index -> ID
+        self.node_index = {}  # ID -> index
+        
+        # Edge key packs both indexes into one int: source << 32 | target
+        edge_weights = defaultdict(int)
+        for data in file_data:
+            for (from_id, to_id), count in data['connections'].items():
+                edge_weights[self.get_index(from_id) << 32 | self.get_index(to_id)] += count
+        
+        self.sources = array('l', (key >> 32 for key in edge_weights))
+        self.targets = array('l', (key & 0xFFFFFFFF for key in edge_weights))
+        self.weights = array('d', edge_weights.values())
+        
+        self.scores = {}  # metric name -> list of scores by node index
+        self.groups = {}  # 'Community' / 'Component' -> membership list by node index
+    
+    def get_index(self, node_id):
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return index
+    
+    def analyze(self, token=None):
+        """PageRank, betweenness, weak components and communities in the igraph C core"""
+        graph = igraph.Graph(n=len(self.node_ids), edges=list(zip(self.sources, self.targets)), directed=True)
+        graph.es['weight'] = self.weights.tolist()
+        
+        self.scores['PageRank'] = graph.pagerank(weights='weight')
+        if token:
+            token.check()
+        
+        cutoff = None if graph.vcount() <= self.BETWEENNESS_EXACT_NODES else self.BETWEENNESS_CUTOFF
+        self.scores['Betweenness'] = graph.betweenness(directed=True, cutoff=cutoff)
+        if token:
+            token.check()
+        
+        self.groups['Component'] = self.rank_groups(graph.connected_components(mode="weak").membership)
+        
+        # Louvain on the undirected graph, weights of both directions summed
+        undirected = graph.as_undirected(combine_edges=dict(weight="sum"))
+        self.groups['Community'] = self.rank_groups(undirected.community_multilevel(weights='weight').membership)
+        return self
+    
+    def rank_groups(self, membership):
+        """Renumber groups by size so the largest ones get the palette colours"""
+        sizes = defaultdict(int)
+        for group in membership:
+            sizes[group] += 1
+        order = {group: rank for rank, group in enumerate(sorted(sizes, key=sizes.get, reverse=True))}
+        return [order[group] for group in membership]
+    
+    def count_groups(self, kind):
+        return max(self.groups[kind], default=-1) + 1
+    
+    def ranking_key(self, metric):
+        """Key function for heapq.nlargest over node IDs"""
+        scores = self.scores[metric]
+        index = self.node_index
+        return lambda node: scores[index[node]] if node in index else -1.0
+    
+    def group_color(self, kind, node_id):
+        """Palette colour of the node's group, None for small groups"""
+        index = self.node_index.get(node_id)
+        if index is None:
+            return None
+        group = self.groups[kind][index]
+        return self.PALETTE[group] if group < len(self.PALETTE) else None
+
+
 class MultiFileNetworkVisualizer:
     def __init__(self, root):
         self.root = root
@@ -1181,6 +1399,7 @@ class MultiFileNetworkVisualizer:
         self.selected_details = set()  # Set of selected DETAILS
         self.selected_from_ids = set()  # Set of selected FROM identifiers
         self.selected_to_ids = set()    # Set of selected TO identifiers
+        self.identifier_indexes = {}  # 'from'/'to' -> IdentifierIndex for the selector
         
         # PARAMETERS FROM WORKING CODE
         self.column_distance = 400  # Distance between FROM and TO columns
@@ -1226,6 +1445,35 @@ class MultiFileNetworkVisualizer:
         self.max_zoom = 4.0
         self.zoom_step = 0.25
         
+        # Level of detail: zoom thresholds between tiers and the zoom used for
+        # fonts/line widths inside each tier (tier 0 hides labels and counters)
+        self.lod_thresholds = [0.75, 1.5, 2.5]
+        self.lod_detail_zoom = [0.5, 1.0, 1.75, 3.0]
+        
+        # Top-K: nodes per column shown on one rank page, lines per cell = K * lines_per_node
+        self.top_k_var = tk.StringVar(value="50")
+        self.lines_per_node = 10
+        self.top_k_page = 0
+        
+        # Global cross-frequency graph: node order and colouring in the network view
+        self.rank_metric_var = tk.StringVar(value="Count")
+        self.node_color_var = tk.StringVar(value="None")
+        self.data_version = 0  # Bumped on every reload, the global graph is cached per version
+        self.global_graph = None
+        self.global_graph_pending = None  # Version being built in the background
+        
+        # Time-window playback: lines light up while their connections fall in the window
+        self.playback = None  # State while the playback window is open
+        self.playback_window = None
+        self.playback_frame_ms = 50  # 20 fps
+        self.playback_line_color = "#ff8c00"  # Orange for lines active in the window
+        self.playback_idle_color = "#e0e0e0"  # Light gray for inactive lines
+        
+        # Graph diff between two date ranges: line colours and node fills by change
+        self.diff_window = None
+        self.diff_line_colors = {'new': "#2ca02c", 'vanished': "#d62728", 'up': "#ff7f0e", 'down': "#1f77b4"}
+        self.diff_node_colors = {'new': "#c7f0c7", 'vanished': "#f5c6c6"}
+        
         # Data for all files
         self.file_data = []
         self.filtered_file_data = []  # Filtered data
@@ -1234,6 +1482,12 @@ class MultiFileNetworkVisualizer:
         self.selected_items = {}  # {file_idx: {'from': set(), 'to': set()}}
         self.node_rectangles = {}  # For storing rectangles
         
+        # Cell layout of the network grid - items exist only for cells near the viewport
+        self.network_cells = []
+        self.network_grid = None
+        self.drawn_network_cells = set()
+        self.network_render_pending = False
+        
         # Variables for date filters (will be set after loading data)
         self.date_from_var = tk.StringVar(value="01/01/25 00:00:00")
         self.date_to_var = tk.StringVar(value="31/12/25 23:59:59")
@@ -1241,17 +1495,26 @@ class MultiFileNetworkVisualizer:
         # Variables for canvas dragging
         self.canvas_drag_data = {"x": 0, "y": 0, "dragging": False}
         
+        # Background jobs (filtering) and time-sliced drawing
+        self.scheduler = BackgroundScheduler(self.root)
+        
+        # Live filtering: filter widgets re-run the filter after a short pause
+        self.live_filter = LiveFilter(self.root, self.scheduler, self.apply_filters,
+                                      can_run=lambda: bool(self.file_data))
+        self.live_filter.watch(self.date_from_var, self.date_to_var,
+                               self.duration_from_var, self.duration_to_var,
+                               self.selected_event, self.selected_timeslot,
+                               self.selected_color_code, self.selected_algorithm,
+                               self.selected_key)
+        
         # Initialize PDF exporter
         if REPORTLAB_AVAILABLE:
             self.pdf_exporter = PDFExporter(self)
         else:
             self.pdf_exporter = None
         
-        # Initialize vector exporter
-        if SVG_AVAILABLE:
-            self.vector_exporter = VectorExporter(self)
-        else:
-            self.vector_exporter = None
+        # Initialize vector exporter (streams SVG, no extra libraries)
+        self.vector_exporter = VectorExporter(self)
         
         # Create interface
         self.setup_ui()
@@ -1286,47 +1549,70 @@ class MultiFileNetworkVisualizer:
             title="Save PDF Report"
         )
         
-        if filename:
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("Exporting...")
-            progress_window.geometry("300x100")
-            progress_window.transient(self.root)
-            progress_window.grab_set()
-            
-            progress_window.update_idletasks()
-            x = (progress_window.winfo_screenwidth() // 2) - 150
-            y = (progress_window.winfo_screenheight() // 2) - 50
-            progress_window.geometry(f"+{x}+{y}")
-            
-            progress_label = tk.Label(progress_window, 
-                                    text="Generating PDF report...\nPlease wait...",
-                                    font=("Arial", 10))
-            progress_label.pack(expand=True)
-            
-            progress_window.update()
-            
-            # ИСПРАВЛЕНИЕ: убираем параметр include_visualization
-            success = self.pdf_exporter.export_to_pdf(filename)
-            
+        if not filename:
+            return
+        
+        progress_window, show_progress = self.open_export_progress(
+            'export_pdf', "Generating PDF report...", "Rendering PDF sections...")
+        
+        # Filters, statistics and node selection are read here on the main thread
+        title_elements = self.pdf_exporter.get_title_elements()
+        sections = self.pdf_exporter.prepare_pdf_sections()
+        
+        def finish(success):
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            messagebox.showinfo("Export Complete", 
+                            f"PDF report saved successfully to:\n{filename}")
+        
+        def fail(error):
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            messagebox.showerror("Export Error", 
+                            f"An error occurred while creating the PDF file:\n{error}")
+        
+        self.scheduler.submit(
+            'export_pdf',
+            lambda token: self.pdf_exporter.export_to_pdf(
+                filename, title_elements, sections, token,
+                lambda done, total: self.scheduler.post(token, show_progress, done, total)),
+            finish, fail
+        )
+    
+    def open_export_progress(self, channel, text, progress_text):
+        """Progress window whose Cancel stops the scheduler job; returns (window, show_progress(done, total))"""
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Exporting...")
+        progress_window.geometry("300x120")
+        progress_window.transient(self.root)
+        
+        progress_window.update_idletasks()
+        x = (progress_window.winfo_screenwidth() // 2) - 150
+        y = (progress_window.winfo_screenheight() // 2) - 60
+        progress_window.geometry(f"+{x}+{y}")
+        
+        progress_label = tk.Label(progress_window, text=text,
+                                  font=("Arial", 10))
+        progress_label.pack(expand=True)
+        
+        def cancel():
+            self.scheduler.cancel(channel)
             progress_window.destroy()
-            
-            if success:
-                messagebox.showinfo("Export Complete", 
-                                f"PDF report saved successfully to:\n{filename}")
-            else:
-                messagebox.showerror("Export Error", 
-                                "An error occurred while creating the PDF file.")
+        
+        tk.Button(progress_window, text="Cancel", command=cancel,
+                 bg="#f44336", fg="white").pack(pady=(0, 10))
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
+        
+        def show_progress(done, total):
+            if progress_window.winfo_exists():
+                progress_label.config(text=f"{progress_text} {done}/{total}")
+        
+        return progress_window, show_progress
                 
 
 
     def export_to_svg(self):
         """Export visualization to SVG vector file"""
-        if not SVG_AVAILABLE:
-            messagebox.showerror("Export Error", 
-                               "svgwrite library is not installed.\n"
-                               "Install it with: pip install svgwrite svglib")
-            return
-        
         filename = filedialog.asksaveasfilename(
             defaultextension=".svg",
             filetypes=[("SVG files", "*.svg"), ("All files", "*.*")],
@@ -1359,6 +1645,35 @@ class MultiFileNetworkVisualizer:
                 progress_window.destroy()
                 messagebox.showerror("Export Error", "Failed to export SVG")
     
+    def export_files_to_svg(self):
+        """Export one SVG per file in worker processes"""
+        directory = filedialog.askdirectory(title="Folder for SVG files")
+        if not directory:
+            return
+        
+        progress_window, show_progress = self.open_export_progress(
+            'export_svg', "Writing SVG files...", "Writing SVG files...")
+        
+        # Cell descriptions are built here on the main thread, files are written by the pool
+        jobs = self.vector_exporter.prepare_svg_files(directory)
+        
+        def finish(written):
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            messagebox.showinfo("Export Complete", f"{len(written)} SVG files saved to:\n{directory}")
+        
+        def fail(error):
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            messagebox.showerror("Export Error", f"Failed to export SVG files:\n{error}")
+        
+        self.scheduler.submit(
+            'export_svg',
+            lambda token: self.vector_exporter.write_svg_files(
+                jobs, token, lambda done, total: self.scheduler.post(token, show_progress, done, total)),
+            finish, fail
+        )
+    
     def setup_ui(self):
         """Create interface with vector export buttons"""
         main_frame = tk.Frame(self.root, bg=self.bg_color)
@@ -1383,13 +1698,20 @@ class MultiFileNetworkVisualizer:
             export_pdf_btn.pack(side=tk.LEFT, padx=5)
         
         # Export to SVG button (pure vector)
-        if SVG_AVAILABLE:
-            export_svg_btn = tk.Button(button_panel, text="📐 Export SVG", 
-                                     command=self.export_to_svg,
-                                     bg="#9C27B0", fg="white",
-                                     font=("Arial", 9, "bold"),
-                                     relief=tk.RAISED, bd=1)
-            export_svg_btn.pack(side=tk.LEFT, padx=5)
+        export_svg_btn = tk.Button(button_panel, text="📐 Export SVG", 
+                                 command=self.export_to_svg,
+                                 bg="#9C27B0", fg="white",
+                                 font=("Arial", 9, "bold"),
+                                 relief=tk.RAISED, bd=1)
+        export_svg_btn.pack(side=tk.LEFT, padx=5)
+        
+        # One SVG per file, written in parallel
+        export_svg_files_btn = tk.Button(button_panel, text="📐 SVG per file", 
+                                       command=self.export_files_to_svg,
+                                       bg="#9C27B0", fg="white",
+                                       font=("Arial", 9, "bold"),
+                                       relief=tk.RAISED, bd=1)
+        export_svg_files_btn.pack(side=tk.LEFT, padx=5)
         
         # Zoom buttons
         zoom_out_btn = tk.Button(button_panel, text=" - ", command=self.zoom_out,
@@ -1414,6 +1736,47 @@ class MultiFileNetworkVisualizer:
                               bg="#e0e0e0", relief=tk.RAISED, bd=1)
         refresh_btn.pack(side=tk.LEFT, padx=5)
         
+        playback_btn = tk.Button(button_panel, text="▶ Playback", command=self.open_playback,
+                               bg="#e0e0e0", relief=tk.RAISED, bd=1)
+        playback_btn.pack(side=tk.LEFT, padx=5)
+        
+        compare_btn = tk.Button(button_panel, text="⇄ Compare", command=self.open_diff_window,
+                              bg="#e0e0e0", relief=tk.RAISED, bd=1)
+        compare_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Top-K nodes per column and rank paging
+        rank_panel = tk.Frame(top_frame, bg=self.bg_color)
+        rank_panel.pack(side=tk.LEFT, padx=10, pady=5)
+        
+        tk.Label(rank_panel, text="Top", bg=self.bg_color, font=("Arial", 9)).pack(side=tk.LEFT)
+        top_k_spinbox = tk.Spinbox(rank_panel, from_=10, to=1000, increment=10, width=5,
+                                   textvariable=self.top_k_var, command=self.on_top_k_changed)
+        top_k_spinbox.pack(side=tk.LEFT, padx=(5, 10))
+        top_k_spinbox.bind("<Return>", self.on_top_k_changed)
+        
+        tk.Button(rank_panel, text="◀", command=lambda: self.change_top_k_page(-1),
+                 bg="#e0e0e0", relief=tk.RAISED, bd=1, width=2).pack(side=tk.LEFT)
+        self.top_k_label = tk.Label(rank_panel, text="Ranks 1–50", bg=self.bg_color,
+                                    font=("Arial", 9), width=14)
+        self.top_k_label.pack(side=tk.LEFT, padx=5)
+        tk.Button(rank_panel, text="▶", command=lambda: self.change_top_k_page(1),
+                 bg="#e0e0e0", relief=tk.RAISED, bd=1, width=2).pack(side=tk.LEFT)
+        
+        # Ranking and colouring from the global graph of all files
+        tk.Label(rank_panel, text="Order", bg=self.bg_color, font=("Arial", 9)).pack(side=tk.LEFT, padx=(15, 5))
+        rank_metric_combo = ttk.Combobox(rank_panel, textvariable=self.rank_metric_var,
+                                         values=["Count", "PageRank", "Betweenness"],
+                                         state="readonly", width=11)
+        rank_metric_combo.pack(side=tk.LEFT)
+        rank_metric_combo.bind("<<ComboboxSelected>>", self.on_graph_view_changed)
+        
+        tk.Label(rank_panel, text="Colour", bg=self.bg_color, font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 5))
+        node_color_combo = ttk.Combobox(rank_panel, textvariable=self.node_color_var,
+                                        values=["None", "Community", "Component"],
+                                        state="readonly", width=11)
+        node_color_combo.pack(side=tk.LEFT)
+        node_color_combo.bind("<<ComboboxSelected>>", self.on_graph_view_changed)
+        
         # Horizontal container
         content_frame = tk.Frame(main_frame, bg=self.bg_color)
         content_frame.pack(fill=tk.BOTH, expand=True)
@@ -1579,6 +1942,12 @@ class MultiFileNetworkVisualizer:
                                      cursor="hand2", width=15)
         self.clear_button.pack(fill=tk.X, pady=(5, 0))
         
+        # Live mode - filter automatically when a filter value changes
+        tk.Checkbutton(apply_frame, text="Live filtering",
+                      variable=self.live_filter.enabled,
+                      command=self.live_filter.on_toggle,
+                      bg="#f5f5f5", font=("Arial", 8)).pack(anchor=tk.W, pady=(5, 0))
+        
         # Filter status
         self.filter_status = tk.Label(apply_frame, text="No filter applied",
                                      bg="#f5f5f5", fg="#606060",
@@ -1599,34 +1968,99 @@ class MultiFileNetworkVisualizer:
         h_scroll.pack(side=tk.BOTTOM, fill=tk.X)
         
         self.canvas = tk.Canvas(canvas_frame, bg=self.bg_color,
-                               yscrollcommand=v_scroll.set,
-                               xscrollcommand=h_scroll.set,
+                               yscrollcommand=self.on_canvas_yscroll,
+                               xscrollcommand=self.on_canvas_xscroll,
                                highlightthickness=0)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         v_scroll.config(command=self.canvas.yview)
         h_scroll.config(command=self.canvas.xview)
+        self.v_scroll = v_scroll
+        self.h_scroll = h_scroll
+        
+        # Draw cells that come into view when the canvas is resized
+        self.canvas.bind("<Configure>", lambda e: self.schedule_network_render())
         
-        # Bind mouse events for canvas dragging
+        # Bind mouse events for canvas dragging and node clicks
         self.canvas.bind("<ButtonPress-1>", self.on_canvas_click)
         self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
+        self.canvas.bind("<Button-3>", self.on_canvas_right_click)
+        self.canvas.bind("<Control-Button-1>", self.on_canvas_ctrl_click)
         
         # Change cursor when dragging
         self.canvas.bind("<Enter>", lambda e: self.canvas.configure(cursor="hand2"))
 
+    def on_canvas_yscroll(self, first, last):
+        """Vertical view changed - update scrollbar and draw cells in view"""
+        self.v_scroll.set(first, last)
+        self.schedule_network_render()
+    
+    def on_canvas_xscroll(self, first, last):
+        """Horizontal view changed - update scrollbar and draw cells in view"""
+        self.h_scroll.set(first, last)
+        self.schedule_network_render()
+    
     def on_canvas_click(self, event):
         """Start dragging the canvas or handle node click"""
-        # Check if click is on empty canvas area (not on a node)
-        clicked_item = self.canvas.find_closest(event.x, event.y)[0]
-        item_tags = self.canvas.gettags(clicked_item)
+        node = self.find_node_at(event.x, event.y)
+        if node:
+            self.on_node_left_click(*node)
+            return
         
-        # If clicked on empty area or lines, start dragging
-        if not item_tags or 'current' not in item_tags:
-            self.canvas_drag_data["x"] = event.x
-            self.canvas_drag_data["y"] = event.y
-            self.canvas_drag_data["dragging"] = True
-            self.canvas.configure(cursor="fleur")  # Change to move cursor
+        # Clicked on empty area or lines - start dragging
+        self.canvas_drag_data["x"] = event.x
+        self.canvas_drag_data["y"] = event.y
+        self.canvas_drag_data["dragging"] = True
+        self.canvas.configure(cursor="fleur")  # Change to move cursor
+    
+    def on_canvas_right_click(self, event):
+        """Right click - dispatch to node under cursor"""
+        node = self.find_node_at(event.x, event.y)
+        if node:
+            self.on_node_right_click(*node)
+    
+    def on_canvas_ctrl_click(self, event):
+        """Ctrl+click - dispatch to node under cursor"""
+        node = self.find_node_at(event.x, event.y)
+        if node:
+            self.on_node_ctrl_click(*node)
+    
+    def find_node_at(self, event_x, event_y):
+        """Find (node_id, is_from, file_idx) under window point using the cell layout index"""
+        if not self.network_cells:
+            return None
+        
+        x = self.canvas.canvasx(event_x)
+        y = self.canvas.canvasy(event_y)
+        
+        # Grid cell under the point
+        grid = self.network_grid
+        row_idx = bisect.bisect_right(grid['row_tops'], y) - 1
+        col_idx = int((x - grid['padding']) // grid['col_width'])
+        if row_idx < 0 or col_idx < 0 or col_idx >= grid['cols']:
+            return None
+        cell_idx = row_idx * grid['cols'] + col_idx
+        if cell_idx >= len(self.network_cells):
+            return None
+        
+        cell = self.network_cells[cell_idx]
+        node_index = cell.get('node_index')
+        if not node_index:
+            return None
+        
+        # Column under the point (rectangle plus its counter)
+        for is_from in (True, False):
+            column = node_index['from' if is_from else 'to']
+            if not column['x0'] <= x <= column['x1']:
+                continue
+            
+            # Nodes are stacked top-down, bisect on their top edges
+            pos = bisect.bisect_right(column['tops'], y) - 1
+            if pos >= 0 and y <= column['tops'][pos] + node_index['node_height']:
+                return column['ids'][pos], is_from, cell['file_idx']
+        
+        return None
     
     def on_canvas_drag(self, event):
         """Handle canvas dragging"""
@@ -1800,6 +2234,31 @@ class MultiFileNetworkVisualizer:
 
 
 
+    
+    def warm_identifier_indexes(self):
+        """Build selector search indexes in the background so the dialog opens instantly"""
+        self.identifier_indexes = {}
+        counts = {'from': dict(self.from_identifiers), 'to': dict(self.to_identifiers)}
+        
+        def build(token):
+            indexes = {}
+            for kind, kind_counts in counts.items():
+                token.check()
+                indexes[kind] = IdentifierIndex(kind_counts)
+                indexes[kind].build_substring_index()
+            return indexes
+        
+        def store(indexes):
+            self.identifier_indexes.update(indexes)
+        
+        self.scheduler.submit('identifier_index', build, store)
+    
+    def get_identifier_index(self, kind):
+        """Search index of FROM or TO identifiers (cached until data is reloaded)"""
+        if kind not in self.identifier_indexes:
+            counts = self.from_identifiers if kind == 'from' else self.to_identifiers
+            self.identifier_indexes[kind] = IdentifierIndex(counts)
+        return self.identifier_indexes[kind]
     
     def open_identifier_selector(self):
         """Open window for selecting FROM/TO identifiers"""
@@ -1808,92 +2267,6 @@ class MultiFileNetworkVisualizer:
         selector.geometry("750x700")  # Более компактный размер
         selector.resizable(True, True)  # Разрешить изменение размера
         
-        # Show progress window
-        progress_window = tk.Toplevel(selector)
-        progress_window.title("Loading...")
-        progress_window.geometry("300x100")
-        progress_window.resizable(False, False)
-        progress_window.transient(selector)
-        progress_window.grab_set()
-        
-        # Center progress window
-        x = (progress_window.winfo_screenwidth() // 2) - 150
-        y = (progress_window.winfo_screenheight() // 2) - 50
-        progress_window.geometry(f"+{x}+{y}")
-        
-        # Progress bar with percentage
-        progress_frame = tk.Frame(progress_window, bg="#f5f5f5")
-        progress_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        self.progress_label = tk.Label(progress_frame, text="Loading identifiers...", 
-                                     bg="#f5f5f5", font=("Arial", 10))
-        self.progress_label.pack(pady=(0, 5))
-        
-        # Progress bar with percentage
-        self.progress_bar = tk.ttk.Progressbar(progress_frame, mode='determinate', 
-                                              maximum=100, length=250)
-        self.progress_bar.pack(fill=tk.X, pady=(0, 5))
-        
-        self.percentage_label = tk.Label(progress_frame, text="0%", 
-                                       bg="#f5f5f5", font=("Arial", 9))
-        self.percentage_label.pack()
-        
-        # Update the window to show progress
-        selector.update()
-        progress_window.update()
-        
-        # Main container
-        main_container = tk.Frame(selector, bg="#f5f5f5")
-        main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Container for two columns
-        columns_frame = tk.Frame(main_container, bg="#f5f5f5")
-        columns_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # FROM column
-        from_column = tk.Frame(columns_frame, bg="#f5f5f5")
-        from_column.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        tk.Label(from_column, text="FROM", bg="#f5f5f5", 
-                font=("Arial", 11, "bold")).pack()
-        
-        from_header = tk.Frame(from_column, bg="#f5f5f5")
-        from_header.pack(fill=tk.X)
-        tk.Label(from_header, text="ID", bg="#f5f5f5", 
-                font=("Arial", 9, "bold"), width=12, anchor="w").pack(side=tk.LEFT, padx=(25, 0))
-        tk.Label(from_header, text="Count", bg="#f5f5f5", 
-                font=("Arial", 9, "bold"), width=8).pack(side=tk.LEFT)
-        
-        from_list_frame = tk.Frame(from_column, bg="#f5f5f5")
-        from_list_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # TO column
-        to_column = tk.Frame(columns_frame, bg="#f5f5f5")
-        to_column.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        
-        tk.Label(to_column, text="TO", bg="#f5f5f5", 
-                font=("Arial", 11, "bold")).pack()
-        
-        to_header = tk.Frame(to_column, bg="#f5f5f5")
-        to_header.pack(fill=tk.X)
-        tk.Label(to_header, text="ID", bg="#f5f5f5", 
-                font=("Arial", 9, "bold"), width=12, anchor="w").pack(side=tk.LEFT, padx=(25, 0))
-        tk.Label(to_header, text="Count", bg="#f5f5f5", 
-                font=("Arial", 9, "bold"), width=8).pack(side=tk.LEFT)
-        
-        to_list_frame = tk.Frame(to_column, bg="#f5f5f5")
-        to_list_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Sort identifiers by count (descending order)
-        sorted_from_ids = sorted(self.from_identifiers.items(), key=lambda x: x[1], reverse=True)
-        sorted_to_ids = sorted(self.to_identifiers.items(), key=lambda x: x[1], reverse=True)
-        
-        # Calculate total items for progress
-        total_from_items = len(sorted_from_ids)
-        total_to_items = len(sorted_to_ids)
-        total_items = total_from_items + total_to_items
-        current_progress = 0
-        
         # Initialize if empty
         if not self.selected_from_ids:
             self.selected_from_ids = set(self.from_identifiers.keys())
@@ -1902,397 +2275,68 @@ class MultiFileNetworkVisualizer:
             self.selected_to_ids = set(self.to_identifiers.keys())
             print(f"Debug: Initialized TO IDs with {len(self.selected_to_ids)} items")
         
-        # Checkboxes for FROM
-        from_checkboxes = []
-        from_checkbox_vars = []
-        
-        # Update progress for FROM identifiers
-        self.progress_label.config(text=f"Loading FROM identifiers ({total_from_items} items)...")
-        selector.update()
-        progress_window.update()
-        
-        # Use Treeview for efficient large data handling (решение для больших объемов)
-        print(f"Loading ALL {total_from_items} FROM identifiers using Treeview...")
-        
-        # Create Treeview for FROM identifiers (fast for large datasets)
-        from_tree_frame = tk.Frame(from_list_frame, bg="white")
-        from_tree_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Treeview with scrollbar and checkboxes
-        from_tree = tk.ttk.Treeview(from_tree_frame, columns=("count", "selected"), show="tree headings", height=25)
-        from_tree.heading("#0", text="FROM ID", anchor="w")
-        from_tree.heading("count", text="Count")
-        from_tree.heading("selected", text="✓", anchor="center")
-        from_tree.column("#0", width=120, minwidth=100)
-        from_tree.column("count", width=60, minwidth=50)
-        from_tree.column("selected", width=30, minwidth=30)  # Колонка для галочек
-        
-        from_tree_scrollbar = tk.Scrollbar(from_tree_frame, orient="vertical", command=from_tree.yview)
-        from_tree.configure(yscrollcommand=from_tree_scrollbar.set)
-        
-        from_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        from_tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Store data for search
-        self.all_from_data = sorted_from_ids
-        self.from_tree = from_tree
-        self.from_selected_items = set()
-        
-        # Load data into Treeview (much faster than individual widgets)
-        for i, (identifier, count) in enumerate(sorted_from_ids):
-            # Check if item should be selected
-            is_selected = identifier in self.selected_from_ids
-            if is_selected:
-                self.from_selected_items.add(identifier)
-            
-            # Insert into treeview with checkbox
-            checkbox_text = "✓" if is_selected else ""
-            item_id = from_tree.insert("", "end", text=str(identifier), values=(count, checkbox_text))
-            
-            # Update progress every 1000 items (less frequent updates for better performance)
-            if i % 1000 == 0:
-                current_progress = int(((i + 1) / total_items) * 50)
-                self.progress_bar['value'] = current_progress
-                self.percentage_label.config(text=f"{current_progress}%")
-                self.progress_label.config(text=f"Loading FROM identifiers ({i+1}/{total_from_items})...")
-                selector.update()
-                progress_window.update()
-        
-        # Bind click events for checkboxes
-        def on_from_click(event):
-            item = from_tree.identify_row(event.y)
-            column = from_tree.identify_column(event.x)
-            
-            print(f"Debug: Clicked on item={item}, column={column}")  # Debug info
-            
-            # Check if clicked on checkbox column (selected) - try different column numbers
-            if item and (column == "#3" or column == "#2"):  # Try both possible column numbers
-                identifier = from_tree.item(item, "text")
-                current_values = from_tree.item(item, "values")
-                current_checkbox = current_values[1] if len(current_values) > 1 else ""
-                
-                print(f"Debug: Toggling {identifier}, current checkbox='{current_checkbox}'")
-                
-                # Toggle checkbox
-                if current_checkbox == "✓":
-                    new_checkbox = ""
-                    if identifier in self.from_selected_items:
-                        self.from_selected_items.discard(identifier)
-                else:
-                    new_checkbox = "✓"
-                    self.from_selected_items.add(identifier)
-                
-                # Update treeview
-                from_tree.item(item, values=(current_values[0], new_checkbox))
-                
-                # Force treeview to update display
-                from_tree.update()
-                from_tree.update_idletasks()
-                
-                print(f"Debug: New checkbox='{new_checkbox}', selected items: {len(self.from_selected_items)}")
-                
-                # Update selection (but don't apply filters immediately to avoid freezing)
-                self.selected_from_ids = self.from_selected_items.copy()
-        
-        from_tree.bind("<Button-1>", on_from_click)
-        
-        # Update progress
-        current_progress = int((total_from_items / total_items) * 50)  # Approximate progress
-        self.progress_bar['value'] = current_progress
-        self.percentage_label.config(text=f"{current_progress}%")
-        self.progress_label.config(text=f"FROM identifiers loaded ({total_from_items}/{total_from_items})...")
-        selector.update()
-        progress_window.update()
-        
-        
-        # Search frame for FROM
-        from_search_frame = tk.Frame(from_column, bg="#f5f5f5")
-        from_search_frame.pack(fill=tk.X, pady=(5, 0))
-        
-        # Search row with Search and Min count on the same line
-        search_row1 = tk.Frame(from_search_frame, bg="#f5f5f5")
-        search_row1.pack(fill=tk.X, pady=(0, 2))
-        
-        tk.Label(search_row1, text="Search:", bg="#f5f5f5", font=("Arial", 8)).pack(side=tk.LEFT)
-        from_search_var = tk.StringVar()
-        from_search_entry = tk.Entry(search_row1, textvariable=from_search_var, width=12, font=("Arial", 8))
-        from_search_entry.pack(side=tk.LEFT, padx=(5, 10))
+        # Main container
+        main_container = tk.Frame(selector, bg="#f5f5f5")
+        main_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        tk.Label(search_row1, text="Min count:", bg="#f5f5f5", font=("Arial", 8)).pack(side=tk.LEFT)
-        from_min_count_var = tk.StringVar()
-        from_min_count_entry = tk.Entry(search_row1, textvariable=from_min_count_var, width=8, font=("Arial", 8))
-        from_min_count_entry.pack(side=tk.LEFT, padx=(5, 0))
+        # Container for two columns
+        columns_frame = tk.Frame(main_container, bg="#f5f5f5")
+        columns_frame.pack(fill=tk.BOTH, expand=True)
         
-        def search_from():
-            search_term = from_search_var.get().lower()
-            min_count_text = from_min_count_var.get()
-            visible_count = 0
+        def build_column(side, kind, title, selected):
+            """FROM or TO column: virtual list with search row and status"""
+            index = self.get_identifier_index(kind)
+            total = len(index.items)
             
-            try:
-                min_count = int(min_count_text) if min_count_text else 0
-            except ValueError:
-                min_count = 0
-            
-            # Filter and show items
-            for item in from_tree.get_children():
-                identifier = from_tree.item(item, "text")
-                values = from_tree.item(item, "values")
-                count = int(values[0])
-                
-                # Check if item matches search criteria
-                if (count >= min_count and
-                    (not search_term or 
-                     search_term in identifier.lower() or 
-                     search_term in str(count))):
-                    from_tree.reattach(item, "", "end")
-                    visible_count += 1
-                else:
-                    from_tree.detach(item)
-            
-            # Update search status
-            if hasattr(self, 'from_search_status'):
-                self.from_search_status.destroy()
-            self.from_search_status = tk.Label(from_search_frame, 
-                                             text=f"Showing {visible_count}/{total_from_items}", 
-                                             bg="#f5f5f5", font=("Arial", 8), fg="#666")
-            self.from_search_status.pack(side=tk.RIGHT, padx=(5, 0))
-        
-        from_search_entry.bind("<KeyRelease>", lambda e: search_from())
-        from_min_count_entry.bind("<KeyRelease>", lambda e: search_from())
-        
-        def select_all_from():
-            # Select all visible items
-            for item in from_tree.get_children():
-                identifier = from_tree.item(item, "text")
-                current_values = from_tree.item(item, "values")
-                from_tree.item(item, values=(current_values[0], "✓"))
-                self.from_selected_items.add(identifier)
-            
-            # Force treeview to update display
-            from_tree.update()
-            from_tree.update_idletasks()
-            
-            # Update selection (but don't apply filters immediately to avoid freezing)
-            self.selected_from_ids = self.from_selected_items.copy()
-        
-        def deselect_all_from():
-            # Deselect all items
-            for item in from_tree.get_children():
-                current_values = from_tree.item(item, "values")
-                from_tree.item(item, values=(current_values[0], ""))
-            
-            self.from_selected_items.clear()
-            
-            # Force treeview to update display
-            from_tree.update()
-            from_tree.update_idletasks()
-            
-            # Update selection (but don't apply filters immediately to avoid freezing)
-            self.selected_from_ids = self.from_selected_items.copy()
-        
-        
-        # Checkboxes for TO
-        to_checkboxes = []
-        to_checkbox_vars = []
-        
-        # Update progress for TO identifiers
-        self.progress_label.config(text=f"Loading TO identifiers ({total_to_items} items)...")
-        selector.update()
-        progress_window.update()
-        
-        # Use Treeview for TO identifiers (эффективное решение для больших объемов)
-        print(f"Loading ALL {total_to_items} TO identifiers using Treeview...")
-        
-        # Create Treeview for TO identifiers (fast for large datasets)
-        to_tree_frame = tk.Frame(to_list_frame, bg="white")
-        to_tree_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Treeview with scrollbar and checkboxes
-        to_tree = tk.ttk.Treeview(to_tree_frame, columns=("count", "selected"), show="tree headings", height=25)
-        to_tree.heading("#0", text="TO ID", anchor="w")
-        to_tree.heading("count", text="Count")
-        to_tree.heading("selected", text="✓", anchor="center")
-        to_tree.column("#0", width=120, minwidth=100)
-        to_tree.column("count", width=60, minwidth=50)
-        to_tree.column("selected", width=30, minwidth=30)  # Колонка для галочек
-        
-        to_tree_scrollbar = tk.Scrollbar(to_tree_frame, orient="vertical", command=to_tree.yview)
-        to_tree.configure(yscrollcommand=to_tree_scrollbar.set)
-        
-        to_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        to_tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Store data for search
-        self.all_to_data = sorted_to_ids
-        self.to_tree = to_tree
-        self.to_selected_items = set()
-        
-        # Load data into Treeview (much faster than individual widgets)
-        for i, (identifier, count) in enumerate(sorted_to_ids):
-            # Check if item should be selected
-            is_selected = identifier in self.selected_to_ids
-            if is_selected:
-                self.to_selected_items.add(identifier)
-            
-            # Insert into treeview with checkbox
-            checkbox_text = "✓" if is_selected else ""
-            item_id = to_tree.insert("", "end", text=str(identifier), values=(count, checkbox_text))
-            
-            # Update progress every 1000 items (less frequent updates for better performance)
-            if i % 1000 == 0:
-                current_progress = int(((total_from_items + i + 1) / total_items) * 100)
-                self.progress_bar['value'] = current_progress
-                self.percentage_label.config(text=f"{current_progress}%")
-                self.progress_label.config(text=f"Loading TO identifiers ({i+1}/{total_to_items})...")
-                selector.update()
-                progress_window.update()
-        
-        # Bind click events for checkboxes
-        def on_to_click(event):
-            item = to_tree.identify_row(event.y)
-            column = to_tree.identify_column(event.x)
-            
-            print(f"Debug TO: Clicked on item={item}, column={column}")  # Debug info
-            
-            # Check if clicked on checkbox column (selected) - try different column numbers
-            if item and (column == "#3" or column == "#2"):  # Try both possible column numbers
-                identifier = to_tree.item(item, "text")
-                current_values = to_tree.item(item, "values")
-                current_checkbox = current_values[1] if len(current_values) > 1 else ""
-                
-                print(f"Debug TO: Toggling {identifier}, current checkbox='{current_checkbox}'")
-                
-                # Toggle checkbox
-                if current_checkbox == "✓":
-                    new_checkbox = ""
-                    if identifier in self.to_selected_items:
-                        self.to_selected_items.discard(identifier)
-                else:
-                    new_checkbox = "✓"
-                    self.to_selected_items.add(identifier)
-                
-                # Update treeview
-                to_tree.item(item, values=(current_values[0], new_checkbox))
-                
-                # Force treeview to update display
-                to_tree.update()
-                to_tree.update_idletasks()
-                
-                print(f"Debug TO: New checkbox='{new_checkbox}', selected items: {len(self.to_selected_items)}")
-                
-                # Update selection (but don't apply filters immediately to avoid freezing)
-                self.selected_to_ids = self.to_selected_items.copy()
-        
-        to_tree.bind("<Button-1>", on_to_click)
-        
-        # Update progress
-        current_progress = int(((total_from_items + total_to_items) / total_items) * 100)
-        self.progress_bar['value'] = current_progress
-        self.percentage_label.config(text=f"{current_progress}%")
-        self.progress_label.config(text=f"TO identifiers loaded ({total_to_items}/{total_to_items})...")
-        selector.update()
-        progress_window.update()
-        
-        
-        # TO control buttons and search
-        to_buttons_frame = tk.Frame(to_column, bg="#f5f5f5")
-        to_buttons_frame.pack(fill=tk.X, pady=(5, 0))
-        
-        # Search frame for TO
-        to_search_frame = tk.Frame(to_column, bg="#f5f5f5")
-        to_search_frame.pack(fill=tk.X, pady=(2, 0))
-        
-        # Search row with Search and Min count on the same line
-        to_search_row1 = tk.Frame(to_search_frame, bg="#f5f5f5")
-        to_search_row1.pack(fill=tk.X, pady=(0, 2))
-        
-        tk.Label(to_search_row1, text="Search:", bg="#f5f5f5", font=("Arial", 8)).pack(side=tk.LEFT)
-        to_search_var = tk.StringVar()
-        to_search_entry = tk.Entry(to_search_row1, textvariable=to_search_var, width=12, font=("Arial", 8))
-        to_search_entry.pack(side=tk.LEFT, padx=(5, 10))
-        
-        tk.Label(to_search_row1, text="Min count:", bg="#f5f5f5", font=("Arial", 8)).pack(side=tk.LEFT)
-        to_min_count_var = tk.StringVar()
-        to_min_count_entry = tk.Entry(to_search_row1, textvariable=to_min_count_var, width=8, font=("Arial", 8))
-        to_min_count_entry.pack(side=tk.LEFT, padx=(5, 0))
-        
-        def search_to():
-            search_term = to_search_var.get().lower()
-            min_count_text = to_min_count_var.get()
-            visible_count = 0
+            column = tk.Frame(columns_frame, bg="#f5f5f5")
+            column.pack(side=side, fill=tk.BOTH, expand=True,
+                        padx=(0, 5) if side == tk.LEFT else (5, 0))
             
-            try:
-                min_count = int(min_count_text) if min_count_text else 0
-            except ValueError:
-                min_count = 0
-            
-            # Filter and show items
-            for item in to_tree.get_children():
-                identifier = to_tree.item(item, "text")
-                values = to_tree.item(item, "values")
-                count = int(values[0])
-                
-                # Check if item matches search criteria
-                if (count >= min_count and
-                    (not search_term or 
-                     search_term in identifier.lower() or 
-                     search_term in str(count))):
-                    to_tree.reattach(item, "", "end")
-                    visible_count += 1
-                else:
-                    to_tree.detach(item)
+            tk.Label(column, text=title, bg="#f5f5f5", 
+                    font=("Arial", 11, "bold")).pack()
             
-            # Update search status
-            if hasattr(self, 'to_search_status'):
-                self.to_search_status.destroy()
-            self.to_search_status = tk.Label(to_search_frame, 
-                                            text=f"Showing {visible_count}/{total_to_items}", 
-                                            bg="#f5f5f5", font=("Arial", 8), fg="#666")
-            self.to_search_status.pack(side=tk.RIGHT, padx=(5, 0))
-        
-        to_search_entry.bind("<KeyRelease>", lambda e: search_to())
-        to_min_count_entry.bind("<KeyRelease>", lambda e: search_to())
-        
-        def select_all_to():
-            # Select all visible items
-            for item in to_tree.get_children():
-                identifier = to_tree.item(item, "text")
-                current_values = to_tree.item(item, "values")
-                to_tree.item(item, values=(current_values[0], "✓"))
-                self.to_selected_items.add(identifier)
+            status = tk.Label(column, bg="#f5f5f5", font=("Arial", 8), fg="#666")
             
-            # Force treeview to update display
-            to_tree.update()
-            to_tree.update_idletasks()
+            def update_status():
+                status.config(text=f"Showing {len(id_list.visible)}/{total} · "
+                                   f"selected {id_list.selected_count()}")
             
-            # Update selection (but don't apply filters immediately to avoid freezing)
-            self.selected_to_ids = self.to_selected_items.copy()
-        
-        def deselect_all_to():
-            # Deselect all items
-            for item in to_tree.get_children():
-                current_values = to_tree.item(item, "values")
-                to_tree.item(item, values=(current_values[0], ""))
+            id_list = IdentifierList(column, index, selected, title=f"{title} ID",
+                                     on_change=update_status, bg="#f5f5f5")
+            id_list.pack(fill=tk.BOTH, expand=True)
             
-            self.to_selected_items.clear()
+            # Search row with Search and Min count on the same line
+            search_row = tk.Frame(column, bg="#f5f5f5")
+            search_row.pack(fill=tk.X, pady=(5, 2))
             
-            # Force treeview to update display
-            to_tree.update()
-            to_tree.update_idletasks()
+            tk.Label(search_row, text="Search:", bg="#f5f5f5", font=("Arial", 8)).pack(side=tk.LEFT)
+            search_var = tk.StringVar()
+            search_entry = tk.Entry(search_row, textvariable=search_var, width=12, font=("Arial", 8))
+            search_entry.pack(side=tk.LEFT, padx=(5, 10))
             
-            # Update selection (but don't apply filters immediately to avoid freezing)
-            self.selected_to_ids = self.to_selected_items.copy()
-        
-        
-        # Complete progress and close window
-        self.progress_bar['value'] = 100
-        self.percentage_label.config(text="100%")
-        self.progress_label.config(text="Loading completed!")
-        selector.update()
-        progress_window.update()
+            tk.Label(search_row, text="Min count:", bg="#f5f5f5", font=("Arial", 8)).pack(side=tk.LEFT)
+            min_count_var = tk.StringVar()
+            min_count_entry = tk.Entry(search_row, textvariable=min_count_var, width=8, font=("Arial", 8))
+            min_count_entry.pack(side=tk.LEFT, padx=(5, 0))
+            
+            def search():
+                try:
+                    min_count = int(min_count_var.get()) if min_count_var.get() else 0
+                except ValueError:
+                    min_count = 0
+                id_list.search(search_var.get(), min_count)
+                update_status()
+            
+            search_entry.bind("<KeyRelease>", lambda e: search())
+            min_count_entry.bind("<KeyRelease>", lambda e: search())
+            
+            status.pack(anchor=tk.E)
+            update_status()
+            print(f"Identifier selector: {total} {title} identifiers")
+            return id_list
         
-        # Small delay to show completion
-        selector.after(500, lambda: progress_window.destroy())
+        from_list = build_column(tk.LEFT, 'from', "FROM", self.selected_from_ids)
+        to_list = build_column(tk.RIGHT, 'to', "TO", self.selected_to_ids)
         
         # Add proper window close handling
         def on_closing():
@@ -2313,57 +2357,37 @@ class MultiFileNetworkVisualizer:
         
         # Apply button function
         def apply_identifier_selection():
-            # Use the current state from self.from_selected_items and self.to_selected_items
-            # instead of reading from Treeview (which may be out of sync)
-            self.selected_from_ids = self.from_selected_items.copy()
-            self.selected_to_ids = self.to_selected_items.copy()
+            self.selected_from_ids = from_list.selected_ids()
+            self.selected_to_ids = to_list.selected_ids()
             
             print(f"Debug: Selected FROM IDs: {len(self.selected_from_ids)} items")
             print(f"Debug: Selected TO IDs: {len(self.selected_to_ids)} items")
-            print(f"Debug: FROM IDs: {list(self.selected_from_ids)[:5]}...")  # Показываем первые 5
-            print(f"Debug: TO IDs: {list(self.selected_to_ids)[:5]}...")      # Показываем первые 5
             
             selector.destroy()
             
-            # Show progress for applying filters
-            progress_window = tk.Toplevel(self.root)
-            progress_window.title("Applying Filters...")
-            progress_window.geometry("300x100")
-            progress_window.resizable(False, False)
-            progress_window.transient(self.root)
-            progress_window.grab_set()
-            
-            # Center progress window
-            x = (progress_window.winfo_screenwidth() // 2) - 150
-            y = (progress_window.winfo_screenheight() // 2) - 50
-            progress_window.geometry(f"+{x}+{y}")
-            
-            progress_label = tk.Label(progress_window, 
-                                    text="Applying filters...\nPlease wait...",
-                                    font=("Arial", 10))
-            progress_label.pack(expand=True)
-            
-            progress_window.update()
-            
-            # Apply filters asynchronously
-            self.apply_filters_async(progress_window)
+            # Filtering runs in the background, status shows progress
+            self.apply_filters()
         
-        # FROM buttons on the left
+        # FROM buttons on the left - act on the rows matching the current search
         from_buttons_frame = tk.Frame(control_frame, bg="#f5f5f5")
         from_buttons_frame.pack(side=tk.LEFT)
         
-        tk.Button(from_buttons_frame, text="Select All FROM", command=select_all_from,
+        tk.Button(from_buttons_frame, text="Select All FROM",
+                 command=lambda: from_list.set_visible_selected(1),
                  bg="#4CAF50", fg="white", font=("Arial", 8)).pack(side=tk.LEFT, padx=(0, 5))
-        tk.Button(from_buttons_frame, text="Deselect All FROM", command=deselect_all_from,
+        tk.Button(from_buttons_frame, text="Deselect All FROM",
+                 command=lambda: from_list.set_visible_selected(0),
                  bg="#f44336", fg="white", font=("Arial", 8)).pack(side=tk.LEFT)
         
         # TO buttons on the right
         to_buttons_frame = tk.Frame(control_frame, bg="#f5f5f5")
         to_buttons_frame.pack(side=tk.RIGHT)
         
-        tk.Button(to_buttons_frame, text="Select All TO", command=select_all_to,
+        tk.Button(to_buttons_frame, text="Select All TO",
+                 command=lambda: to_list.set_visible_selected(1),
                  bg="#4CAF50", fg="white", font=("Arial", 8)).pack(side=tk.LEFT, padx=(0, 5))
-        tk.Button(to_buttons_frame, text="Deselect All TO", command=deselect_all_to,
+        tk.Button(to_buttons_frame, text="Deselect All TO",
+                 command=lambda: to_list.set_visible_selected(0),
                  bg="#f44336", fg="white", font=("Arial", 8)).pack(side=tk.LEFT)
         
         # APPLY button in the center
@@ -2697,210 +2721,174 @@ class MultiFileNetworkVisualizer:
         except:
             return None
     
-    def apply_filters_async(self, progress_window):
-        """Apply filters asynchronously with progress updates"""
-        def apply_filters_worker():
-            try:
-                # Get filter values
-                date_from_str = self.date_from_var.get()
-                date_to_str = self.date_to_var.get()
-                
-                date_from = self.parse_date(date_from_str)
-                date_to = self.parse_date(date_to_str)
-                
-                if not date_from or not date_to:
-                    progress_window.after(0, lambda: progress_window.destroy())
-                    self.filter_status.config(text="Invalid date format", fg="red")
-                    return
-                
-                # Get filter values
-                duration_from = self.duration_from_var.get()
-                duration_to = self.duration_to_var.get()
-                event_filter = self.selected_event.get()
-                timeslot_filter = self.selected_timeslot.get()
-                color_code_filter = self.selected_color_code.get()
-                algorithm_filter = self.selected_algorithm.get()
-                key_filter = self.selected_key.get()
-                
-                # Convert duration from seconds to milliseconds
-                try:
-                    dur_from_ms = float(duration_from) * 1000 if duration_from else None
-                    dur_to_ms = float(duration_to) * 1000 if duration_to else None
-                except:
-                    dur_from_ms = dur_to_ms = None
-                
-                # Filter data
-                self.filtered_file_data = []
-                total_connections = 0
-                total_with_dates = 0
-                total_filtered = 0
-                
-                # Update progress
-                progress_window.after(0, lambda: progress_window.destroy())
-                
-                for data in self.file_data:
-                    filtered_connections = defaultdict(int)
-                    filtered_from_counts = defaultdict(int)
-                    filtered_to_counts = defaultdict(int)
-                    filtered_dates = defaultdict(list)
-                    filtered_details = defaultdict(list)
-                    
-                    # Get connection details if they exist
-                    connection_details = data.get('connection_details', {})
-                    
-                    for (from_id, to_id), details_list in connection_details.items():
-                        for detail in details_list:
-                            total_connections += 1
-                            
-                            # Check all filters
-                            passes_filter = True
-                            
-                            # Filter by FROM/TO identifiers
-                            if self.selected_from_ids and from_id not in self.selected_from_ids:
-                                passes_filter = False
-                            if self.selected_to_ids and to_id not in self.selected_to_ids:
-                                passes_filter = False
-                            
-                            # Filter by date
-                            if detail['timestamp']:
-                                total_with_dates += 1
-                                if not (date_from <= detail['timestamp'] <= date_to):
-                                    passes_filter = False
-                            else:
-                                passes_filter = False  # Skip entries without date
-                            
-                            # Filter by duration (compare in milliseconds)
-                            if dur_from_ms is not None or dur_to_ms is not None:
-                                try:
-                                    duration_ms = float(detail['duration_ms']) if detail['duration_ms'] else 0
-                                    if dur_from_ms is not None and duration_ms < dur_from_ms:
-                                        passes_filter = False
-                                    if dur_to_ms is not None and duration_ms > dur_to_ms:
-                                        passes_filter = False
-                                except:
-                                    passes_filter = False
-                            
-                            # Filter by EVENT
-                            if event_filter != 'All' and detail['event'] != event_filter:
-                                passes_filter = False
-                            
-                            # Filter by TIMESLOT
-                            if timeslot_filter != 'All' and detail['timeslot'] != timeslot_filter:
-                                passes_filter = False
-                            
-                            # Filter by COLOR_CODE
-                            if color_code_filter != 'All' and detail['color_code'] != color_code_filter:
-                                passes_filter = False
-                            
-                            # Filter by ALGORITHM
-                            if algorithm_filter != 'All' and detail['algorithm'] != algorithm_filter:
-                                passes_filter = False
-                            
-                            # Filter by KEY
-                            if key_filter != 'All' and detail['key'] != key_filter:
-                                passes_filter = False
-                            
-                            # Filter by DETAILS
-                            if self.selected_details and detail.get('details', '') not in self.selected_details:
-                                passes_filter = False
-                            
-                            if passes_filter:
-                                filtered_connections[(from_id, to_id)] += 1
-                                filtered_from_counts[from_id] += 1
-                                filtered_to_counts[to_id] += 1
-                                if detail['timestamp']:
-                                    filtered_dates[(from_id, to_id)].append(detail['timestamp'])
-                                filtered_details[(from_id, to_id)].append(detail)
-                                total_filtered += 1
-                    
-                    filtered_data = {
-                        'file_path': data['file_path'],
-                        'filename': data['filename'],
-                        'frequency': data['frequency'],
-                        'connections': dict(filtered_connections),
-                        'from_counts': dict(filtered_from_counts),
-                        'to_counts': dict(filtered_to_counts),
-                        'connection_dates': dict(filtered_dates),
-                        'connection_details': dict(filtered_details)
-                    }
-                    self.filtered_file_data.append(filtered_data)
-                
-                # Update status with detailed information
-                if total_with_dates > 0:
-                    percent = int((total_filtered / total_with_dates) * 100) if total_with_dates > 0 else 0
-                    self.filter_status.config(
-                        text=f"Filtered: {total_filtered}/{total_with_dates} ({percent}%)",
-                        fg="green" if total_filtered > 0 else "orange"
-                    )
-                else:
-                    self.filter_status.config(
-                        text="No date data found",
-                        fg="red"
-                    )
-                
-                print(f"Debug: Total connections: {total_connections}")
-                print(f"Debug: With dates: {total_with_dates}")
-                print(f"Debug: Filtered: {total_filtered}")
-                print(f"Debug: Date range: {date_from} to {date_to}")
-                print(f"Debug: Selected DETAILS: {self.selected_details}")
-                print(f"Debug: FROM filter: {len(self.selected_from_ids)} selected FROM IDs")
-                print(f"Debug: TO filter: {len(self.selected_to_ids)} selected TO IDs")
-                
-                # Force UI update
-                self.root.after(0, lambda: self.root.update())
-                
-                # Redraw with filtered data (also async with progress)
-                self.root.after(0, lambda: self.draw_all_networks_async(use_filtered=True))
-                
-                # Force final UI update
-                self.root.after(0, lambda: self.root.update())
-                
-            except Exception as e:
-                print(f"Error applying filters: {e}")
-                progress_window.after(0, lambda: progress_window.destroy())
-                self.filter_status.config(text="Error applying filters", fg="red")
-        
-        # Start the worker in a separate thread
-        import threading
-        thread = threading.Thread(target=apply_filters_worker)
-        thread.daemon = True
-        thread.start()
+    def is_date_only_filter(self):
+        """Check whether only date range and identifiers are filtered"""
+        if self.duration_from_var.get() or self.duration_to_var.get():
+            return False
+        if self.selected_details:
+            return False
+        combos = [self.selected_event, self.selected_timeslot, self.selected_color_code,
+                  self.selected_algorithm, self.selected_key]
+        return all(var.get() == 'All' for var in combos)
     
-    def apply_filters(self):
-        """Apply filters to data"""
-        date_from_str = self.date_from_var.get()
-        date_to_str = self.date_to_var.get()
+    def sum_bucket_range(self, time_buckets, start, end):
+        """Sum edge counts of buckets [start, end) using prefix checkpoints"""
+        edges = time_buckets['edges']
+        step = time_buckets['step']
+        checkpoints = time_buckets['checkpoints']
+        result = defaultdict(int)
+        
+        first_cp = -(-start // step)  # ceil
+        last_cp = min(end // step, len(checkpoints) - 1)
+        
+        if first_cp < last_cp:
+            # Разность накопленных сумм + хвосты по краям
+            upper = checkpoints[last_cp]
+            lower = checkpoints[first_cp]
+            for edge, count in upper.items():
+                diff = count - lower.get(edge, 0)
+                if diff:
+                    result[edge] += diff
+            ranges = [(start, first_cp * step), (last_cp * step, end)]
+        else:
+            ranges = [(start, end)]
         
-        date_from = self.parse_date(date_from_str)
-        date_to = self.parse_date(date_to_str)
+        for range_start, range_end in ranges:
+            for bucket in edges[range_start:range_end]:
+                for edge, count in bucket.items():
+                    result[edge] += count
+        
+        return result
+    
+    def count_window_edges(self, data, date_from, date_to):
+        """Edge counts of a date window from hourly buckets: {(from, to): count}"""
+        time_buckets = data['time_buckets']
+        keys = time_buckets['keys']
+        records = time_buckets['records']
+        
+        # Часы, пересекающиеся с окном
+        lo_key = date_from.replace(minute=0, second=0, microsecond=0)
+        hi_key = date_to.replace(minute=0, second=0, microsecond=0)
+        start = bisect.bisect_left(keys, lo_key)
+        end = bisect.bisect_right(keys, hi_key)
+        
+        # Граничные часы покрыты частично - считаем их по записям
+        partial = []
+        if start < end and keys[start] == lo_key:
+            partial.append(start)
+            start += 1
+        if start < end and keys[end - 1] == hi_key:
+            partial.append(end - 1)
+            end -= 1
+        
+        window = self.sum_bucket_range(time_buckets, start, end) if start < end else defaultdict(int)
+        for idx in partial:
+            for timestamp, from_id, to_id in records[idx]:
+                if date_from <= timestamp <= date_to:
+                    window[(from_id, to_id)] += 1
+        return window
+    
+    def filter_by_time_buckets(self, data, date_from, date_to, from_ids=None, to_ids=None):
+        """Assemble filtered network for a date window from hourly buckets"""
+        from_ids = self.selected_from_ids if from_ids is None else from_ids
+        to_ids = self.selected_to_ids if to_ids is None else to_ids
+        records = data['time_buckets']['records']
+        window = self.count_window_edges(data, date_from, date_to)
+        
+        filtered_connections = {}
+        filtered_from_counts = defaultdict(int)
+        filtered_to_counts = defaultdict(int)
+        for (from_id, to_id), count in window.items():
+            if from_ids and from_id not in from_ids:
+                continue
+            if to_ids and to_id not in to_ids:
+                continue
+            filtered_connections[(from_id, to_id)] = count
+            filtered_from_counts[from_id] += count
+            filtered_to_counts[to_id] += count
+        
+        total_with_dates = sum(len(bucket_records) for bucket_records in records)
+        total_filtered = sum(filtered_connections.values())
+        from_adjacency, to_adjacency = self.build_adjacency(filtered_connections)
+        
+        # Даты и детали по соединениям в быстром режиме не собираются
+        filtered_data = {
+            'dataset_id': data['dataset_id'],
+            'file_path': data['file_path'],
+            'filename': data['filename'],
+            'frequency': data['frequency'],
+            'connections': filtered_connections,
+            'from_counts': dict(filtered_from_counts),
+            'to_counts': dict(filtered_to_counts),
+            'from_adjacency': from_adjacency,
+            'to_adjacency': to_adjacency,
+            'connection_dates': {},
+            'connection_details': {}
+        }
+        return filtered_data, total_with_dates, total_filtered
+    
+    def get_filter_settings(self):
+        """Read filter widgets on the main thread (None if dates are invalid)"""
+        date_from = self.parse_date(self.date_from_var.get())
+        date_to = self.parse_date(self.date_to_var.get())
         
         if not date_from or not date_to:
-            self.filter_status.config(text="Invalid date format", fg="red")
-            return
+            return None
         
-        # Get filter values
+        # Convert duration from seconds to milliseconds
         duration_from = self.duration_from_var.get()
         duration_to = self.duration_to_var.get()
-        event_filter = self.selected_event.get()
-        timeslot_filter = self.selected_timeslot.get()
-        color_code_filter = self.selected_color_code.get()
-        algorithm_filter = self.selected_algorithm.get()
-        key_filter = self.selected_key.get()
-        
-        # Convert duration from seconds to milliseconds
         try:
             dur_from_ms = float(duration_from) * 1000 if duration_from else None
             dur_to_ms = float(duration_to) * 1000 if duration_to else None
         except:
             dur_from_ms = dur_to_ms = None
         
-        # Filter data
-        self.filtered_file_data = []
+        return {
+            'date_from': date_from,
+            'date_to': date_to,
+            'dur_from_ms': dur_from_ms,
+            'dur_to_ms': dur_to_ms,
+            'event': self.selected_event.get(),
+            'timeslot': self.selected_timeslot.get(),
+            'color_code': self.selected_color_code.get(),
+            'algorithm': self.selected_algorithm.get(),
+            'key': self.selected_key.get(),
+            'details': set(self.selected_details),
+            'from_ids': set(self.selected_from_ids),
+            'to_ids': set(self.selected_to_ids),
+            'date_only': self.is_date_only_filter()
+        }
+    
+    def compute_filtered_data(self, settings, token=None):
+        """Filter all files with a settings snapshot (runs in a worker, no Tk calls)"""
+        date_from = settings['date_from']
+        date_to = settings['date_to']
+        dur_from_ms = settings['dur_from_ms']
+        dur_to_ms = settings['dur_to_ms']
+        from_ids = settings['from_ids']
+        to_ids = settings['to_ids']
+        
+        filtered_file_data = []
         total_connections = 0
         total_with_dates = 0
         total_filtered = 0
         
         for data in self.file_data:
+            # Newer filter request supersedes this one
+            if token:
+                token.check()
+            
+            # Только диапазон дат - собираем сеть из почасовых агрегатов
+            if settings['date_only']:
+                filtered_data, with_dates, passed = self.filter_by_time_buckets(data, date_from, date_to,
+                                                                                from_ids, to_ids)
+                total_connections += sum(data['connections'].values())
+                total_with_dates += with_dates
+                total_filtered += passed
+                filtered_file_data.append(filtered_data)
+                continue
+            
             filtered_connections = defaultdict(int)
             filtered_from_counts = defaultdict(int)
             filtered_to_counts = defaultdict(int)
@@ -2918,9 +2906,9 @@ class MultiFileNetworkVisualizer:
                     passes_filter = True
                     
                     # Filter by FROM/TO identifiers
-                    if self.selected_from_ids and from_id not in self.selected_from_ids:
+                    if from_ids and from_id not in from_ids:
                         passes_filter = False
-                    if self.selected_to_ids and to_id not in self.selected_to_ids:
+                    if to_ids and to_id not in to_ids:
                         passes_filter = False
                     
                     # Filter by date
@@ -2943,29 +2931,28 @@ class MultiFileNetworkVisualizer:
                             passes_filter = False
                     
                     # Filter by EVENT
-                    if event_filter != 'All' and detail['event'] != event_filter:
+                    if settings['event'] != 'All' and detail['event'] != settings['event']:
                         passes_filter = False
                     
                     # Filter by TIMESLOT
-                    if timeslot_filter != 'All' and detail['timeslot'] != timeslot_filter:
+                    if settings['timeslot'] != 'All' and detail['timeslot'] != settings['timeslot']:
                         passes_filter = False
                     
                     # Filter by COLOR_CODE
-                    if color_code_filter != 'All' and detail['color_code'] != color_code_filter:
+                    if settings['color_code'] != 'All' and detail['color_code'] != settings['color_code']:
                         passes_filter = False
                     
                     # Filter by ALGORITHM
-                    if algorithm_filter != 'All' and detail['algorithm'] != algorithm_filter:
+                    if settings['algorithm'] != 'All' and detail['algorithm'] != settings['algorithm']:
                         passes_filter = False
                     
                     # Filter by KEY
-                    if key_filter != 'All' and detail['key'] != key_filter:
+                    if settings['key'] != 'All' and detail['key'] != settings['key']:
                         passes_filter = False
                     
                     # Filter by DETAILS
-                    if self.selected_details and detail.get('details', '') not in self.selected_details:
+                    if settings['details'] and detail.get('details', '') not in settings['details']:
                         passes_filter = False
-                        print(f"DETAILS filter: {detail.get('details', '')} not in {self.selected_details}")
                     
                     if passes_filter:
                         filtered_connections[(from_id, to_id)] += 1
@@ -2976,23 +2963,34 @@ class MultiFileNetworkVisualizer:
                         filtered_details[(from_id, to_id)].append(detail)
                         total_filtered += 1
             
+            from_adjacency, to_adjacency = self.build_adjacency(filtered_connections)
             filtered_data = {
+                'dataset_id': data['dataset_id'],
                 'file_path': data['file_path'],
                 'filename': data['filename'],
                 'frequency': data['frequency'],
                 'connections': dict(filtered_connections),
                 'from_counts': dict(filtered_from_counts),
                 'to_counts': dict(filtered_to_counts),
+                'from_adjacency': from_adjacency,
+                'to_adjacency': to_adjacency,
                 'connection_dates': dict(filtered_dates),
                 'connection_details': dict(filtered_details)
             }
-            self.filtered_file_data.append(filtered_data)
+            filtered_file_data.append(filtered_data)
+        
+        return filtered_file_data, total_connections, total_with_dates, total_filtered
+    
+    def show_filtered_result(self, settings, result):
+        """Store filtered data, update status and redraw (main thread)"""
+        self.filtered_file_data, total_connections, total_with_dates, total_filtered = result
+        latency_ms = (time.perf_counter() - settings['started']) * 1000
         
         # Update status with detailed information
         if total_with_dates > 0:
             percent = int((total_filtered / total_with_dates) * 100) if total_with_dates > 0 else 0
             self.filter_status.config(
-                text=f"Filtered: {total_filtered}/{total_with_dates} ({percent}%)",
+                text=f"Filtered: {total_filtered}/{total_with_dates} ({percent}%) · {latency_ms:.0f} ms",
                 fg="green" if total_filtered > 0 else "orange"
             )
         else:
@@ -3003,23 +3001,25 @@ class MultiFileNetworkVisualizer:
         
         print(f"Debug: Total connections: {total_connections}")
         print(f"Debug: With dates: {total_with_dates}")
-        print(f"Debug: Filtered: {total_filtered}")
-        print(f"Debug: Date range: {date_from} to {date_to}")
-        print(f"Debug: Selected DETAILS: {self.selected_details}")
-        print(f"Debug: FROM filter: {len(self.selected_from_ids)} selected FROM IDs")
-        print(f"Debug: TO filter: {len(self.selected_to_ids)} selected TO IDs")
-        
-        # Force UI update
-        self.root.update()
+        print(f"Debug: Filtered: {total_filtered} in {latency_ms:.1f} ms")
+        print(f"Debug: Date range: {settings['date_from']} to {settings['date_to']}")
+        print(f"Debug: Selected DETAILS: {settings['details']}")
+        print(f"Debug: FROM filter: {len(settings['from_ids'])} selected FROM IDs")
+        print(f"Debug: TO filter: {len(settings['to_ids'])} selected TO IDs")
         
         # Redraw with filtered data
         self.draw_all_networks(use_filtered=True)
-        
-        # Force final UI update
-        self.root.update()
+    
+    def apply_filters(self):
+        """Apply filters to data in a background job (a newer request cancels older ones)"""
+        self.live_filter.submit(self.get_filter_settings, self.compute_filtered_data,
+                                self.show_filtered_result, self.filter_status)
     
     def clear_filters(self):
         """Сброс всех фильтров"""
+        # Незавершенная фильтрация больше не нужна
+        self.scheduler.cancel('filter')
+        
         # Копируем все данные без фильтрации
         self.filtered_file_data = []
         
@@ -3036,6 +3036,7 @@ class MultiFileNetworkVisualizer:
         self.selected_from_ids = set(self.from_identifiers.keys())
         self.selected_to_ids = set(self.to_identifiers.keys())
         print(f"Debug: Cleared filters - restored {len(self.selected_from_ids)} FROM IDs and {len(self.selected_to_ids)} TO IDs")
+        self.live_filter.cancel()
         
         # Обновляем статус
         self.filter_status.config(text="No filter applied", fg="#606060")
@@ -3068,11 +3069,13 @@ class MultiFileNetworkVisualizer:
         self.from_identifiers.clear()  # Очищаем счетчик FROM идентификаторов
         self.to_identifiers.clear()    # Очищаем счетчик TO идентификаторов
         
-        for idx, file_path in enumerate(self.file_paths):
+        for file_path in self.file_paths:
             data = self.load_file_data(file_path)
             if data:
+                # Стабильный id набора данных = индекс в file_data, сохраняется при фильтрации
+                data['dataset_id'] = len(self.file_data)
                 self.file_data.append(data)
-                self.selected_items[idx] = {'from': set(), 'to': set()}
+                self.selected_items[data['dataset_id']] = {'from': set(), 'to': set()}
                 
                 # Собираем уникальные значения
                 self.unique_events.update(data.get('events', set()))
@@ -3100,6 +3103,18 @@ class MultiFileNetworkVisualizer:
         if not self.selected_to_ids:
             self.selected_to_ids = set(self.to_identifiers.keys())
         
+        # Индексы поиска для окна выбора идентификаторов
+        self.warm_identifier_indexes()
+        
+        # События воспроизведения относятся к старым данным
+        if self.playback is not None:
+            self.close_playback(redraw=False)
+        
+        # Новая версия данных - глобальный граф строится заново, если он нужен
+        self.data_version += 1
+        if self.needs_global_graph():
+            self.build_global_graph()
+        
         # Обновляем комбобоксы
         self.update_comboboxes()
         
@@ -3120,6 +3135,10 @@ class MultiFileNetworkVisualizer:
         # Новые структуры для хранения данных по соединениям
         connection_details = defaultdict(list)  # Детальная информация о каждом соединении
         
+        # Почасовые агрегаты: {час: {(from, to): count}} и записи часа для граничных интервалов
+        bucket_edges = defaultdict(lambda: defaultdict(int))
+        bucket_records = defaultdict(list)
+        
         # Уникальные значения для фильтров
         events = set()
         timeslots = set()
@@ -3193,6 +3212,10 @@ class MultiFileNetworkVisualizer:
                     # Сохраняем дату если есть
                     if connection_date:
                         connection_dates[(from_id, to_id)].append(connection_date)
+                        
+                        bucket = connection_date.replace(minute=0, second=0, microsecond=0)
+                        bucket_edges[bucket][(from_id, to_id)] += 1
+                        bucket_records[bucket].append((connection_date, from_id, to_id))
                     
                     # Сохраняем детальную информацию о соединении
                     connection_details[(from_id, to_id)].append({
@@ -3205,7 +3228,8 @@ class MultiFileNetworkVisualizer:
                         'key': key,
                         'details': detail
                     })
-                    
+            
+            from_adjacency, to_adjacency = self.build_adjacency(connections)
             return {
                 'file_path': file_path,
                 'filename': os.path.basename(file_path),
@@ -3213,8 +3237,11 @@ class MultiFileNetworkVisualizer:
                 'connections': connections,
                 'from_counts': from_counts,
                 'to_counts': to_counts,
+                'from_adjacency': from_adjacency,
+                'to_adjacency': to_adjacency,
                 'connection_dates': dict(connection_dates),
                 'connection_details': dict(connection_details),
+                'time_buckets': self.build_time_buckets(bucket_edges, bucket_records),
                 'events': events,
                 'timeslots': timeslots,
                 'color_codes': color_codes,
@@ -3225,60 +3252,45 @@ class MultiFileNetworkVisualizer:
         except Exception as e:
             print(f"Error loading {file_path}: {e}")
     
+    def build_adjacency(self, connections):
+        """Forward {from: [(to, count)]} and reverse {to: [(from, count)]} adjacency of a network"""
+        from_adjacency = defaultdict(list)
+        to_adjacency = defaultdict(list)
+        for (from_id, to_id), count in connections.items():
+            from_adjacency[from_id].append((to_id, count))
+            to_adjacency[to_id].append((from_id, count))
+        return dict(from_adjacency), dict(to_adjacency)
+    
+    def build_time_buckets(self, bucket_edges, bucket_records):
+        """Build hourly edge-count buckets with prefix-sum checkpoints"""
+        keys = sorted(bucket_edges.keys())
+        edges = [dict(bucket_edges[key]) for key in keys]
+        records = [bucket_records[key] for key in keys]
+        
+        # Накопленные суммы рёбер каждые `step` часов (sqrt-декомпозиция по памяти)
+        step = max(24, int(math.sqrt(len(keys))))
+        checkpoints = [{}]
+        running = defaultdict(int)
+        for idx, bucket in enumerate(edges, start=1):
+            for edge, count in bucket.items():
+                running[edge] += count
+            if idx % step == 0:
+                checkpoints.append(dict(running))
+        
+        return {
+            'keys': keys,
+            'edges': edges,
+            'records': records,
+            'step': step,
+            'checkpoints': checkpoints
+        }
+    
     def draw_all_networks_async(self, use_filtered=None):
-        """Draw all networks asynchronously with progress"""
-        def draw_worker():
-            try:
-                # Show progress window
-                progress_window = tk.Toplevel(self.root)
-                progress_window.title("Drawing Networks...")
-                progress_window.geometry("300x120")
-                progress_window.resizable(False, False)
-                progress_window.transient(self.root)
-                progress_window.grab_set()
-                
-                # Center progress window
-                x = (progress_window.winfo_screenwidth() // 2) - 150
-                y = (progress_window.winfo_screenheight() // 2) - 60
-                progress_window.geometry(f"+{x}+{y}")
-                
-                progress_label = tk.Label(progress_window, 
-                                        text="Drawing networks...\nPlease wait...",
-                                        font=("Arial", 10))
-                progress_label.pack(pady=(10, 5))
-                
-                # Progress bar
-                progress_bar = tk.ttk.Progressbar(progress_window, mode='indeterminate', length=250)
-                progress_bar.pack(pady=(0, 10))
-                progress_bar.start(10)  # Start the indeterminate progress bar
-                
-                progress_window.update()
-                
-                # Call the actual drawing method
-                self.draw_all_networks(use_filtered)
-                
-                # Stop progress bar
-                progress_bar.stop()
-                
-                # Close progress window
-                progress_window.after(0, lambda: progress_window.destroy())
-                
-            except Exception as e:
-                print(f"Error drawing networks: {e}")
-                if 'progress_window' in locals():
-                    progress_window.after(0, lambda: progress_window.destroy())
-        
-        # Start the worker in a separate thread
-        import threading
-        thread = threading.Thread(target=draw_worker)
-        thread.daemon = True
-        thread.start()
+        """Draw all networks without blocking - cells are created in time slices"""
+        self.draw_all_networks(use_filtered)
     
-    def draw_all_networks(self, use_filtered=None):
-        """Draw all networks on one canvas"""
-        self.canvas.delete("all")
-        self.node_rectangles.clear()
-        
+    def get_datasets_to_draw(self, use_filtered=None):
+        """Datasets shown in the grid: filtered or all, selected files with connections only"""
         # If use_filtered not specified, determine automatically
         if use_filtered is None:
             use_filtered = len(self.filtered_file_data) > 0
@@ -3296,21 +3308,18 @@ class MultiFileNetworkVisualizer:
         
         if hidden_count > 0:
             print(f"Скрыто {hidden_count} файлов без данных в выбранном диапазоне")
-        
-        num_files = len(data_to_draw)
-        if num_files == 0:
-            self.canvas.create_text(400, 200, text="No files with data in selected range", 
-                                   font=("Arial", 14), fill=self.text_color)
-            return
-        
-        rows, cols = self.calculate_grid_dimensions(num_files)
+        return data_to_draw
+    
+    def compute_network_grid(self, data_to_draw, zoom):
+        """Cell rectangles of the network grid at a zoom (shared by the canvas and SVG export)"""
+        rows, cols = self.calculate_grid_dimensions(len(data_to_draw))
         
         # Apply scale
-        scaled_cell_width = self.cell_width * self.zoom_level
-        scaled_padding = self.cell_padding * self.zoom_level
-        scaled_node_height = self.node_height * self.zoom_level
-        scaled_node_spacing = self.node_spacing * self.zoom_level
-        scaled_top_margin = self.cell_top_margin * self.zoom_level
+        scaled_cell_width = self.cell_width * zoom
+        scaled_padding = self.cell_padding * zoom
+        scaled_node_height = self.node_height * zoom
+        scaled_node_spacing = self.node_spacing * zoom
+        scaled_top_margin = self.cell_top_margin * zoom
         
         # Calculate height of each row
         row_heights = []
@@ -3318,11 +3327,11 @@ class MultiFileNetworkVisualizer:
             max_height = 0
             for col_idx in range(cols):
                 file_idx = row_idx * cols + col_idx
-                if file_idx < num_files:
+                if file_idx < len(data_to_draw):
                     data = data_to_draw[file_idx]
-                    num_from = len(data['from_counts'])
-                    num_to = len(data['to_counts'])
-                    max_nodes = max(num_from, num_to)
+                    num_from = self.count_page_nodes(len(data['from_counts']))
+                    num_to = self.count_page_nodes(len(data['to_counts']))
+                    max_nodes = max(num_from, num_to) + 1  # + hidden count note
                     
                     cell_height = (scaled_top_margin + 
                                  max_nodes * (scaled_node_height + scaled_node_spacing) + 
@@ -3332,94 +3341,180 @@ class MultiFileNetworkVisualizer:
             
             row_heights.append(max_height)
         
-        # Draw each file with periodic UI updates
+        # Lay out cells (positions only)
+        cells = []
         current_y = scaled_padding
-        files_drawn = 0
+        grid = {
+            'cols': cols,
+            'padding': scaled_padding,
+            'col_width': scaled_cell_width + scaled_padding,
+            'row_tops': []
+        }
         
         for row_idx in range(rows):
             current_x = scaled_padding
             row_height = row_heights[row_idx]
+            grid['row_tops'].append(current_y)
             
             for col_idx in range(cols):
                 display_idx = row_idx * cols + col_idx
-                if display_idx < num_files:
+                if display_idx < len(data_to_draw):
                     data = data_to_draw[display_idx]
                     
-                    # Find original file index
-                    original_idx = -1
-                    for orig_idx in self.selected_files:
-                        if (use_filtered and self.filtered_file_data[orig_idx] == data) or \
-                           (not use_filtered and self.file_data[orig_idx] == data):
-                            original_idx = orig_idx
-                            break
-                    
-                    # Cell border
-                    self.canvas.create_rectangle(
-                        current_x, current_y,
-                        current_x + scaled_cell_width,
-                        current_y + row_height,
-                        outline="#cccccc", width=1
-                    )
-                    
-                    # Draw content
-                    if original_idx != -1:
-                        self.draw_single_network(data, current_x, current_y, original_idx)
-                        files_drawn += 1
-                        
-                        # Update UI every 5 files to prevent freezing
-                        if files_drawn % 5 == 0:
-                            self.root.update_idletasks()
+                    cells.append({
+                        'data': data,
+                        'file_idx': data['dataset_id'],
+                        'x': current_x,
+                        'y': current_y,
+                        'width': scaled_cell_width,
+                        'height': row_height
+                    })
                 
                 current_x += scaled_cell_width + scaled_padding
             
             current_y += row_height + scaled_padding
         
-        # Update scroll region
         total_width = cols * (scaled_cell_width + scaled_padding) + scaled_padding
-        total_height = current_y
+        grid['size'] = (total_width, current_y)
+        return cells, grid
+    
+    def draw_all_networks(self, use_filtered=None):
+        """Draw all networks on one canvas"""
+        self.scheduler.cancel_chunks('draw')
+        self.canvas.delete("all")
+        self.node_rectangles.clear()
+        self.network_cells = []
+        self.drawn_network_cells = set()
+        if self.playback is not None:
+            self.playback['items'].clear()
+        
+        data_to_draw = self.get_datasets_to_draw(use_filtered)
+        if not data_to_draw:
+            self.canvas.create_text(400, 200, text="No files with data in selected range", 
+                                   font=("Arial", 14), fill=self.text_color)
+            return
+        
+        # Lay out cells (positions only) - items are created by render_visible_networks
+        self.network_cells, self.network_grid = self.compute_network_grid(data_to_draw, self.zoom_level)
+        
+        # Update scroll region
+        total_width, total_height = self.network_grid['size']
         self.canvas.configure(scrollregion=(0, 0, total_width, total_height))
+        
+        self.render_visible_networks()
+    
+    def schedule_network_render(self):
+        """Schedule drawing of cells that scrolled into view"""
+        if self.network_cells and not self.network_render_pending:
+            self.network_render_pending = True
+            self.root.after_idle(self.render_visible_networks)
     
-    def draw_single_network(self, data, x_offset, y_offset, file_idx):
-        """Draw one network with highlighting"""
+    def render_visible_networks(self):
+        """Create items for cells near the viewport and free cells far away"""
+        self.network_render_pending = False
+        
+        # Viewport plus one screen in every direction
+        view_left = self.canvas.canvasx(0)
+        view_top = self.canvas.canvasy(0)
+        view_width = max(self.canvas.winfo_width(), 1)
+        view_height = max(self.canvas.winfo_height(), 1)
+        keep_left = view_left - view_width
+        keep_right = view_left + 2 * view_width
+        keep_top = view_top - view_height
+        keep_bottom = view_top + 2 * view_height
+        
+        cells_to_draw = []
+        for cell_idx, cell in enumerate(self.network_cells):
+            near_view = (cell['x'] < keep_right and cell['x'] + cell['width'] > keep_left and
+                         cell['y'] < keep_bottom and cell['y'] + cell['height'] > keep_top)
+            if near_view and cell_idx not in self.drawn_network_cells:
+                cells_to_draw.append(cell_idx)
+            elif not near_view and cell_idx in self.drawn_network_cells:
+                self.free_network_cell(cell_idx)
+        
+        # Create items in time slices so a large grid never blocks the UI
+        self.scheduler.run_chunks('draw', cells_to_draw, self.draw_network_cell)
+    
+    def draw_network_cell(self, cell_idx):
+        """Create canvas items of one grid cell"""
+        if cell_idx in self.drawn_network_cells:
+            return
+        
+        cell = self.network_cells[cell_idx]
+        cell_tag = f"net_{cell_idx}"
+        
+        # Cell border
+        self.canvas.create_rectangle(
+            cell['x'], cell['y'],
+            cell['x'] + cell['width'],
+            cell['y'] + cell['height'],
+            outline="#cccccc", width=1, tags=cell_tag
+        )
+        
+        # Draw content (keeps node positions for click hit-testing)
+        cell['node_index'] = self.draw_single_network(cell['data'], cell['x'], cell['y'], cell['file_idx'], cell_tag)
+        
+        self.drawn_network_cells.add(cell_idx)
+    
+    def free_network_cell(self, cell_idx):
+        """Delete canvas items of a cell that left the viewport"""
+        file_idx = self.network_cells[cell_idx]['file_idx']
+        self.network_cells[cell_idx]['node_index'] = None
+        self.canvas.delete(f"net_{cell_idx}")
+        for key in [key for key in self.node_rectangles if key[0] == file_idx]:
+            del self.node_rectangles[key]
+        if self.playback is not None:
+            items = self.playback['items']
+            for key in [key for key in items if key[0] == file_idx]:
+                del items[key]
+        self.drawn_network_cells.discard(cell_idx)
+    
+    def draw_single_network(self, data, x_offset, y_offset, file_idx, cell_tag=""):
+        """Draw one network with highlighting, return node layout index"""
         # Parameters with scale
         scaled_node_width = self.node_width * self.zoom_level
         scaled_node_height = self.node_height * self.zoom_level
-        scaled_node_spacing = self.node_spacing * self.zoom_level
         scaled_column_distance = self.column_distance * self.zoom_level
-        font_size = max(6, int(9 * self.zoom_level))
+        
+        # Fonts and line widths follow the LOD tier, geometry follows zoom_level
+        detail_zoom = self.get_lod_zoom()
+        show_labels = self.get_lod_tier() > 0
+        font_size = max(6, int(9 * detail_zoom))
         
         # Column positions
         left_x = x_offset + 50 * self.zoom_level
         right_x = left_x + scaled_column_distance
         
         # File title
-        title_font_size = max(8, int(10 * self.zoom_level))
+        title_font_size = max(8, int(10 * detail_zoom))
         self.canvas.create_text(
             x_offset + self.cell_width * self.zoom_level // 2,
             y_offset + 10 * self.zoom_level,
             text=data['filename'],
             font=("Arial", title_font_size, "bold"),
-            fill=self.text_color
+            fill=self.text_color,
+            tags=cell_tag
         )
         
         # Frequency
-        freq_font_size = max(10, int(14 * self.zoom_level))
+        freq_font_size = max(10, int(14 * detail_zoom))
         self.canvas.create_text(
             x_offset + self.cell_width * self.zoom_level // 2,
             y_offset + 25 * self.zoom_level,
             text=data['frequency'],
             font=("Arial", freq_font_size, "bold"),
-            fill="#000000"
+            fill="#000000",
+            tags=cell_tag
         )
         
         # Column headers
-        header_font_size = max(8, int(12 * self.zoom_level))
+        header_font_size = max(8, int(12 * detail_zoom))
         self.canvas.create_text(left_x + scaled_node_width // 2,
                                y_offset + 40 * self.zoom_level,
-                               text="FROM", font=("Arial", header_font_size, "bold"))
+                               text="FROM", font=("Arial", header_font_size, "bold"), tags=cell_tag)
         self.canvas.create_text(right_x + scaled_node_width // 2,
                                y_offset + 40 * self.zoom_level,
-                               text="TO", font=("Arial", header_font_size, "bold"))
+                               text="TO", font=("Arial", header_font_size, "bold"), tags=cell_tag)
         
         # Skip drawing if no connections
         if not data['connections']:
@@ -3427,36 +3522,32 @@ class MultiFileNetworkVisualizer:
                 x_offset + self.cell_width * self.zoom_level // 2,
                 y_offset + 80 * self.zoom_level,
                 text="No data in date range",
-                font=("Arial", int(10 * self.zoom_level)),
-                fill="#999999"
+                font=("Arial", int(10 * detail_zoom)),
+                fill="#999999",
+                tags=cell_tag
             )
-            return
+            return None
         
-        # Limit nodes for performance (top 50 each)
-        max_nodes = 50
-        from_nodes = sorted(data['from_counts'].keys(),
-                          key=lambda x: data['from_counts'][x], reverse=True)[:max_nodes]
-        to_nodes = sorted(data['to_counts'].keys(),
-                        key=lambda x: data['to_counts'][x], reverse=True)[:max_nodes]
+        # Nodes and lines of the current rank page (top K, cached per dataset)
+        layout = self.layout_network_cell(data, x_offset, y_offset, self.zoom_level)
+        page_network = layout['page']
+        from_nodes = page_network['from_nodes']
+        to_nodes = page_network['to_nodes']
         
-        if len(data['from_counts']) > max_nodes or len(data['to_counts']) > max_nodes:
-            print(f"  Limiting to top {max_nodes} nodes for performance")
+        if not from_nodes and not to_nodes:
+            self.canvas.create_text(
+                x_offset + self.cell_width * self.zoom_level // 2,
+                y_offset + 80 * self.zoom_level,
+                text="No nodes at these ranks",
+                font=("Arial", int(10 * detail_zoom)),
+                fill="#999999",
+                tags=cell_tag
+            )
+            return None
         
         # Node positions
-        from_positions = {}
-        to_positions = {}
-        
-        # FROM nodes
-        y = y_offset + 60 * self.zoom_level
-        for node in from_nodes:
-            from_positions[node] = y
-            y += scaled_node_height + scaled_node_spacing
-        
-        # TO nodes
-        y = y_offset + 60 * self.zoom_level
-        for node in to_nodes:
-            to_positions[node] = y
-            y += scaled_node_height + scaled_node_spacing
+        from_positions = layout['from_positions']
+        to_positions = layout['to_positions']
         
         # Debug: Print connection info
         total_connections = sum(data['connections'].values())
@@ -3473,23 +3564,31 @@ class MultiFileNetworkVisualizer:
         selected_from = self.selected_items.get(file_idx, {}).get('from', set())
         selected_to = self.selected_items.get(file_idx, {}).get('to', set())
         
-        # Draw lines with highlighting (limit for performance)
-        connections_to_draw = list(data['connections'].items())
+        # Draw lines with highlighting (top lines between the page nodes)
+        connections_to_draw = page_network['lines']
         
-        # For large networks, limit the number of lines drawn
-        max_lines = 500  # Reduced to 500 lines for better performance
-        if len(connections_to_draw) > max_lines:
-            # Sort by count and take top connections
-            connections_to_draw.sort(key=lambda x: x[1], reverse=True)
-            connections_to_draw = connections_to_draw[:max_lines]
-            print(f"  Limiting to top {max_lines} connections for performance")
+        # Note how much of the network is not on screen
+        if page_network['hidden_nodes'] or page_network['hidden_lines']:
+            self.canvas.create_text(
+                left_x,
+                layout['note_y'],
+                text=f"{page_network['hidden_nodes']} nodes and {page_network['hidden_lines']} lines hidden",
+                font=("Arial", max(6, int(8 * detail_zoom))),
+                fill="#999999", anchor="w",
+                tags=cell_tag
+            )
+        
+        # Low detail: one aggregate stroke per FROM node instead of every line
+        if not show_labels:
+            connections_to_draw = []
+            self.draw_aggregate_strokes(data, from_positions, to_positions, left_x + scaled_node_width,
+                                        right_x, scaled_node_height, detail_zoom, cell_tag)
         
-        lines_drawn = 0
         for (from_node, to_node), count in connections_to_draw:
             if from_node in from_positions and to_node in to_positions:
                 # Use absolute line width grading
                 base_width = self.get_line_width_by_count(count)
-                width = base_width * self.zoom_level
+                width = base_width * detail_zoom
                 
                 # Debug: Print line info for first few connections
                 if len(data['connections']) <= 5:  # Only for files with few connections
@@ -3500,83 +3599,288 @@ class MultiFileNetworkVisualizer:
                 x2 = right_x
                 y2 = to_positions[to_node] + scaled_node_height // 2
                 
-                # Determine line color
-                line_color = self.line_color
+                # Determine line color (graph diff colours lines by change)
+                line_color = self.get_edge_color(data, (from_node, to_node))
+                dash = (4, 2) if line_color == self.diff_line_colors['vanished'] else None
                 if from_node in selected_from and to_node in selected_to:
                     line_color = self.highlight_line_color
                     # For selected lines, ensure minimum width of 2 pixels
-                    width = max(width, 2 * self.zoom_level)
+                    width = max(width, 2 * detail_zoom)
                 
-                self.canvas.create_line(x1, y1, x2, y2, 
-                                       fill=line_color, width=width)
-                lines_drawn += 1
+                # Playback colours lines by their count in the time window
+                if self.playback is not None:
+                    style = self.get_playback_line_style(file_idx, (from_node, to_node))
+                    line_color, width = style['fill'], style['width']
                 
-                # Update UI every 50 lines for large networks
-                if lines_drawn % 50 == 0:
-                    self.root.update_idletasks()
+                line = self.canvas.create_line(x1, y1, x2, y2, 
+                                       fill=line_color, width=width, dash=dash,
+                                       tags=(cell_tag, self.edge_tag(file_idx, from_node, to_node)))
+                if self.playback is not None:
+                    self.playback['items'][(file_idx, (from_node, to_node))] = line
         
         # Draw nodes
         for node, y in from_positions.items():
             self.draw_node(node, left_x, y, data['from_counts'][node], 
                          True, scaled_node_width, scaled_node_height, 
-                         font_size, file_idx, node in selected_from)
+                         font_size, file_idx, node in selected_from, cell_tag, show_labels)
         
         for node, y in to_positions.items():
             self.draw_node(node, right_x, y, data['to_counts'][node], 
                          False, scaled_node_width, scaled_node_height, 
-                         font_size, file_idx, node in selected_to)
+                         font_size, file_idx, node in selected_to, cell_tag, show_labels)
+        
+        # Layout index for click hit-testing (node tops are ascending)
+        counter_width = 60 * self.zoom_level
+        return {
+            'node_height': scaled_node_height,
+            'from': {'x0': left_x - counter_width, 'x1': left_x + scaled_node_width,
+                     'ids': list(from_positions), 'tops': list(from_positions.values())},
+            'to': {'x0': right_x, 'x1': right_x + scaled_node_width + counter_width,
+                   'ids': list(to_positions), 'tops': list(to_positions.values())}
+        }
+    
+    def layout_network_cell(self, data, x_offset, y_offset, zoom):
+        """Column positions and node tops of a cell's rank page (shared by the canvas and SVG export)"""
+        page_network = self.get_page_network(data)
+        left_x = x_offset + 50 * zoom
+        node_pitch = (self.node_height + self.node_spacing) * zoom
+        top = y_offset + 60 * zoom
+        rows = max(len(page_network['from_nodes']), len(page_network['to_nodes']))
+        return {
+            'page': page_network,
+            'left_x': left_x,
+            'right_x': left_x + self.column_distance * zoom,
+            'from_positions': {node: top + i * node_pitch for i, node in enumerate(page_network['from_nodes'])},
+            'to_positions': {node: top + i * node_pitch for i, node in enumerate(page_network['to_nodes'])},
+            'note_y': top + rows * node_pitch + self.node_height * zoom // 2
+        }
+    
+    def get_top_k(self):
+        """Nodes per column on one rank page"""
+        try:
+            return max(1, int(self.top_k_var.get()))
+        except ValueError:
+            return 50
+    
+    def count_page_nodes(self, total):
+        """How many of `total` nodes fall on the current rank page"""
+        k = self.get_top_k()
+        return max(0, min(k, total - self.top_k_page * k))
+    
+    def get_ranked_nodes(self, data, column, count):
+        """At least `count` top nodes of a column by the current metric - heapq.nlargest, cached on the dataset"""
+        counts = data[f'{column}_counts']
+        metric = self.get_rank_metric()
+        ranking = data.setdefault('node_ranking', {})
+        ranked = ranking.get((metric, column))
+        
+        # Deeper pages extend the ranking by doubling, earlier pages reuse it
+        if ranked is None or (len(ranked) < count and len(ranked) < len(counts)):
+            depth = max(count, 2 * len(ranked)) if ranked else count
+            key = counts.get if metric == "Count" else self.global_graph.ranking_key(metric)
+            ranked = heapq.nlargest(depth, counts, key=key)
+            ranking[(metric, column)] = ranked
+        return ranked
+    
+    def get_page_network(self, data):
+        """Nodes and top lines of the current rank page (cached per dataset, K and page)"""
+        k = self.get_top_k()
+        page_cache = data.setdefault('rank_pages', {})
+        key = (self.get_rank_metric(), k, self.top_k_page)
+        if key in page_cache:
+            return page_cache[key]
+        
+        start = self.top_k_page * k
+        end = start + k
+        from_nodes = self.get_ranked_nodes(data, 'from', end)[start:end]
+        to_nodes = self.get_ranked_nodes(data, 'to', end)[start:end]
+        
+        # Lines between page nodes, found through the adjacency of the FROM side
+        to_set = set(to_nodes)
+        lines = [((from_node, to_node), count)
+                 for from_node in from_nodes
+                 for to_node, count in data['from_adjacency'].get(from_node, ())
+                 if to_node in to_set]
+        max_lines = k * self.lines_per_node
+        if len(lines) > max_lines:
+            lines = heapq.nlargest(max_lines, lines, key=lambda x: x[1])
+        
+        page_network = {
+            'from_nodes': from_nodes,
+            'to_nodes': to_nodes,
+            'lines': lines,
+            'hidden_nodes': (len(data['from_counts']) + len(data['to_counts'])
+                             - len(from_nodes) - len(to_nodes)),
+            'hidden_lines': len(data['connections']) - len(lines)
+        }
+        page_cache[key] = page_network
+        return page_network
+    
+    def needs_global_graph(self):
+        return self.rank_metric_var.get() != "Count" or self.node_color_var.get() != "None"
+    
+    def get_global_graph(self):
+        """Analysed global graph of the current data version, None while it is being built"""
+        if self.global_graph is not None and self.global_graph.version == self.data_version:
+            return self.global_graph
+        return None
+    
+    def get_rank_metric(self):
+        """Ranking metric in effect - counts until the global graph is ready"""
+        metric = self.rank_metric_var.get()
+        if metric != "Count" and self.get_global_graph() is None:
+            return "Count"
+        return metric
+    
+    def get_node_fill(self, node_id, is_selected, file_idx=None, is_from=True):
+        """Node background: selection first, then graph diff, then the community/component colour"""
+        if is_selected:
+            return self.selected_bg
+        diff = self.get_diff(file_idx)
+        if diff is not None:
+            status = diff['from' if is_from else 'to'].get(node_id)
+            return self.diff_node_colors[status] if status else self.node_bg
+        kind = self.node_color_var.get()
+        graph = self.get_global_graph()
+        if kind != "None" and graph is not None:
+            return graph.group_color(kind, node_id) or self.node_bg
+        return self.node_bg
+    
+    def build_global_graph(self):
+        """Build and analyse the graph of all loaded files in the background"""
+        if self.global_graph_pending == self.data_version:
+            return
+        file_data = list(self.file_data)
+        version = self.global_graph_pending = self.data_version
+        started = time.perf_counter()
+        
+        def store(graph):
+            self.global_graph = graph
+            self.global_graph_pending = None
+            print(f"Global graph: {len(graph.node_ids)} nodes, {len(graph.weights)} edges, "
+                  f"{graph.count_groups('Component')} components, {graph.count_groups('Community')} communities "
+                  f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+            if self.needs_global_graph():
+                self.draw_all_networks()
+        
+        def fail(error):
+            self.global_graph_pending = None
+            messagebox.showerror("Graph Error", f"Failed to analyse the global graph:\n{error}")
+        
+        self.scheduler.submit('global_graph',
+                              lambda token: GlobalGraph(file_data, version).analyze(token),
+                              store, fail)
+    
+    def on_graph_view_changed(self, event=None):
+        """Order/colour combobox changed"""
+        if self.needs_global_graph() and not IGRAPH_AVAILABLE:
+            messagebox.showerror("Graph Error", 
+                            "python-igraph library is not installed.\n"
+                            "Install it with: pip install igraph")
+            self.rank_metric_var.set("Count")
+            self.node_color_var.set("None")
+            return
+        
+        self.top_k_page = 0
+        self.update_top_k_label()
+        
+        if self.needs_global_graph() and self.get_global_graph() is None:
+            # Drawn again when the graph is ready
+            if self.file_data:
+                self.build_global_graph()
+            return
+        self.draw_all_networks()
+    
+    def on_top_k_changed(self, event=None):
+        """New K - back to the first rank page"""
+        self.top_k_page = 0
+        self.update_top_k_label()
+        self.draw_all_networks()
+    
+    def change_top_k_page(self, delta):
+        """Show the previous/next K ranks of every column"""
+        k = self.get_top_k()
+        data_list = self.filtered_file_data if self.filtered_file_data else self.file_data
+        largest = max((max(len(data['from_counts']), len(data['to_counts'])) for data in data_list), default=0)
+        last_page = max(0, (largest - 1) // k)
+        
+        page = min(max(0, self.top_k_page + delta), last_page)
+        if page != self.top_k_page:
+            self.top_k_page = page
+            self.update_top_k_label()
+            self.draw_all_networks()
+    
+    def update_top_k_label(self):
+        k = self.get_top_k()
+        start = self.top_k_page * k
+        self.top_k_label.config(text=f"Ranks {start + 1}–{start + k}")
     
-    def draw_node(self, node_id, x, y, count, is_from, width, height, font_size, file_idx, is_selected):
+    def draw_aggregate_strokes(self, data, from_positions, to_positions, x1, x2, node_height, detail_zoom, cell_tag):
+        """Low detail edges: FROM node to count-weighted mean of its TO nodes"""
+        totals = defaultdict(int)
+        weighted_y = defaultdict(float)
+        for from_node in from_positions:
+            for to_node, count in data['from_adjacency'].get(from_node, ()):
+                if to_node in to_positions:
+                    totals[from_node] += count
+                    weighted_y[from_node] += count * to_positions[to_node]
+        
+        for from_node, total in totals.items():
+            self.canvas.create_line(x1, from_positions[from_node] + node_height // 2,
+                                    x2, weighted_y[from_node] / total + node_height // 2,
+                                    fill=self.line_color,
+                                    width=self.get_line_width_by_count(total) * detail_zoom,
+                                    tags=cell_tag)
+    
+    def draw_node(self, node_id, x, y, count, is_from, width, height, font_size, file_idx, is_selected, cell_tag="", show_labels=True):
         """Draw node with highlighting"""
         formatted_id = str(node_id).rjust(8)
         
         # Background color depending on selection
-        bg_color = self.selected_bg if is_selected else self.node_bg
+        bg_color = self.get_node_fill(node_id, is_selected, file_idx, is_from)
         
-        # Node rectangle
+        # Node rectangle (tagged per node so selection can recolour it in place)
         rect = self.canvas.create_rectangle(x, y, x + width, y + height,
                                           fill=bg_color, outline=self.node_border,
-                                          width=max(1, self.zoom_level),
-                                          tags="node")
+                                          width=max(1, self.get_lod_zoom()),
+                                          tags=("node", cell_tag, self.node_tag(file_idx, node_id, is_from)))
         
         # Save rectangle ID
         self.node_rectangles[(file_idx, node_id, is_from)] = rect
         
+        # Labels and counters are hidden at the lowest detail tier
+        if not show_labels:
+            return
+        
         # Node text
-        text = self.canvas.create_text(x + width // 2, y + height // 2,
-                                      text=formatted_id, font=("Courier", font_size),
-                                      fill=self.text_color,
-                                      tags="node")
+        self.canvas.create_text(x + width // 2, y + height // 2,
+                                text=formatted_id, font=("Courier", font_size),
+                                fill=self.text_color,
+                                tags=("node", cell_tag))
         
         # Counter
         if is_from:
-            count_text = self.canvas.create_text(x - 10 * self.zoom_level, y + height // 2,
-                                                text=f"[{count}]", font=("Courier", font_size),
-                                                fill=self.count_color, anchor="e",
-                                                tags="node")
+            self.canvas.create_text(x - 10 * self.zoom_level, y + height // 2,
+                                    text=f"[{count}]", font=("Courier", font_size),
+                                    fill=self.count_color, anchor="e",
+                                    tags=("node", cell_tag))
         else:
-            count_text = self.canvas.create_text(x + width + 10 * self.zoom_level, y + height // 2,
-                                                text=f"[{count}]", font=("Courier", font_size),
-                                                fill=self.count_color, anchor="w",
-                                                tags="node")
-        
-        # Mouse events
-        for item in [rect, text, count_text]:
-            self.canvas.tag_bind(item, "<Button-1>",
-                               lambda e, nid=node_id, fidx=file_idx, is_f=is_from: 
-                               self.on_node_left_click(nid, is_f, fidx))
-            self.canvas.tag_bind(item, "<Button-3>",
-                               lambda e, nid=node_id, fidx=file_idx, is_f=is_from: 
-                               self.on_node_right_click(nid, is_f, fidx))
-            self.canvas.tag_bind(item, "<Control-Button-1>",
-                               lambda e, nid=node_id, fidx=file_idx, is_f=is_from: 
-                               self.on_node_ctrl_click(nid, is_f, fidx))
+            self.canvas.create_text(x + width + 10 * self.zoom_level, y + height // 2,
+                                    text=f"[{count}]", font=("Courier", font_size),
+                                    fill=self.count_color, anchor="w",
+                                    tags=("node", cell_tag))
+        
+        # Mouse events are dispatched by the canvas (find_node_at), no per-item bindings
     
     def on_node_left_click(self, node_id, is_from, file_idx):
         """Left click on node - select and copy connections"""
         # Stop canvas dragging when clicking on node
         self.canvas_drag_data["dragging"] = False
         
+        # Remember previous selection for incremental highlighting
+        old_from = set(self.selected_items[file_idx]['from'])
+        old_to = set(self.selected_items[file_idx]['to'])
+        
         # Clear selection for this file
         self.selected_items[file_idx]['from'].clear()
         self.selected_items[file_idx]['to'].clear()
@@ -3587,22 +3891,20 @@ class MultiFileNetworkVisualizer:
         if is_from:
             self.selected_items[file_idx]['from'].add(node_id)
             # Select all TO nodes connected to this FROM
-            for (from_n, to_n), count in data['connections'].items():
-                if from_n == node_id:
-                    self.selected_items[file_idx]['to'].add(to_n)
+            for to_n, count in data['from_adjacency'].get(node_id, ()):
+                self.selected_items[file_idx]['to'].add(to_n)
         else:
             self.selected_items[file_idx]['to'].add(node_id)
             # Select all FROM nodes connected to this TO
-            for (from_n, to_n), count in data['connections'].items():
-                if to_n == node_id:
-                    self.selected_items[file_idx]['from'].add(from_n)
+            for from_n, count in data['to_adjacency'].get(node_id, ()):
+                self.selected_items[file_idx]['from'].add(from_n)
         
         # Copy connections
         connections_text = self.get_selected_connections_text(file_idx)
         self.copy_to_clipboard(connections_text)
         
-        # Redraw
-        self.draw_all_networks()
+        # Recolour only the changed nodes and lines
+        self.update_selection_highlight(file_idx, old_from, old_to)
     
     def on_node_right_click(self, node_id, is_from, file_idx):
         """Right click on node - same as left click"""
@@ -3613,6 +3915,9 @@ class MultiFileNetworkVisualizer:
         # Stop canvas dragging when clicking on node
         self.canvas_drag_data["dragging"] = False
         
+        old_from = set(self.selected_items[file_idx]['from'])
+        old_to = set(self.selected_items[file_idx]['to'])
+        
         if is_from:
             if node_id in self.selected_items[file_idx]['from']:
                 self.selected_items[file_idx]['from'].remove(node_id)
@@ -3629,7 +3934,59 @@ class MultiFileNetworkVisualizer:
             connections_text = self.get_selected_connections_text(file_idx)
             self.copy_to_clipboard(connections_text)
         
-        self.draw_all_networks()
+        self.update_selection_highlight(file_idx, old_from, old_to)
+    
+    def node_tag(self, file_idx, node_id, is_from):
+        """Canvas tag of a node rectangle"""
+        return f"node_{file_idx}_{'from' if is_from else 'to'}_{node_id}"
+    
+    def edge_tag(self, file_idx, from_node, to_node):
+        """Canvas tag of a connection line"""
+        return f"edge_{file_idx}_{from_node}_{to_node}"
+    
+    def update_selection_highlight(self, file_idx, old_from, old_to):
+        """Recolour nodes and lines whose selection state changed"""
+        selected_from = self.selected_items[file_idx]['from']
+        selected_to = self.selected_items[file_idx]['to']
+        
+        # Nodes (items of cells outside the viewport simply don't exist)
+        for node_id in old_from ^ selected_from:
+            fill = self.get_node_fill(node_id, node_id in selected_from, file_idx, True)
+            self.canvas.itemconfigure(self.node_tag(file_idx, node_id, True), fill=fill)
+        for node_id in old_to ^ selected_to:
+            fill = self.get_node_fill(node_id, node_id in selected_to, file_idx, False)
+            self.canvas.itemconfigure(self.node_tag(file_idx, node_id, False), fill=fill)
+        
+        # Lines are highlighted when both ends are selected - only lines at changed nodes can change
+        data = self.filtered_file_data[file_idx] if len(self.filtered_file_data) > 0 else self.file_data[file_idx]
+        changed_edges = {}
+        for from_node in old_from ^ selected_from:
+            for to_node, count in data['from_adjacency'].get(from_node, ()):
+                changed_edges[(from_node, to_node)] = count
+        for to_node in old_to ^ selected_to:
+            for from_node, count in data['to_adjacency'].get(to_node, ()):
+                changed_edges[(from_node, to_node)] = count
+        
+        for (from_node, to_node), count in changed_edges.items():
+            was_selected = from_node in old_from and to_node in old_to
+            is_selected = from_node in selected_from and to_node in selected_to
+            if was_selected == is_selected:
+                continue
+            
+            # Playback styles lines by the time window, selection doesn't change them
+            if self.playback is not None:
+                self.canvas.itemconfigure(self.edge_tag(file_idx, from_node, to_node),
+                                          **self.get_playback_line_style(file_idx, (from_node, to_node)))
+                continue
+            
+            width = self.get_line_width_by_count(count) * self.get_lod_zoom()
+            if is_selected:
+                self.canvas.itemconfigure(self.edge_tag(file_idx, from_node, to_node),
+                                          fill=self.highlight_line_color,
+                                          width=max(width, 2 * self.get_lod_zoom()))
+            else:
+                self.canvas.itemconfigure(self.edge_tag(file_idx, from_node, to_node),
+                                          fill=self.get_edge_color(data, (from_node, to_node)), width=width)
     
     def get_selected_connections_text(self, file_idx):
         """Format selected connections (from working code)"""
@@ -3647,9 +4004,9 @@ class MultiFileNetworkVisualizer:
             to_node = list(selected_to)[0]
             
             selected_connections = []
-            for (from_node, to_n), count in data['connections'].items():
-                if to_n == to_node and from_node in selected_from:
-                    selected_connections.append((from_node, to_n, count))
+            for from_node, count in data['to_adjacency'].get(to_node, ()):
+                if from_node in selected_from:
+                    selected_connections.append((from_node, to_node, count))
             
             selected_connections.sort(key=lambda x: (-x[2], x[0]))
             
@@ -3666,10 +4023,18 @@ class MultiFileNetworkVisualizer:
                 else:
                     lines.append(f"{count_str}  {from_str}    {''.ljust(8)}    ")
         else:
+            # Walk the edges of the smaller selected side
             selected_connections = []
-            for (from_node, to_node), count in data['connections'].items():
-                if from_node in selected_from and to_node in selected_to:
-                    selected_connections.append((from_node, to_node, count))
+            if len(selected_from) <= len(selected_to):
+                for from_node in selected_from:
+                    for to_node, count in data['from_adjacency'].get(from_node, ()):
+                        if to_node in selected_to:
+                            selected_connections.append((from_node, to_node, count))
+            else:
+                for to_node in selected_to:
+                    for from_node, count in data['to_adjacency'].get(to_node, ()):
+                        if from_node in selected_from:
+                            selected_connections.append((from_node, to_node, count))
             
             selected_connections.sort(key=lambda x: (x[0], x[1]))
             
@@ -3721,25 +4086,508 @@ class MultiFileNetworkVisualizer:
     def zoom_in(self):
         """Increase zoom"""
         if self.zoom_level < self.max_zoom:
-            self.zoom_level += self.zoom_step
-            self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
-            self.draw_all_networks()
+            self.set_zoom(self.zoom_level + self.zoom_step)
     
     def zoom_out(self):
         """Decrease zoom"""
         if self.zoom_level > self.min_zoom:
-            self.zoom_level -= self.zoom_step
-            self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
-            self.draw_all_networks()
+            self.set_zoom(self.zoom_level - self.zoom_step)
     
     def zoom_reset(self):
         """Reset zoom"""
-        self.zoom_level = 1.0
-        self.zoom_label.config(text="100%")
+        self.set_zoom(1.0)
+    
+    def get_lod_tier(self, zoom=None):
+        """Level of detail tier for a zoom level"""
+        return bisect.bisect_right(self.lod_thresholds, self.zoom_level if zoom is None else zoom)
+    
+    def get_lod_zoom(self):
+        """Zoom used for fonts and line widths in the current tier"""
+        return self.lod_detail_zoom[self.get_lod_tier()]
+    
+    def set_zoom(self, new_zoom):
+        """Zoom by scaling existing items, recreate them only when the LOD tier changes"""
+        old_zoom = self.zoom_level
+        self.zoom_level = new_zoom
+        self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
+        
+        if not self.network_cells or self.get_lod_tier(old_zoom) != self.get_lod_tier(new_zoom):
+            self.draw_all_networks()
+            return
+        
+        # Same tier - fonts and widths stay, only geometry scales
+        factor = new_zoom / old_zoom
+        self.canvas.scale("all", 0, 0, factor, factor)
+        
+        grid = self.network_grid
+        grid['padding'] *= factor
+        grid['col_width'] *= factor
+        grid['row_tops'] = [top * factor for top in grid['row_tops']]
+        grid['size'] = (grid['size'][0] * factor, grid['size'][1] * factor)
+        
+        for cell in self.network_cells:
+            for key in ('x', 'y', 'width', 'height'):
+                cell[key] *= factor
+            node_index = cell.get('node_index')
+            if node_index:
+                node_index['node_height'] *= factor
+                for column in (node_index['from'], node_index['to']):
+                    column['x0'] *= factor
+                    column['x1'] *= factor
+                    column['tops'] = [top * factor for top in column['tops']]
+        
+        self.canvas.configure(scrollregion=(0, 0, grid['size'][0], grid['size'][1]))
+        self.render_visible_networks()
+    
+    def get_diff(self, file_idx):
+        """Graph diff of a shown file, None outside compare mode"""
+        if file_idx is None or file_idx >= len(self.filtered_file_data):
+            return None
+        return self.filtered_file_data[file_idx].get('diff')
+    
+    def get_edge_color(self, data, edge):
+        """Normal line colour, or the graph diff colour of the edge"""
+        diff = data.get('diff')
+        if diff is not None and edge in diff['edges']:
+            return self.diff_line_colors[diff['edges'][edge]]
+        return self.line_color
+    
+    def get_edge_codes(self, data):
+        """Integer code of every edge of a loaded file: ({edge: code}, [edge by code]), cached"""
+        codes = data.get('edge_codes')
+        if codes is None:
+            edges = list(data['connections'])
+            codes = data['edge_codes'] = ({edge: code for code, edge in enumerate(edges)}, edges)
+        return codes
+    
+    def open_diff_window(self):
+        """Compare two date ranges: new, vanished and strongly changed edges and nodes"""
+        if self.diff_window is not None and self.diff_window.winfo_exists():
+            self.diff_window.lift()
+            return
+        
+        # По умолчанию: "после" = текущий фильтр, "до" = такой же отрезок перед ним
+        after_from = self.parse_date(self.date_from_var.get())
+        after_to = self.parse_date(self.date_to_var.get())
+        if not after_from or not after_to:
+            after_to = datetime.now().replace(microsecond=0)
+            after_from = after_to - timedelta(days=7)
+        before_to = after_from - timedelta(seconds=1)
+        before_from = before_to - (after_to - after_from)
+        
+        date_format = "%d/%m/%y %H:%M:%S"
+        self.diff_vars = {
+            'before_from': tk.StringVar(value=before_from.strftime(date_format)),
+            'before_to': tk.StringVar(value=before_to.strftime(date_format)),
+            'after_from': tk.StringVar(value=after_from.strftime(date_format)),
+            'after_to': tk.StringVar(value=after_to.strftime(date_format)),
+            'factor': tk.StringVar(value="2"),
+            'min_change': tk.StringVar(value="5"),
+        }
+        
+        window = self.diff_window = tk.Toplevel(self.root)
+        window.title("Compare Date Ranges")
+        window.geometry("460x330")
+        window.transient(self.root)
+        
+        main_frame = tk.Frame(window, bg="#f5f5f5")
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        for title, prefix in (("Before", 'before'), ("After", 'after')):
+            tk.Label(main_frame, text=title, bg="#f5f5f5", font=("Arial", 10, "bold")).pack(anchor="w")
+            for label, suffix in (("From:", '_from'), ("To:", '_to')):
+                row = tk.Frame(main_frame, bg="#f5f5f5")
+                row.pack(fill=tk.X, pady=2)
+                tk.Label(row, text=label, bg="#f5f5f5", font=("Arial", 9), width=5).pack(side=tk.LEFT)
+                DateMaskEntry(row, textvariable=self.diff_vars[prefix + suffix], bg="#f5f5f5").pack(side=tk.LEFT, padx=(5, 0))
+        
+        threshold_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        threshold_frame.pack(fill=tk.X, pady=(10, 0))
+        tk.Label(threshold_frame, text="Changed if ×", bg="#f5f5f5", font=("Arial", 9)).pack(side=tk.LEFT)
+        tk.Entry(threshold_frame, textvariable=self.diff_vars['factor'], width=5).pack(side=tk.LEFT)
+        tk.Label(threshold_frame, text="and by at least", bg="#f5f5f5", font=("Arial", 9)).pack(side=tk.LEFT, padx=(5, 0))
+        tk.Entry(threshold_frame, textvariable=self.diff_vars['min_change'], width=5).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Legend
+        legend_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        legend_frame.pack(fill=tk.X, pady=(10, 0))
+        for status, text in (('new', "new"), ('vanished', "vanished"), ('up', "grew"), ('down', "dropped")):
+            tk.Label(legend_frame, text=f"━ {text}", fg=self.diff_line_colors[status], bg="#f5f5f5",
+                     font=("Arial", 9, "bold")).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.diff_status = tk.Label(main_frame, text="", bg="#f5f5f5", fg="#606060", font=("Arial", 9))
+        self.diff_status.pack(fill=tk.X, pady=(10, 0))
+        
+        button_frame = tk.Frame(main_frame, bg="#f5f5f5")
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        tk.Button(button_frame, text="COMPARE", command=self.run_graph_diff,
+                 bg="#4CAF50", fg="white", font=("Arial", 10, "bold")).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=(0, 5))
+        tk.Button(button_frame, text="CLEAR", command=self.clear_graph_diff,
+                 bg="#f44336", fg="white", font=("Arial", 10, "bold")).pack(side=tk.LEFT, expand=True, fill=tk.X)
+    
+    def run_graph_diff(self):
+        """Read the compare window and diff the two ranges in a background job"""
+        ranges = []
+        for prefix in ('before', 'after'):
+            date_from = self.parse_date(self.diff_vars[prefix + '_from'].get())
+            date_to = self.parse_date(self.diff_vars[prefix + '_to'].get())
+            if not date_from or not date_to:
+                self.diff_status.config(text="Invalid date format", fg="red")
+                return
+            ranges.append((date_from, date_to))
+        
+        try:
+            factor = max(1.0, float(self.diff_vars['factor'].get()))
+            min_change = max(1, int(self.diff_vars['min_change'].get()))
+        except ValueError:
+            self.diff_status.config(text="Invalid change threshold", fg="red")
+            return
+        
+        settings = {
+            'before': ranges[0],
+            'after': ranges[1],
+            'factor': factor,
+            'min_change': min_change,
+            'from_ids': set(self.selected_from_ids),
+            'to_ids': set(self.selected_to_ids),
+            'started': time.perf_counter(),
+        }
+        self.diff_status.config(text="Comparing...", fg="#606060")
+        
+        # Same channel as filtering: whichever runs last owns filtered_file_data
+        self.scheduler.submit(
+            'filter',
+            lambda token: self.compute_graph_diff(settings, token),
+            lambda result: self.show_graph_diff(settings, result),
+            lambda error: self.diff_status.config(text=f"Error comparing: {error}", fg="red")
+        )
+    
+    def compute_graph_diff(self, settings, token=None):
+        """Diff two date windows of every file from hourly buckets over integer edge codes (worker, no Tk calls)"""
+        from_ids = settings['from_ids']
+        to_ids = settings['to_ids']
+        factor = settings['factor']
+        min_change = settings['min_change']
+        
+        diff_file_data = []
+        totals = defaultdict(int)
+        
+        for data in self.file_data:
+            if token:
+                token.check()
+            
+            code_of, edges = self.get_edge_codes(data)
+            window_counts = []
+            for date_from, date_to in (settings['before'], settings['after']):
+                window_counts.append({
+                    code_of[edge]: count
+                    for edge, count in self.count_window_edges(data, date_from, date_to).items()
+                    if count and (not from_ids or edge[0] in from_ids) and (not to_ids or edge[1] in to_ids)
+                })
+            before, after = window_counts
+            
+            # Множества кодов рёбер - операции над int-ключами словарей
+            status = dict.fromkeys(after.keys() - before.keys(), 'new')
+            status.update(dict.fromkeys(before.keys() - after.keys(), 'vanished'))
+            for code in before.keys() & after.keys():
+                old, new = before[code], after[code]
+                if abs(new - old) >= min_change and max(old, new) >= factor * min(old, new):
+                    status[code] = 'up' if new > old else 'down'
+            
+            # Shown network: "after" counts, vanished edges keep their "before" counts
+            connections = {edges[code]: count for code, count in before.items()}
+            connections.update((edges[code], count) for code, count in after.items())
+            from_counts = defaultdict(int)
+            to_counts = defaultdict(int)
+            for (from_id, to_id), count in connections.items():
+                from_counts[from_id] += count
+                to_counts[to_id] += count
+            
+            node_status = {}
+            for side, position in (('from', 0), ('to', 1)):
+                nodes_before = {edges[code][position] for code in before}
+                nodes_after = {edges[code][position] for code in after}
+                node_status[side] = dict.fromkeys(nodes_after - nodes_before, 'new')
+                node_status[side].update(dict.fromkeys(nodes_before - nodes_after, 'vanished'))
+            
+            edge_status = {edges[code]: value for code, value in status.items()}
+            for value in edge_status.values():
+                totals[value] += 1
+            totals['new_nodes'] += sum(1 for side in node_status.values() for value in side.values() if value == 'new')
+            totals['vanished_nodes'] += sum(1 for side in node_status.values() for value in side.values() if value == 'vanished')
+            
+            from_adjacency, to_adjacency = self.build_adjacency(connections)
+            diff_file_data.append({
+                'dataset_id': data['dataset_id'],
+                'file_path': data['file_path'],
+                'filename': data['filename'],
+                'frequency': data['frequency'],
+                'connections': connections,
+                'from_counts': dict(from_counts),
+                'to_counts': dict(to_counts),
+                'from_adjacency': from_adjacency,
+                'to_adjacency': to_adjacency,
+                'connection_dates': {},
+                'connection_details': {},
+                'diff': {'edges': edge_status, 'from': node_status['from'], 'to': node_status['to']}
+            })
+        
+        return diff_file_data, dict(totals)
+    
+    def show_graph_diff(self, settings, result):
+        """Show the diff networks and a summary (main thread)"""
+        self.filtered_file_data, totals = result
+        latency_ms = (time.perf_counter() - settings['started']) * 1000
+        
+        summary = (f"Edges: +{totals.get('new', 0)} new, −{totals.get('vanished', 0)} vanished, "
+                   f"{totals.get('up', 0)} grew, {totals.get('down', 0)} dropped · "
+                   f"Nodes: +{totals.get('new_nodes', 0)} −{totals.get('vanished_nodes', 0)} · {latency_ms:.0f} ms")
+        print(f"Graph diff: {summary}")
+        if self.diff_window is not None and self.diff_window.winfo_exists():
+            self.diff_status.config(text=summary, fg="#000080")
+        self.filter_status.config(text="Comparing date ranges", fg="#000080")
+        
+        self.top_k_page = 0
+        self.update_top_k_label()
+        self.draw_all_networks(use_filtered=True)
+    
+    def clear_graph_diff(self):
+        """Back to the normal filtered view"""
+        if self.diff_window is not None and self.diff_window.winfo_exists():
+            self.diff_window.destroy()
+        self.diff_window = None
+        self.apply_filters()
+    
+    def get_edge_events(self, file_idx):
+        """Time-sorted connection events (times, edges) of a loaded file, cached on the dataset"""
+        data = self.file_data[file_idx]
+        events = data.get('edge_events')
+        if events is None:
+            # Hourly buckets are already in order, only records inside an hour need sorting
+            records = []
+            for hour_records in data['time_buckets']['records']:
+                records.extend(sorted(hour_records, key=lambda record: record[0]))
+            times = array('d', (record[0].timestamp() for record in records))
+            edges = [(record[1], record[2]) for record in records]
+            events = data['edge_events'] = (times, edges)
+        return events
+    
+    def open_playback(self):
+        """Playback window: scrub or play a sliding time window over the shown networks"""
+        if self.playback_window is not None and self.playback_window.winfo_exists():
+            self.playback_window.lift()
+            return
+        
+        datasets = {}
+        for data in self.get_datasets_to_draw():
+            times, edges = self.get_edge_events(data['dataset_id'])
+            if times:
+                datasets[data['dataset_id']] = {'times': times, 'edges': edges, 'active': {},
+                                                'enter': 0, 'leave': 0, 'position': None, 'window': None}
+        if not datasets:
+            messagebox.showinfo("Playback", "No timestamped connections in the shown files")
+            return
+        
+        start = min(state['times'][0] for state in datasets.values())
+        end = max(state['times'][-1] for state in datasets.values())
+        self.playback = {
+            'start': start,
+            'end': end,
+            'position': start,
+            'datasets': datasets,
+            'items': {},  # (file_idx, edge) -> line item on the canvas
+            'job': None,
+        }
+        
+        window = self.playback_window = tk.Toplevel(self.root)
+        window.title("Playback")
+        window.geometry("620x170")
+        window.transient(self.root)
+        window.protocol("WM_DELETE_WINDOW", self.close_playback)
+        
+        self.playback_time_label = tk.Label(window, font=("Courier", 11, "bold"))
+        self.playback_time_label.pack(pady=(10, 0))
+        
+        self.playback_position_var = tk.DoubleVar(value=0)
+        tk.Scale(window, from_=0, to=end - start, orient=tk.HORIZONTAL, length=580,
+                 showvalue=False, variable=self.playback_position_var,
+                 command=self.on_playback_seek).pack(padx=20)
+        
+        controls = tk.Frame(window)
+        controls.pack(pady=5)
+        
+        self.playback_button = tk.Button(controls, text="▶ Play", width=8, command=self.toggle_playback)
+        self.playback_button.pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(controls, text="Window (min)").pack(side=tk.LEFT, padx=(10, 2))
+        self.playback_window_var = tk.StringVar(value="15")
+        tk.Spinbox(controls, from_=1, to=1440, width=5, textvariable=self.playback_window_var,
+                   command=self.refresh_playback).pack(side=tk.LEFT)
+        
+        tk.Label(controls, text="Step (s/frame)").pack(side=tk.LEFT, padx=(10, 2))
+        self.playback_step_var = tk.StringVar(value="60")
+        tk.Spinbox(controls, from_=1, to=3600, width=5, textvariable=self.playback_step_var).pack(side=tk.LEFT)
+        
+        self.playback_info_label = tk.Label(window, fg="#666666", font=("Arial", 9))
+        self.playback_info_label.pack()
+        
+        # Lines are redrawn in playback colours, then only changed lines are touched
+        self.set_playback_position(start)
         self.draw_all_networks()
     
+    def close_playback(self, redraw=True):
+        """Stop playback and restore normal line colours"""
+        if self.playback is not None and self.playback['job'] is not None:
+            self.root.after_cancel(self.playback['job'])
+        self.playback = None
+        if self.playback_window is not None and self.playback_window.winfo_exists():
+            self.playback_window.destroy()
+        self.playback_window = None
+        if redraw:
+            self.draw_all_networks()
+    
+    def get_playback_window_seconds(self):
+        try:
+            return max(1, float(self.playback_window_var.get())) * 60
+        except ValueError:
+            return 15 * 60
+    
+    def get_playback_step_seconds(self):
+        try:
+            return max(1, float(self.playback_step_var.get()))
+        except ValueError:
+            return 60
+    
+    def toggle_playback(self):
+        """Play/pause"""
+        playback = self.playback
+        if playback['job'] is not None:
+            self.root.after_cancel(playback['job'])
+            playback['job'] = None
+            self.playback_button.config(text="▶ Play")
+            return
+        
+        if playback['position'] >= playback['end']:
+            self.set_playback_position(playback['start'])
+        self.playback_button.config(text="⏸ Pause")
+        playback['job'] = self.root.after(self.playback_frame_ms, self.playback_tick)
+    
+    def playback_tick(self):
+        """Advance one frame"""
+        playback = self.playback
+        if playback is None:
+            return
+        
+        started = time.perf_counter()
+        position = min(playback['position'] + self.get_playback_step_seconds(), playback['end'])
+        self.set_playback_position(position)
+        
+        if position >= playback['end']:
+            playback['job'] = None
+            self.playback_button.config(text="▶ Play")
+            return
+        
+        # Frame time is subtracted so the frame rate holds while work per frame varies
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        playback['job'] = self.root.after(max(1, self.playback_frame_ms - elapsed_ms), self.playback_tick)
+    
+    def on_playback_seek(self, value):
+        """Slider moved"""
+        playback = self.playback
+        if playback is None:
+            return
+        position = playback['start'] + float(value)
+        if abs(position - playback['position']) > 1e-6:
+            self.set_playback_position(position)
+    
+    def refresh_playback(self):
+        """Window length changed - recount at the current position"""
+        if self.playback is not None:
+            self.set_playback_position(self.playback['position'])
+    
+    def set_playback_position(self, position):
+        """Move the window end to `position` and recolour lines whose count changed"""
+        playback = self.playback
+        started = time.perf_counter()
+        window = self.get_playback_window_seconds()
+        
+        changed_lines = 0
+        active_lines = 0
+        items = playback['items']
+        for file_idx, state in playback['datasets'].items():
+            for edge in self.advance_playback_state(state, position, window):
+                item = items.get((file_idx, edge))
+                if item is not None:
+                    self.canvas.itemconfigure(item, **self.get_playback_line_style(file_idx, edge))
+                    changed_lines += 1
+            active_lines += len(state['active'])
+        
+        playback['position'] = position
+        self.playback_position_var.set(position - playback['start'])
+        
+        window_from = datetime.fromtimestamp(position - window).strftime("%d/%m/%y %H:%M:%S")
+        window_to = datetime.fromtimestamp(position).strftime("%d/%m/%y %H:%M:%S")
+        self.playback_time_label.config(text=f"{window_from}  —  {window_to}")
+        self.playback_info_label.config(
+            text=f"{active_lines} connections active · {changed_lines} lines recoloured · "
+                 f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    def advance_playback_state(self, state, position, window):
+        """Slide one file's window to (position - window, position]; returns edges whose count changed"""
+        times = state['times']
+        edges = state['edges']
+        active = state['active']
+        window_start = position - window
+        changed = set()
+        
+        if state['position'] is None or position < state['position'] or window != state['window']:
+            # Назад или новое окно - пересчёт с поиском границ через bisect
+            changed.update(active)
+            active.clear()
+            state['leave'] = bisect.bisect_right(times, window_start)
+            state['enter'] = max(state['leave'], bisect.bisect_right(times, position))
+            for edge in edges[state['leave']:state['enter']]:
+                active[edge] = active.get(edge, 0) + 1
+            changed.update(active)
+        else:
+            # Вперёд - добавляем вошедшие события и вычитаем вышедшие
+            enter = state['enter']
+            while enter < len(times) and times[enter] <= position:
+                edge = edges[enter]
+                active[edge] = active.get(edge, 0) + 1
+                changed.add(edge)
+                enter += 1
+            state['enter'] = enter
+            
+            leave = state['leave']
+            while leave < enter and times[leave] <= window_start:
+                edge = edges[leave]
+                count = active[edge] - 1
+                if count:
+                    active[edge] = count
+                else:
+                    del active[edge]
+                changed.add(edge)
+                leave += 1
+            state['leave'] = leave
+        
+        state['position'] = position
+        state['window'] = window
+        return changed
+    
+    def get_playback_line_style(self, file_idx, edge):
+        """Line colour and width for the edge's count in the playback window"""
+        detail_zoom = self.get_lod_zoom()
+        state = self.playback['datasets'].get(file_idx)
+        count = state['active'].get(edge, 0) if state else 0
+        if count:
+            return {'fill': self.playback_line_color,
+                    'width': max(self.get_line_width_by_count(count), 2) * detail_zoom}
+        return {'fill': self.playback_idle_color, 'width': detail_zoom}
+    
     def refresh_all(self):
         """Refresh all data"""
+        self.scheduler.cancel('filter')
         self.load_all_data()
         self.filtered_file_data = []
         
@@ -3748,6 +4596,7 @@ class MultiFileNetworkVisualizer:
         
         # Update comboboxes
         self.update_comboboxes()
+        self.live_filter.cancel()
         
         self.filter_status.config(text="No filter applied", fg="#606060")
         self.draw_all_networks()
@@ -4,15 +4,35 @@ import csv
 from collections import defaultdict
 import math
 import os
+import time
 from datetime import datetime, timedelta
 import glob
 import configparser
+from _scheduler import BackgroundScheduler, LiveFilter
 
 try:
     from tkcalendar import Calendar
 except ImportError:
     Calendar = None
 
+# Minute histograms
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not installed. Minute histograms will use plain lists.")
+    print("Install with: pip install numpy")
+
+# Bitmap rendering of large charts
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageTk, ImageColor
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    print("Pillow not installed. Large charts will be drawn with canvas items.")
+    print("Install with: pip install pillow")
+
 # PDF export libraries
 try:
     from reportlab.lib.pagesizes import letter, A4
@@ -394,6 +414,9 @@ class HourlyActivityVisualizer:
         # Time interval for grouping sessions (in minutes)
         self.time_interval_minutes = tk.StringVar(value="60")  # Default: 60 minutes (1 hour)
         
+        # View mode: overlapping bars per day or day × time heatmap
+        self.view_mode = tk.StringVar(value="Bars")
+        
         # Print info about loaded files
         print(f"Found {len(self.file_paths)} files in directory: {self.data_directory}")
         if self.file_paths:
@@ -439,6 +462,29 @@ class HourlyActivityVisualizer:
         self.bg_color = "#ffffff"
         self.text_color = "#000000"
         
+        # Bitmap rendering (used when a chart would need too many canvas items)
+        self.bitmap_item_threshold = 20000
+        self.bitmap_tile_height = 2048
+        self.bitmap_tiles = []
+        self.bitmap_render_pending = False
+        self.bitmap_font = None
+        
+        # Heatmap images and hover lookup regions
+        self.heatmap_images = []
+        self.heatmap_regions = []
+        
+        # Background jobs (filtering)
+        self.scheduler = BackgroundScheduler(self.root)
+        
+        # Live filtering: filter widgets re-run the filter after a short pause
+        self.live_filter = LiveFilter(self.root, self.scheduler, self.apply_filters,
+                                      can_run=lambda: bool(self.file_data))
+        self.live_filter.watch(self.date_from_var, self.date_to_var,
+                               self.duration_from_var, self.duration_to_var,
+                               self.selected_event, self.selected_timeslot,
+                               self.selected_color_code, self.selected_algorithm,
+                               self.selected_key)
+        
         # Create interface
         self.setup_ui()
         
@@ -643,6 +689,12 @@ class HourlyActivityVisualizer:
                                     cursor="hand2", width=15)
         self.clear_button.pack(fill=tk.X, pady=(5, 0))
         
+        # Live mode - filter automatically when a filter value changes
+        tk.Checkbutton(apply_frame, text="Live filtering",
+                      variable=self.live_filter.enabled,
+                      command=self.live_filter.on_toggle,
+                      bg="#f5f5f5", font=("Arial", 8)).pack(anchor=tk.W, pady=(5, 0))
+        
         # Filter status
         self.filter_status = tk.Label(apply_frame, text="No filter applied",
                                     bg="#f5f5f5", fg="#606060",
@@ -693,6 +745,19 @@ class HourlyActivityVisualizer:
                                               cursor="hand2", width=15)
         self.apply_interval_button.pack(fill=tk.X)
         
+        # VIEW MODE
+        view_frame = tk.Frame(filter_content, bg="#f5f5f5")
+        view_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        tk.Label(view_frame, text="VIEW", bg="#f5f5f5", 
+                fg=self.text_color, font=("Arial", 9, "bold")).pack()
+        self.view_combo = ttk.Combobox(view_frame, textvariable=self.view_mode,
+                                     values=["Bars", "Heatmap"],
+                                     state="readonly", width=20)
+        self.view_combo.pack()
+        self.view_combo.bind("<<ComboboxSelected>>",
+                             lambda e: self.draw_hourly_visualization(use_filtered=bool(self.filtered_file_data)))
+        
         v_separator = tk.Frame(content_frame, width=1, bg="#d0d0d0")
         v_separator.pack(side=tk.LEFT, fill=tk.Y)
         
@@ -706,8 +771,9 @@ class HourlyActivityVisualizer:
         h_scroll = tk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL)
         h_scroll.pack(side=tk.BOTTOM, fill=tk.X)
         
+        self.v_scroll = v_scroll
         self.canvas = tk.Canvas(canvas_frame, bg=self.bg_color,
-                            yscrollcommand=v_scroll.set,
+                            yscrollcommand=self.on_canvas_yscroll,
                             xscrollcommand=h_scroll.set,
                             highlightthickness=0)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -731,6 +797,10 @@ class HourlyActivityVisualizer:
         self.canvas.bind("<Shift-Button-4>", lambda e: self.canvas.xview_scroll(-1, "units"))
         self.canvas.bind("<Shift-Button-5>", lambda e: self.canvas.xview_scroll(1, "units"))
         
+        # Heatmap hover
+        self.canvas.bind("<Motion>", self.on_canvas_motion)
+        self.canvas.bind("<Leave>", lambda e: self.canvas.delete("heatmap_hover"))
+        
         v_scroll.config(command=self.canvas.yview)
         h_scroll.config(command=self.canvas.xview)
 
@@ -798,6 +868,53 @@ class HourlyActivityVisualizer:
 
 
 
+    def get_interval_minutes(self):
+        """Get validated time interval in minutes"""
+        try:
+            interval_minutes = int(self.time_interval_minutes.get())
+            if interval_minutes < 1 or interval_minutes > 1440:
+                interval_minutes = 60  # Default to 60 minutes if invalid
+        except:
+            interval_minutes = 60  # Default to 60 minutes if error
+        return interval_minutes
+    
+    def build_minute_histograms(self, records):
+        """Build 1440-bin minute histogram for each day"""
+        minutes_by_date = defaultdict(list)
+        for record in records:
+            timestamp = record['timestamp']
+            if timestamp:
+                minutes_by_date[timestamp.date()].append(timestamp.hour * 60 + timestamp.minute)
+        
+        histograms = {}
+        for date, minutes in minutes_by_date.items():
+            if NUMPY_AVAILABLE:
+                histograms[date] = np.bincount(minutes, minlength=1440)
+            else:
+                histogram = [0] * 1440
+                for minute in minutes:
+                    histogram[minute] += 1
+                histograms[date] = histogram
+        return histograms
+    
+    def bin_minute_histogram(self, histogram, interval_minutes):
+        """Sum adjacent minute bins into intervals"""
+        if NUMPY_AVAILABLE:
+            return np.add.reduceat(histogram, np.arange(0, 1440, interval_minutes))
+        return [sum(histogram[start:start + interval_minutes])
+                for start in range(0, 1440, interval_minutes)]
+    
+    def get_interval_counts(self, minute_histograms, interval_minutes):
+        """Get {interval_index: count} summed over all days"""
+        if not minute_histograms:
+            return {}
+        if NUMPY_AVAILABLE:
+            combined = np.sum(list(minute_histograms.values()), axis=0)
+        else:
+            combined = [sum(column) for column in zip(*minute_histograms.values())]
+        binned = self.bin_minute_histogram(combined, interval_minutes)
+        return {idx: int(count) for idx, count in enumerate(binned) if count}
+    
     def load_all_data(self):
         """Load data from all files"""
         self.file_data.clear()
@@ -872,7 +989,6 @@ class HourlyActivityVisualizer:
     
     def load_file_data(self, file_path):
         """Load data from one file and count hourly sessions"""
-        hourly_sessions = defaultdict(int)
         all_records = []
         
         # Unique values for filters
@@ -941,20 +1057,6 @@ class HourlyActivityVisualizer:
                     timestamp_str = timestamp_str.strip('"')
                     timestamp = self.parse_timestamp(timestamp_str)
                 
-                if timestamp:
-                    # Count session in the appropriate time interval
-                    try:
-                        interval_minutes = int(self.time_interval_minutes.get())
-                        if interval_minutes < 1 or interval_minutes > 1440:
-                            interval_minutes = 60  # Default to 60 minutes if invalid
-                    except:
-                        interval_minutes = 60  # Default to 60 minutes if error
-                    
-                    # Calculate which time interval this session belongs to
-                    total_minutes = timestamp.hour * 60 + timestamp.minute
-                    interval_index = total_minutes // interval_minutes
-                    hourly_sessions[interval_index] += 1
-                
                 # Store complete record including FROM and TO
                 all_records.append({
                     'timestamp': timestamp,
@@ -969,14 +1071,19 @@ class HourlyActivityVisualizer:
                     'details': detail
                 })
             
+            # Per-day minute histograms; intervals are derived from them
+            minute_histograms = self.build_minute_histograms(all_records)
+            hourly_sessions = self.get_interval_counts(minute_histograms, self.get_interval_minutes())
+            
             # Store hourly data for this file
-            self.hourly_data_by_file[file_path] = dict(hourly_sessions)
+            self.hourly_data_by_file[file_path] = hourly_sessions
             
             return {
                 'file_path': file_path,
                 'filename': os.path.basename(file_path),
                 'frequency': frequency,
-                'hourly_sessions': dict(hourly_sessions),
+                'hourly_sessions': hourly_sessions,
+                'minute_histograms': minute_histograms,
                 'all_records': all_records,
                 'events': events,
                 'timeslots': timeslots,
@@ -1080,41 +1187,57 @@ class HourlyActivityVisualizer:
 
 
 
-    def apply_filters(self):
-        """Apply filters to data"""
-        date_from_str = self.date_from_var.get()
-        date_to_str = self.date_to_var.get()
-        
-        date_from = self.parse_date(date_from_str)
-        date_to = self.parse_date(date_to_str)
+    def get_filter_settings(self):
+        """Read filter widgets on the main thread (None if dates are invalid)"""
+        date_from = self.parse_date(self.date_from_var.get())
+        date_to = self.parse_date(self.date_to_var.get())
         
         if not date_from or not date_to:
-            self.filter_status.config(text="Invalid date format", fg="red")
-            return
+            return None
         
-        # Get filter values
+        # Convert duration from seconds to milliseconds
         duration_from = self.duration_from_var.get()
         duration_to = self.duration_to_var.get()
-        event_filter = self.selected_event.get()
-        timeslot_filter = self.selected_timeslot.get()
-        color_code_filter = self.selected_color_code.get()
-        algorithm_filter = self.selected_algorithm.get()
-        key_filter = self.selected_key.get()
-        
-        # Convert duration from seconds to milliseconds
         try:
             dur_from_ms = float(duration_from) * 1000 if duration_from else None
             dur_to_ms = float(duration_to) * 1000 if duration_to else None
         except:
             dur_from_ms = dur_to_ms = None
         
-        # Filter data
-        self.filtered_file_data = []
+        return {
+            'date_from': date_from,
+            'date_to': date_to,
+            'dur_from_ms': dur_from_ms,
+            'dur_to_ms': dur_to_ms,
+            'event': self.selected_event.get(),
+            'timeslot': self.selected_timeslot.get(),
+            'color_code': self.selected_color_code.get(),
+            'algorithm': self.selected_algorithm.get(),
+            'key': self.selected_key.get(),
+            'details': set(self.selected_details),
+            'from_ids': set(self.selected_from_ids),
+            'to_ids': set(self.selected_to_ids)
+        }
+    
+    def compute_filtered_data(self, settings, token=None):
+        """Filter records of all files with a settings snapshot (runs in a worker, no Tk calls)"""
+        date_from = settings['date_from']
+        date_to = settings['date_to']
+        dur_from_ms = settings['dur_from_ms']
+        dur_to_ms = settings['dur_to_ms']
+        from_ids = settings['from_ids']
+        to_ids = settings['to_ids']
+        details = settings['details']
+        
+        filtered_file_data = []
         total_filtered = 0
         total_sessions = 0
         
         for data in self.file_data:
-            filtered_hourly = defaultdict(int)
+            # Newer filter request supersedes this one
+            if token:
+                token.check()
+            
             filtered_records = []
             
             for record in data['all_records']:
@@ -1140,97 +1263,85 @@ class HourlyActivityVisualizer:
                         passes_filter = False
                 
                 # Filter by EVENT
-                if event_filter != 'All' and record['event'] != event_filter:
+                if settings['event'] != 'All' and record['event'] != settings['event']:
                     passes_filter = False
                 
                 # Filter by TIMESLOT
-                if timeslot_filter != 'All' and record['timeslot'] != timeslot_filter:
+                if settings['timeslot'] != 'All' and record['timeslot'] != settings['timeslot']:
                     passes_filter = False
                 
                 # Filter by COLOR_CODE
-                if color_code_filter != 'All' and record['color_code'] != color_code_filter:
+                if settings['color_code'] != 'All' and record['color_code'] != settings['color_code']:
                     passes_filter = False
                 
                 # Filter by ALGORITHM
-                if algorithm_filter != 'All' and record['algorithm'] != algorithm_filter:
+                if settings['algorithm'] != 'All' and record['algorithm'] != settings['algorithm']:
                     passes_filter = False
                 
                 # Filter by KEY
-                if key_filter != 'All' and record['key'] != key_filter:
+                if settings['key'] != 'All' and record['key'] != settings['key']:
                     passes_filter = False
                 
                 # ВОТ СЮДА ДОБАВЬТЕ ЭТИ НОВЫЕ ФИЛЬТРЫ:
                 # Filter by FROM identifier
-                if self.selected_from_ids and record.get('from_id') not in self.selected_from_ids:
+                if from_ids and record.get('from_id') not in from_ids:
                     passes_filter = False
                 
                 # Filter by TO identifier  
-                if self.selected_to_ids and record.get('to_id') not in self.selected_to_ids:
+                if to_ids and record.get('to_id') not in to_ids:
                     passes_filter = False
                 
                 # Filter by DETAILS
-                if self.selected_details and record.get('details') not in self.selected_details:
+                if details and record.get('details') not in details:
                     passes_filter = False
                 
                 if passes_filter:
                     filtered_records.append(record)
-                    if record['timestamp']:
-                        # Use the same time interval logic as in load_file_data
-                        try:
-                            interval_minutes = int(self.time_interval_minutes.get())
-                            if interval_minutes < 1 or interval_minutes > 1440:
-                                interval_minutes = 60
-                        except:
-                            interval_minutes = 60
-                        
-                        total_minutes = record['timestamp'].hour * 60 + record['timestamp'].minute
-                        interval_index = total_minutes // interval_minutes
-                        filtered_hourly[interval_index] += 1
                     total_filtered += 1
-        
-           
+            
             filtered_data = {
                 'file_path': data['file_path'],
                 'filename': data['filename'],
                 'frequency': data['frequency'],
-                'hourly_sessions': dict(filtered_hourly),
+                'minute_histograms': self.build_minute_histograms(filtered_records),
                 'all_records': filtered_records
             }
-            self.filtered_file_data.append(filtered_data)
+            filtered_file_data.append(filtered_data)
+        
+        return filtered_file_data, total_sessions, total_filtered
+    
+    def show_filtered_result(self, settings, result):
+        """Bin filtered records with the current interval, update status and redraw (main thread)"""
+        filtered_file_data, total_sessions, total_filtered = result
+        latency_ms = (time.perf_counter() - settings['started']) * 1000
+        
+        # Interval may have changed while the worker was running
+        interval_minutes = self.get_interval_minutes()
+        for filtered_data in filtered_file_data:
+            filtered_data['hourly_sessions'] = self.get_interval_counts(filtered_data['minute_histograms'],
+                                                                        interval_minutes)
+        self.filtered_file_data = filtered_file_data
         
         # Update status
         percent = int((total_filtered / total_sessions) * 100) if total_sessions > 0 else 0
         self.filter_status.config(
-            text=f"Filtered: {total_filtered}/{total_sessions} ({percent}%)",
+            text=f"Filtered: {total_filtered}/{total_sessions} ({percent}%) · {latency_ms:.0f} ms",
             fg="green" if total_filtered > 0 else "orange"
         )
+        print(f"Filtered {total_filtered}/{total_sessions} records in {latency_ms:.1f} ms")
         
         # Redraw with filtered data
         self.draw_hourly_visualization(use_filtered=True)
     
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    def apply_filters(self):
+        """Apply filters to data in a background job (a newer request cancels older ones)"""
+        self.live_filter.submit(self.get_filter_settings, self.compute_filtered_data,
+                                self.show_filtered_result, self.filter_status)
+    
     def clear_filters(self):
         """Clear all filters"""
+        # Незавершенная фильтрация больше не нужна
+        self.scheduler.cancel('filter')
         self.filtered_file_data = []
         
         # Reset filter values
@@ -1241,6 +1352,7 @@ class HourlyActivityVisualizer:
         self.selected_color_code.set("All")
         self.selected_algorithm.set("All")
         self.selected_key.set("All")
+        self.live_filter.cancel()
         
         # Update status
         self.filter_status.config(text="No filter applied", fg="#606060")
@@ -1249,7 +1361,7 @@ class HourlyActivityVisualizer:
         self.draw_hourly_visualization(use_filtered=False)
     
     def apply_interval(self):
-        """Apply new time interval and reload data"""
+        """Apply new time interval by re-binning cached minute histograms"""
         try:
             interval_value = int(self.time_interval_minutes.get())
             if interval_value < 1 or interval_value > 1440:
@@ -1259,13 +1371,14 @@ class HourlyActivityVisualizer:
             messagebox.showwarning("Invalid Interval", "Please enter a valid number for time interval")
             return
         
-        # Reload data with new interval
-        self.load_all_data()
-        
-        # Update status - removed green status message
+        # Re-bin from minute histograms - no file reload needed
+        for data in self.file_data + self.filtered_file_data:
+            data['hourly_sessions'] = self.get_interval_counts(data['minute_histograms'], interval_value)
+        for data in self.file_data:
+            self.hourly_data_by_file[data['file_path']] = data['hourly_sessions']
         
-        # Redraw visualization
-        self.draw_hourly_visualization(use_filtered=False)
+        # Redraw visualization (keeps current filter)
+        self.draw_hourly_visualization(use_filtered=bool(self.filtered_file_data))
     
  
  
@@ -1276,6 +1389,9 @@ class HourlyActivityVisualizer:
     def draw_hourly_visualization(self, use_filtered=False):
         """Draw hourly activity visualization"""
         self.canvas.delete("all")
+        self.bitmap_tiles = []
+        self.heatmap_images = []
+        self.heatmap_regions = []
         
         # Choose data to display
         data_to_draw = self.filtered_file_data if use_filtered and self.filtered_file_data else self.file_data
@@ -1289,13 +1405,7 @@ class HourlyActivityVisualizer:
         
         for data in data_to_draw:
             # Проверяем есть ли записи с датами
-            has_data = False
-            for record in data.get('all_records', []):
-                if record.get('timestamp'):
-                    has_data = True
-                    break
-            
-            if has_data:
+            if data.get('minute_histograms'):
                 files_with_data.append(data)
             else:
                 files_without_data.append(data)
@@ -1328,35 +1438,20 @@ class HourlyActivityVisualizer:
             "#4A4952"   # Dark slate (newest)
         ]
         
+        # Calculate time intervals based on user setting
+        interval_minutes = self.get_interval_minutes()
+        
         # Draw data for each file
         for file_data in data_to_draw:
-            # Organize records by date
-            records_by_date = defaultdict(list)
-            for record in file_data.get('all_records', []):
-                if record['timestamp']:
-                    date_key = record['timestamp'].date()
-                    records_by_date[date_key].append(record)
-            
-            # Calculate hourly sessions for each date
+            # Calculate interval sessions for each date from minute histograms
+            minute_histograms = file_data.get('minute_histograms', {})
             daily_hourly_data = {}
-            for date, records in records_by_date.items():
-                hourly_counts = defaultdict(int)
-                for record in records:
-                    # Use the same time interval logic
-                    try:
-                        interval_minutes = int(self.time_interval_minutes.get())
-                        if interval_minutes < 1 or interval_minutes > 1440:
-                            interval_minutes = 60
-                    except:
-                        interval_minutes = 60
-                    
-                    total_minutes = record['timestamp'].hour * 60 + record['timestamp'].minute
-                    interval_index = total_minutes // interval_minutes
-                    hourly_counts[interval_index] += 1
-                daily_hourly_data[date] = dict(hourly_counts)
+            for date, histogram in minute_histograms.items():
+                binned = self.bin_minute_histogram(histogram, interval_minutes)
+                daily_hourly_data[date] = {idx: int(count) for idx, count in enumerate(binned) if count}
             
             # Check if file has any records
-            total = sum(len(records) for records in records_by_date.values())
+            total = sum(int(sum(histogram)) for histogram in minute_histograms.values())
             
             if total == 0:
                 # Display "no records" message for empty files
@@ -1386,151 +1481,154 @@ class HourlyActivityVisualizer:
             sorted_dates = sorted(daily_hourly_data.keys())
             num_days = len(sorted_dates)
             
-            # Calculate max count for scaling across all days
-            max_count = 1
-            for hourly_data in daily_hourly_data.values():
-                if hourly_data:
-                    max_count = max(max_count, max(hourly_data.values()))
-            
-            # Bar parameters
-            base_bar_height = 10  # Height of each day's bar
-            bar_vertical_offset = 10  # How much each day is offset vertically
-            interval_spacing = 15 + (num_days - 1) * bar_vertical_offset  # Total space per interval
+            if self.view_mode.get() == "Heatmap":
+                # Day × time-of-day heatmap from minute histograms
+                y_offset = self.draw_heatmap(file_data, sorted_dates, x_offset, y_offset, interval_minutes)
+            else:
+                # Calculate max count for scaling across all days
+                max_count = 1
+                for hourly_data in daily_hourly_data.values():
+                    if hourly_data:
+                        max_count = max(max_count, max(hourly_data.values()))
             
-            # Draw horizontal overlapping bar chart
-            chart_start_y = y_offset
+                # Bar parameters
+                base_bar_height = 10  # Height of each day's bar
+                bar_vertical_offset = 10  # How much each day is offset vertically
+                interval_spacing = 15 + (num_days - 1) * bar_vertical_offset  # Total space per interval
             
-            # Calculate time intervals based on user setting
-            try:
-                interval_minutes = int(self.time_interval_minutes.get())
-                if interval_minutes < 1 or interval_minutes > 1440:
-                    interval_minutes = 60
-            except:
-                interval_minutes = 60
+                # Draw horizontal overlapping bar chart
+                chart_start_y = y_offset
             
-            # Calculate number of intervals per day
-            intervals_per_day = 1440 // interval_minutes  # 1440 minutes in a day
+                # Calculate number of intervals per day
+                intervals_per_day = 1440 // interval_minutes  # 1440 minutes in a day
             
-            # Draw grid lines
-            bar_x = x_offset + 60
-            for i in range(5):  # Draw vertical grid lines
-                grid_x = bar_x + (chart_width * i / 4)
-                self.canvas.create_line(grid_x, chart_start_y - 5, 
-                                    grid_x, chart_start_y + intervals_per_day * (base_bar_height + interval_spacing) + num_days * bar_vertical_offset,
-                                    fill="#e0e0e0", dash=(2, 2))
+                # Large charts are rendered as bitmap tiles instead of thousands of canvas items
+                estimated_items = intervals_per_day * (num_days * 3 + 1)
+                if PIL_AVAILABLE and NUMPY_AVAILABLE and estimated_items > self.bitmap_item_threshold:
+                    self.add_bitmap_chart(x_offset, chart_start_y, sorted_dates, daily_hourly_data,
+                                          max_count, interval_minutes, intervals_per_day, color_palette,
+                                          chart_width, base_bar_height, bar_vertical_offset, interval_spacing)
+                else:
+                    # Draw grid lines
+                    bar_x = x_offset + 60
+                    for i in range(5):  # Draw vertical grid lines
+                        grid_x = bar_x + (chart_width * i / 4)
+                        self.canvas.create_line(grid_x, chart_start_y - 5, 
+                                            grid_x, chart_start_y + intervals_per_day * (base_bar_height + interval_spacing) + num_days * bar_vertical_offset,
+                                            fill="#e0e0e0", dash=(2, 2))
             
-            for interval in range(intervals_per_day):
-                hour_base_y = chart_start_y + interval * (base_bar_height + interval_spacing)
+                    for interval in range(intervals_per_day):
+                        hour_base_y = chart_start_y + interval * (base_bar_height + interval_spacing)
                 
-                # Calculate time for this interval
-                start_minutes = interval * interval_minutes
-                start_hour = start_minutes // 60
-                start_minute = start_minutes % 60
+                        # Calculate time for this interval
+                        start_minutes = interval * interval_minutes
+                        start_hour = start_minutes // 60
+                        start_minute = start_minutes % 60
                 
-                # Interval label (positioned at center of all bars for this interval)
-                label_y = hour_base_y + (num_days * bar_vertical_offset) // 2 + base_bar_height // 2
-                self.canvas.create_text(x_offset, label_y,
-                                    text=f"{start_hour:02d}:{start_minute:02d}",
-                                    font=("Courier", 9), anchor="w")
+                        # Interval label (positioned at center of all bars for this interval)
+                        label_y = hour_base_y + (num_days * bar_vertical_offset) // 2 + base_bar_height // 2
+                        self.canvas.create_text(x_offset, label_y,
+                                            text=f"{start_hour:02d}:{start_minute:02d}",
+                                            font=("Courier", 9), anchor="w")
                 
-                # Draw bars for each day (oldest at bottom, newest on top)
-                for day_index, date in enumerate(sorted_dates):
-                    hourly_data = daily_hourly_data[date]
-                    count = hourly_data.get(interval, 0)
+                        # Draw bars for each day (oldest at bottom, newest on top)
+                        for day_index, date in enumerate(sorted_dates):
+                            hourly_data = daily_hourly_data[date]
+                            count = hourly_data.get(interval, 0)
                     
-                    # Calculate vertical position - older days lower, newer days higher
-                    bar_y = hour_base_y + (num_days - 1 - day_index) * bar_vertical_offset
+                            # Calculate vertical position - older days lower, newer days higher
+                            bar_y = hour_base_y + (num_days - 1 - day_index) * bar_vertical_offset
                     
-                    # Choose color based on age - 10 muted colors gradient
-                    if num_days <= 10:
-                        # Direct mapping for 10 or fewer days
-                        color_index = day_index * (len(color_palette) - 1) // max(num_days - 1, 1)
-                        color = color_palette[color_index]
-                    else:
-                        # For more than 10 days, interpolate
-                        color_index = day_index * 9 // (num_days - 1)
-                        color = color_palette[color_index]
+                            # Choose color based on age - 10 muted colors gradient
+                            if num_days <= 10:
+                                # Direct mapping for 10 or fewer days
+                                color_index = day_index * (len(color_palette) - 1) // max(num_days - 1, 1)
+                                color = color_palette[color_index]
+                            else:
+                                # For more than 10 days, interpolate
+                                color_index = day_index * 9 // (num_days - 1)
+                                color = color_palette[color_index]
                     
-                    z_order = day_index + 1  # Higher index = draw on top
+                            z_order = day_index + 1  # Higher index = draw on top
                     
-                    # Draw background for this bar
-                    self.canvas.create_rectangle(bar_x, bar_y, 
-                                                bar_x + chart_width, bar_y + base_bar_height,
-                                                fill="#f8f8f8", outline="#f0f0f0", width=0.5,
-                                                tags=f"bg_day_{day_index}")
+                            # Draw background for this bar
+                            self.canvas.create_rectangle(bar_x, bar_y, 
+                                                        bar_x + chart_width, bar_y + base_bar_height,
+                                                        fill="#f8f8f8", outline="#f0f0f0", width=0.5,
+                                                        tags=f"bg_day_{day_index}")
                     
-                    # Draw data bar if count > 0
-                    if count > 0:
-                        bar_width = (count / max_count) * chart_width
-                        self.canvas.create_rectangle(
-                            bar_x, 
-                            bar_y,
-                            bar_x + bar_width, 
-                            bar_y + base_bar_height,
-                            fill=color, outline="",
-                            tags=f"bar_day_{day_index}"
-                        )
+                            # Draw data bar if count > 0
+                            if count > 0:
+                                bar_width = (count / max_count) * chart_width
+                                self.canvas.create_rectangle(
+                                    bar_x, 
+                                    bar_y,
+                                    bar_x + bar_width, 
+                                    bar_y + base_bar_height,
+                                    fill=color, outline="",
+                                    tags=f"bar_day_{day_index}"
+                                )
                 
-                # Draw counts vertically for each day on the right
-                count_x = bar_x + chart_width + 10
-                for day_index, date in enumerate(sorted_dates):
-                    count = daily_hourly_data[date].get(interval, 0)
-                    if count > 0:  # Only show non-zero counts
-                        # Position each count vertically aligned with its bar
-                        count_y = hour_base_y + (num_days - 1 - day_index) * bar_vertical_offset + base_bar_height // 2
-                        self.canvas.create_text(count_x, count_y,
-                                            text=str(count),
-                                            font=("Courier", 9), anchor="w")
-            
-            # Calculate where the chart ended
-            y_offset = chart_start_y + intervals_per_day * (base_bar_height + interval_spacing) + 20
+                        # Draw counts vertically for each day on the right
+                        count_x = bar_x + chart_width + 10
+                        for day_index, date in enumerate(sorted_dates):
+                            count = daily_hourly_data[date].get(interval, 0)
+                            if count > 0:  # Only show non-zero counts
+                                # Position each count vertically aligned with its bar
+                                count_y = hour_base_y + (num_days - 1 - day_index) * bar_vertical_offset + base_bar_height // 2
+                                self.canvas.create_text(count_x, count_y,
+                                                    text=str(count),
+                                                    font=("Courier", 9), anchor="w")
+
+                # Calculate where the chart ended
+                y_offset = chart_start_y + intervals_per_day * (base_bar_height + interval_spacing) + 20
             
-            # Date legend - simplified to show only color and date
-            if len(sorted_dates) > 1:
-                y_offset += 10
+                # Date legend - simplified to show only color and date
+                if len(sorted_dates) > 1:
+                    y_offset += 10
                 
-                # Show dates horizontally
-                legend_x = x_offset
-                for day_index, date in enumerate(sorted_dates):
-                    # Match the colors from the chart - same 10 color palette
-                    if num_days <= 10:
-                        # Direct mapping for 10 or fewer days
-                        color_index = day_index * (len(color_palette) - 1) // max(num_days - 1, 1)
-                        color = color_palette[color_index]
-                    else:
-                        # For more than 10 days, interpolate
-                        color_index = day_index * 9 // (num_days - 1)
-                        color = color_palette[color_index]
+                    # Show dates horizontally
+                    legend_x = x_offset
+                    for day_index, date in enumerate(sorted_dates):
+                        # Match the colors from the chart - same 10 color palette
+                        if num_days <= 10:
+                            # Direct mapping for 10 or fewer days
+                            color_index = day_index * (len(color_palette) - 1) // max(num_days - 1, 1)
+                            color = color_palette[color_index]
+                        else:
+                            # For more than 10 days, interpolate
+                            color_index = day_index * 9 // (num_days - 1)
+                            color = color_palette[color_index]
                     
-                    date_str = date.strftime("%Y-%m-%d")
+                        date_str = date.strftime("%Y-%m-%d")
                     
-                    # Color box
-                    self.canvas.create_rectangle(legend_x, y_offset,
-                                                legend_x + 15, y_offset + 15,
-                                                fill=color, outline="black")
+                        # Color box
+                        self.canvas.create_rectangle(legend_x, y_offset,
+                                                    legend_x + 15, y_offset + 15,
+                                                    fill=color, outline="black")
                     
-                    # Date only
-                    self.canvas.create_text(legend_x + 20, y_offset + 7,
-                                        text=date_str,
-                                        font=("Arial", 9), anchor="w")
-                    legend_x += 120  # Move to next column (smaller spacing)
+                        # Date only
+                        self.canvas.create_text(legend_x + 20, y_offset + 7,
+                                            text=date_str,
+                                            font=("Arial", 9), anchor="w")
+                        legend_x += 120  # Move to next column (smaller spacing)
                     
-                    # Break to new line if needed
-                    if (day_index + 1) % 6 == 0:  # 6 items per row (more compact)
-                        y_offset += 20
-                        legend_x = x_offset
+                        # Break to new line if needed
+                        if (day_index + 1) % 6 == 0:  # 6 items per row (more compact)
+                            y_offset += 20
+                            legend_x = x_offset
                 
-                if len(sorted_dates) % 6 != 0:
-                    y_offset += 20
-            else:
-                # Single day - show date
-                if sorted_dates:
-                    date = sorted_dates[0]
-                    self.canvas.create_text(x_offset, y_offset,
-                                        text=f"Date: {date.strftime('%Y-%m-%d')}",
-                                        font=("Arial", 9), anchor="w")
-                    y_offset += 15
-            
+                    if len(sorted_dates) % 6 != 0:
+                        y_offset += 20
+                else:
+                    # Single day - show date
+                    if sorted_dates:
+                        date = sorted_dates[0]
+                        self.canvas.create_text(x_offset, y_offset,
+                                            text=f"Date: {date.strftime('%Y-%m-%d')}",
+                                            font=("Arial", 9), anchor="w")
+                        y_offset += 15
+
             # Statistics
             y_offset += 10
             if total > 0:
@@ -1589,6 +1687,256 @@ class HourlyActivityVisualizer:
 
 
 
+    def add_bitmap_chart(self, x, y, sorted_dates, daily_hourly_data, max_count, interval_minutes,
+                         intervals_per_day, color_palette, chart_width, base_bar_height,
+                         bar_vertical_offset, interval_spacing):
+        """Register a chart that is rendered into Pillow image tiles"""
+        num_days = len(sorted_dates)
+        
+        # Bar geometry computed once with NumPy
+        counts = np.zeros((num_days, intervals_per_day), dtype=np.int64)
+        for day_index, date in enumerate(sorted_dates):
+            for interval, count in daily_hourly_data[date].items():
+                if interval < intervals_per_day:
+                    counts[day_index, interval] = count
+        
+        day_colors = []
+        for day_index in range(num_days):
+            color_index = day_index * (len(color_palette) - 1) // max(num_days - 1, 1)
+            day_colors.append(ImageColor.getrgb(color_palette[color_index]))
+        
+        chart = {
+            'counts': counts,
+            'widths': np.round(counts * chart_width / max_count).astype(np.int64),
+            'day_offsets': (num_days - 1 - np.arange(num_days)) * bar_vertical_offset,
+            'day_colors': day_colors,
+            'interval_minutes': interval_minutes,
+            'row_pitch': base_bar_height + interval_spacing,
+            'chart_width': chart_width,
+            'bar_height': base_bar_height,
+            'label_offset': (num_days * bar_vertical_offset) // 2 + base_bar_height // 2,
+            'extent': num_days * bar_vertical_offset
+        }
+        
+        # Image starts 5px above the chart, like the canvas grid lines
+        width = chart_width + 120
+        height = intervals_per_day * chart['row_pitch'] + chart['extent'] + 5
+        for tile_top in range(0, height, self.bitmap_tile_height):
+            self.bitmap_tiles.append({
+                'chart': chart,
+                'x': x,
+                'y': y - 5 + tile_top,
+                'top': tile_top,
+                'width': width,
+                'height': min(self.bitmap_tile_height, height - tile_top),
+                'item': None,
+                'image': None
+            })
+        
+        self.schedule_bitmap_render()
+    
+    def render_bitmap_tile(self, tile):
+        """Render one chart tile into a PhotoImage"""
+        chart = tile['chart']
+        top = tile['top']
+        height = tile['height']
+        pixels = np.full((height, tile['width'], 3), 255, dtype=np.uint8)
+        
+        bar_x = 60
+        chart_width = chart['chart_width']
+        bar_height = chart['bar_height']
+        row_pitch = chart['row_pitch']
+        
+        # Dashed vertical grid lines (2px on, 2px off)
+        dash_rows = ((np.arange(height) + top) % 4) < 2
+        for i in range(5):
+            grid_x = int(bar_x + chart_width * i / 4)
+            pixels[dash_rows, grid_x] = (0xe0, 0xe0, 0xe0)
+        
+        # Intervals that intersect this tile
+        first = max(0, (top - 5 - chart['extent']) // row_pitch)
+        last = min(chart['counts'].shape[1], (top + height - 5) // row_pitch + 1)
+        
+        labels = []
+        for interval in range(first, last):
+            base_y = 5 + interval * row_pitch - top
+            bar_ys = base_y + chart['day_offsets']
+            
+            for day_index, bar_y in enumerate(bar_ys):
+                y0 = max(int(bar_y), 0)
+                y1 = min(int(bar_y) + bar_height, height)
+                if y0 >= y1:
+                    continue
+                pixels[y0:y1, bar_x:bar_x + chart_width] = (0xf8, 0xf8, 0xf8)
+                
+                bar_width = chart['widths'][day_index, interval]
+                if bar_width > 0:
+                    pixels[y0:y1, bar_x:bar_x + bar_width] = chart['day_colors'][day_index]
+                
+                count = chart['counts'][day_index, interval]
+                if count > 0:
+                    labels.append((bar_x + chart_width + 10, int(bar_y) + bar_height // 2, str(count)))
+            
+            start_minutes = interval * chart['interval_minutes']
+            labels.append((0, base_y + chart['label_offset'],
+                           f"{start_minutes // 60:02d}:{start_minutes % 60:02d}"))
+        
+        image = Image.fromarray(pixels, "RGB")
+        draw = ImageDraw.Draw(image)
+        font = self.get_bitmap_font()
+        for label_x, label_y, text in labels:
+            draw.text((label_x, label_y - 6), text, fill=self.text_color, font=font)
+        
+        tile['image'] = ImageTk.PhotoImage(image)
+        tile['item'] = self.canvas.create_image(tile['x'], tile['y'], image=tile['image'], anchor="nw")
+    
+    def get_bitmap_font(self):
+        """Get monospace font for bitmap labels"""
+        if self.bitmap_font is None:
+            for font_name in ("cour.ttf", "DejaVuSansMono.ttf", "Courier New.ttf"):
+                try:
+                    self.bitmap_font = ImageFont.truetype(font_name, 12)
+                    break
+                except OSError:
+                    continue
+            else:
+                self.bitmap_font = ImageFont.load_default()
+        return self.bitmap_font
+    
+    def on_canvas_yscroll(self, first, last):
+        """Update scrollbar and render bitmap tiles that came into view"""
+        self.v_scroll.set(first, last)
+        self.schedule_bitmap_render()
+    
+    def schedule_bitmap_render(self):
+        """Schedule rendering of visible bitmap tiles"""
+        if self.bitmap_tiles and not self.bitmap_render_pending:
+            self.bitmap_render_pending = True
+            self.root.after_idle(self.render_visible_bitmap_tiles)
+    
+    def render_visible_bitmap_tiles(self):
+        """Render tiles near the viewport and release far ones"""
+        self.bitmap_render_pending = False
+        
+        view_top = self.canvas.canvasy(0)
+        view_height = max(self.canvas.winfo_height(), 1)
+        keep_top = view_top - view_height
+        keep_bottom = view_top + 2 * view_height
+        
+        for tile in self.bitmap_tiles:
+            near_view = tile['y'] < keep_bottom and tile['y'] + tile['height'] > keep_top
+            if near_view and tile['item'] is None:
+                self.render_bitmap_tile(tile)
+            elif not near_view and tile['item'] is not None:
+                self.canvas.delete(tile['item'])
+                tile['item'] = None
+                tile['image'] = None
+    
+    def draw_heatmap(self, file_data, sorted_dates, x_offset, y_offset, interval_minutes):
+        """Draw day × interval heatmap as one image, return new y offset"""
+        if not (PIL_AVAILABLE and NUMPY_AVAILABLE):
+            self.canvas.create_text(x_offset, y_offset,
+                                text="Heatmap requires Pillow and NumPy (pip install pillow numpy)",
+                                font=("Arial", 9), anchor="w", fill="#999999")
+            return y_offset + 20
+        
+        minute_histograms = file_data['minute_histograms']
+        intervals_per_day = 1440 // interval_minutes
+        num_days = len(sorted_dates)
+        
+        # Rows are days, columns are intervals
+        counts = np.array([self.bin_minute_histogram(minute_histograms[date], interval_minutes)[:intervals_per_day]
+                           for date in sorted_dates])
+        max_count = max(int(counts.max()), 1)
+        
+        cell_width = max(1, 800 // intervals_per_day)
+        cell_height = max(3, min(14, 900 // num_days))
+        
+        # Colour by count: empty cells light gray, then 10 levels from light to dark
+        ramp = ["#f8f8f8", "#E8D5C4", "#D4C5B9", "#C7B5A3", "#B8A598", "#A8958F",
+                "#968684", "#827678", "#6F676B", "#5C585E", "#4A4952"]
+        lut = np.array([ImageColor.getrgb(color) for color in ramp], dtype=np.uint8)
+        levels = np.ceil(counts * 10 / max_count).astype(np.int64)
+        pixels = lut[levels]
+        pixels = np.repeat(np.repeat(pixels, cell_height, axis=0), cell_width, axis=1)
+        
+        heatmap_x = x_offset + 80
+        heatmap_y = y_offset + 15
+        
+        # Time labels along the top
+        label_every = max(1, intervals_per_day // 8)
+        for interval in range(0, intervals_per_day, label_every):
+            start_minutes = interval * interval_minutes
+            self.canvas.create_text(heatmap_x + interval * cell_width, y_offset,
+                                text=f"{start_minutes // 60:02d}:{start_minutes % 60:02d}",
+                                font=("Courier", 8), anchor="w")
+        
+        # Date labels on the left, thinned to avoid overlap
+        date_every = max(1, math.ceil(12 / cell_height))
+        for day_index in range(0, num_days, date_every):
+            self.canvas.create_text(x_offset, heatmap_y + day_index * cell_height + cell_height // 2,
+                                text=sorted_dates[day_index].strftime("%Y-%m-%d"),
+                                font=("Courier", 8), anchor="w")
+        
+        image = ImageTk.PhotoImage(Image.fromarray(pixels, "RGB"))
+        self.heatmap_images.append(image)
+        self.canvas.create_image(heatmap_x, heatmap_y, image=image, anchor="nw")
+        
+        self.heatmap_regions.append({
+            'x': heatmap_x,
+            'y': heatmap_y,
+            'cell_width': cell_width,
+            'cell_height': cell_height,
+            'counts': counts,
+            'dates': sorted_dates,
+            'interval_minutes': interval_minutes
+        })
+        
+        y_offset = heatmap_y + num_days * cell_height + 15
+        
+        # Colour scale
+        for level, color in enumerate(ramp):
+            self.canvas.create_rectangle(heatmap_x + level * 20, y_offset,
+                                        heatmap_x + level * 20 + 20, y_offset + 10,
+                                        fill=color, outline="")
+        self.canvas.create_text(heatmap_x - 5, y_offset + 5, text="0",
+                            font=("Arial", 8), anchor="e")
+        self.canvas.create_text(heatmap_x + len(ramp) * 20 + 5, y_offset + 5, text=str(max_count),
+                            font=("Arial", 8), anchor="w")
+        
+        return y_offset + 25
+    
+    def on_canvas_motion(self, event):
+        """Show exact heatmap cell count under the cursor"""
+        self.canvas.delete("heatmap_hover")
+        if not self.heatmap_regions:
+            return
+        
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        
+        for region in self.heatmap_regions:
+            counts = region['counts']
+            row = int((y - region['y']) // region['cell_height'])
+            col = int((x - region['x']) // region['cell_width'])
+            if 0 <= row < counts.shape[0] and 0 <= col < counts.shape[1]:
+                count = int(counts[row, col])
+                start_minutes = col * region['interval_minutes']
+                end_minutes = start_minutes + region['interval_minutes']
+                text = (f"{region['dates'][row].strftime('%Y-%m-%d')} "
+                        f"{start_minutes // 60:02d}:{start_minutes % 60:02d}-"
+                        f"{end_minutes // 60:02d}:{end_minutes % 60:02d}: {count} sessions")
+                
+                label = self.canvas.create_text(x + 12, y + 12, text=text,
+                                            font=("Arial", 9), anchor="nw",
+                                            tags="heatmap_hover")
+                bbox = self.canvas.bbox(label)
+                box = self.canvas.create_rectangle(bbox[0] - 3, bbox[1] - 2, bbox[2] + 3, bbox[3] + 2,
+                                                fill="#ffffe0", outline="#808080",
+                                                tags="heatmap_hover")
+                self.canvas.tag_lower(box, label)
+                return
+    
     def open_file_selector(self):
         """Open file selection window"""
         # Store reference to selector window
@@ -1906,8 +2254,10 @@ class HourlyActivityVisualizer:
         
         print(f"Refreshed: Found {len(self.file_paths)} files in directory")
         
+        self.scheduler.cancel('filter')
         self.load_all_data()
         self.filtered_file_data = []
+        self.live_filter.cancel()
         self.filter_status.config(text="No filter applied", fg="#606060")
         self.draw_hourly_visualization()
     
@@ -2233,6 +2583,7 @@ class HourlyActivityVisualizer:
             print(f"Selected {len(self.selected_from_ids)} FROM IDs and {len(self.selected_to_ids)} TO IDs")
             
             selector.destroy()
+            self.live_filter.on_change()
         
         apply_btn = tk.Button(button_frame, text="APPLY",
                         command=apply_identifier_selection,
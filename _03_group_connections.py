@@ -1,12 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import csv
+import io
+import multiprocessing
 import os
+import tempfile
 from datetime import datetime, timedelta
 from collections import defaultdict
+import bisect
+import heapq
 import math
-import threading
+import time
 import configparser
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from xml.sax.saxutils import escape
+from _scheduler import BackgroundScheduler, LiveFilter
 
 # PDF libraries
 try:
@@ -22,11 +30,29 @@ except ImportError:
     print("ReportLab not installed. PDF export will be disabled.")
     print("Install with: pip install reportlab")
 
+# Joining PDF sections rendered in parallel
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+    print("pypdf not installed. PDF reports will be built in a single pass.")
+    print("Install with: pip install pypdf")
+
 try:
     from tkcalendar import Calendar
 except ImportError:
     Calendar = None  # Будет работать без календаря
 
+# Session regrouping
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("NumPy not installed. Session regrouping will use plain lists.")
+    print("Install with: pip install numpy")
+
 
 def load_input_directory():
     """Загрузить путь к директории convert_data из config.ini"""
@@ -371,6 +397,186 @@ class DateMaskEntry(tk.Frame):
         return self.entry.get()
 
 
+# Rows buffered between writes (and progress updates) in Excel export
+EXCEL_BATCH_ROWS = 5000
+
+# Overlap detector stops listing pairs after this many (the table stays responsive)
+OVERLAP_MAX_ROWS = 5000
+
+# Session lines per paragraph in PDF reports (one paragraph per line is very slow to lay out)
+PDF_LINES_PER_CHUNK = 50
+
+
+def get_pdf_styles():
+    """Sample stylesheet with the report title style"""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Title'],
+        fontSize=16,
+        spaceAfter=30,
+        textColor=colors.HexColor('#000080')
+    ))
+    return styles
+
+
+def create_pdf_document(filename):
+    """A4 portrait document used for the report and its sections"""
+    return SimpleDocTemplate(
+        filename,
+        pagesize=A4,
+        rightMargin=50,
+        leftMargin=50,
+        topMargin=50,
+        bottomMargin=30,
+    )
+
+
+def build_pdf_title(styles, date_str):
+    """Title flowables of the session report"""
+    return [
+        Paragraph("DMR Data Report", styles['CustomTitle']),
+        Paragraph(f"Generated: {date_str}", styles['Normal']),
+        Spacer(1, 0.2*inch),
+    ]
+
+
+def build_pdf_section(section, styles):
+    """Flowables of one file: group headers and session lines in fixed-size chunks"""
+    elements = [
+        Paragraph(f"File: {section['filename']}", styles['Heading2']),
+        Paragraph(f"Frequency: {section['frequency']}", styles['Normal']),
+        Spacer(1, 0.1*inch),
+    ]
+    
+    for group_header, lines in section['groups']:
+        elements.append(Paragraph(group_header, styles['Heading3']))
+        for start in range(0, len(lines), PDF_LINES_PER_CHUNK):
+            chunk = lines[start:start + PDF_LINES_PER_CHUNK]
+            elements.append(Paragraph("<br/>".join(escape(line) for line in chunk), styles['Normal']))
+        elements.append(Spacer(1, 0.1*inch))
+    
+    return elements
+
+
+def render_pdf_section(filename, section):
+    """Build one section PDF (runs in a worker process)"""
+    create_pdf_document(filename).build(build_pdf_section(section, get_pdf_styles()))
+    return filename
+
+
+def merge_pdf_files(filename, parts):
+    """Concatenate section PDFs into one file"""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(part)
+    with open(filename, "wb") as f:
+        writer.write(f)
+
+
+# Lines buffered between writes in text export
+TEXT_CHUNK_LINES = 20000
+
+# Columns of the CSV companion written next to each TXT file
+SESSION_CSV_HEADERS = ["Group", "Group Start", "Timestamp", "Timeslot", "Color Code",
+                       "From", "To", "Duration (s)", "Event", "Algorithm", "Key"]
+
+
+def format_session_line(session, arrow="─▶"):
+    """One session as a report line"""
+    line_parts = []
+    
+    if session['timeslot']:
+        line_parts.append(session['timeslot'])
+    
+    if session['color_code']:
+        line_parts.append(f"CC{session['color_code']}")
+    
+    if session['from'] and session['to']:
+        line_parts.append(f"{session['from']} {arrow} {session['to']}")
+    
+    if session['has_duration']:
+        line_parts.append(f"({session['duration_sec']:.1f}s)")
+    else:
+        line_parts.append("(0.0s)")
+    
+    if session['event']:
+        line_parts.append(session['event'])
+    
+    if session['algorithm'] and session['algorithm'].strip():
+        line_parts.append(f"Alg: {session['algorithm']}")
+        if session['key'] and session['key'].strip():
+            line_parts.append(f"Key: {session['key']}")
+    
+    return " ".join(line_parts)
+
+
+def write_session_text_files(output_dir, section, generated, cancel_event):
+    """Write <name>.txt and its CSV companion in one pass (runs in a worker process)"""
+    frequency = section['frequency']
+    txt_path = os.path.join(output_dir, f"{section['name']}.txt")
+    csv_path = os.path.join(output_dir, f"{section['name']}.csv")
+    
+    lines = [
+        f"File: {section['filename']}\n",
+        f"Frequency: {frequency}\n",
+        f"Generated: {generated}\n",
+        "=" * 80 + "\n\n",
+    ]
+    csv_buffer = io.StringIO()
+    csv_writer = csv.writer(csv_buffer)
+    csv_writer.writerow(SESSION_CSV_HEADERS)
+    cancelled = False
+    
+    with open(txt_path, 'w', encoding='utf-8') as txt_file, \
+         open(csv_path, 'w', encoding='utf-8', newline='') as csv_file:
+        
+        def flush():
+            # Одна запись на блок вместо записи на строку
+            txt_file.write("".join(lines))
+            lines.clear()
+            csv_file.write(csv_buffer.getvalue())
+            csv_buffer.seek(0)
+            csv_buffer.truncate()
+        
+        for group_number, (group_start, group) in enumerate(zip(section['group_starts'], section['groups']), 1):
+            lines.append(f"{group_start} (Sessions: {len(group)})\n")
+            
+            for session in group:
+                lines.append(format_session_line(session) + "\n")
+                csv_writer.writerow([
+                    group_number,
+                    group_start,
+                    session['timestamp'].strftime("%Y-%m-%d %H:%M:%S") if session['timestamp'] else "",
+                    session['timeslot'],
+                    session['color_code'],
+                    session['from'],
+                    session['to'],
+                    f"{session['duration_sec']:.1f}" if session['has_duration'] else "0.0",
+                    session['event'],
+                    session['algorithm'],
+                    session['key'],
+                ])
+            
+            lines.append("\n")  # Empty line between groups
+            
+            if len(lines) >= TEXT_CHUNK_LINES:
+                flush()
+                if cancel_event.is_set():
+                    cancelled = True
+                    break
+        
+        flush()
+    
+    if cancelled:
+        # Незаконченные файлы не оставляем
+        os.remove(txt_path)
+        os.remove(csv_path)
+        return []
+    
+    return [os.path.basename(txt_path), os.path.basename(csv_path)]
+
+
 class ProgressWindow:
     """Window for showing export progress"""
     def __init__(self, parent, title="Export Progress"):
@@ -444,7 +650,6 @@ class ProgressWindow:
         self.progress_var.set(progress)
         self.progress_text.config(text=f"{progress:.0f}%")
         self.files_label.config(text=f"Files: {files_processed}/{total_files} processed")
-        self.window.update()
     
     def cancel_export(self):
         """Cancel the export operation"""
@@ -497,6 +702,21 @@ class DMRDataViewer:
         
         # Session grouping gap
         self.session_gap_var = tk.StringVar(value="15")
+        self.session_gap_slider_var = tk.IntVar(value=15)
+        self.gap_regroup_pending = False
+        
+        # Virtualized table state (layout is built by display_data)
+        self.table_layout = None
+        self.table_render_pending = False
+        self.drawn_cells = {}  # (row_index, col) -> date block index
+        self.drawn_date_headers = set()
+        self.group_header_keys = {}  # canvas item -> group key
+        self.cell_height_cache = {}  # (date_str, hour, filename) -> height
+        
+        # Cross-frequency overlap detector
+        self.overlap_window = None
+        self.overlap_tolerance_var = tk.StringVar(value="2")
+        self.overlap_search = None  # settings and results of the last search
         
         # Unique values for filters
         self.unique_events = set()
@@ -505,6 +725,18 @@ class DMRDataViewer:
         self.unique_algorithms = set()
         self.unique_keys = set()
         
+        # Background jobs (filtering, exports) - Tk is only touched from the main thread
+        self.scheduler = BackgroundScheduler(self.root)
+        
+        # Live filtering: filter widgets re-run the filter after a short pause
+        self.live_filter = LiveFilter(self.root, self.scheduler, self.apply_filters,
+                                      can_run=lambda: bool(self.file_data))
+        self.live_filter.watch(self.date_from_var, self.date_to_var,
+                               self.duration_from_var, self.duration_to_var,
+                               self.selected_event, self.selected_timeslot,
+                               self.selected_color_code, self.selected_algorithm,
+                               self.selected_key)
+        
         # Create interface
         self.setup_ui()
         
@@ -552,6 +784,10 @@ class DMRDataViewer:
                                     relief=tk.RAISED, bd=1)
         export_excel_btn.pack(side=tk.LEFT, padx=5)
         
+        overlaps_btn = tk.Button(button_panel, text="⇆ Overlaps", command=self.open_overlap_window,
+                               bg="#e0e0e0", relief=tk.RAISED, bd=1)
+        overlaps_btn.pack(side=tk.LEFT, padx=5)
+        
         refresh_btn = tk.Button(button_panel, text="Refresh", command=self.refresh_all,
                               bg="#e0e0e0", relief=tk.RAISED, bd=1)
         refresh_btn.pack(side=tk.LEFT, padx=5)
@@ -695,6 +931,12 @@ class DMRDataViewer:
                                      cursor="hand2", width=15)
         self.clear_button.pack(fill=tk.X, pady=(5, 0))
         
+        # Live mode - filter automatically when a filter value changes
+        tk.Checkbutton(button_frame_1, text="Live filtering",
+                      variable=self.live_filter.enabled,
+                      command=self.live_filter.on_toggle,
+                      bg="#f5f5f5", font=("Arial", 8)).pack(anchor=tk.W, pady=(5, 0))
+        
         # Bottom panel with SESSION GAP and RELOAD DATA
         apply_frame = tk.Frame(filter_frame, bg="#f5f5f5")
         apply_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
@@ -712,6 +954,13 @@ class DMRDataViewer:
         tk.Entry(gap_input_frame, textvariable=self.session_gap_var, width=10).pack(side=tk.LEFT)
         tk.Label(gap_input_frame, text="sec", bg="#f5f5f5", font=("Arial", 9)).pack(side=tk.LEFT, padx=(2, 0))
         
+        # Gap slider - regroups live while dragging
+        self.gap_slider = tk.Scale(gap_frame, from_=1, to=300, orient=tk.HORIZONTAL,
+                                  variable=self.session_gap_slider_var, showvalue=False,
+                                  command=self.on_gap_slider,
+                                  bg="#f5f5f5", highlightthickness=0)
+        self.gap_slider.pack(fill=tk.X)
+        
         # Optimal value label
         optimal_label = tk.Label(apply_frame, text="Optimal Value 15 sec", 
                                 bg="#f5f5f5", fg="#666666",
@@ -747,8 +996,8 @@ class DMRDataViewer:
         h_scroll.pack(side=tk.BOTTOM, fill=tk.X)
         
         self.canvas = tk.Canvas(content_area, bg="#ffffff",
-                               yscrollcommand=v_scroll.set,
-                               xscrollcommand=h_scroll.set,
+                               yscrollcommand=self.on_canvas_yscroll,
+                               xscrollcommand=self.on_canvas_xscroll,
                                highlightthickness=0)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
@@ -763,6 +1012,9 @@ class DMRDataViewer:
         # Bind scroll events to sync headers
         self.canvas.bind("<Configure>", self._on_canvas_configure)
         
+        # One binding for all group headers (items are created and dropped while scrolling)
+        self.canvas.tag_bind("group_header", "<Button-1>", self.on_group_header_click)
+        
         # Store scrollbar references for synchronization
         self.v_scroll = v_scroll
         self.h_scroll = h_scroll
@@ -793,8 +1045,21 @@ class DMRDataViewer:
     
     def _on_canvas_configure(self, event):
         """Handle canvas configuration changes"""
-        # Update scroll region when canvas size changes
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Table sets its full scroll region itself - only part of it is drawn
+        if self.table_layout:
+            self.schedule_table_render()
+        else:
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    
+    def on_canvas_yscroll(self, first, last):
+        """Vertical view changed - update scrollbar and draw newly visible rows"""
+        self.v_scroll.set(first, last)
+        self.schedule_table_render()
+    
+    def on_canvas_xscroll(self, first, last):
+        """Horizontal view changed - update scrollbar and draw newly visible columns"""
+        self.h_scroll.set(first, last)
+        self.schedule_table_render()
     
     def _on_vertical_scroll(self, *args):
         """Handle vertical scrolling - sync with left headers"""
@@ -998,41 +1263,24 @@ class DMRDataViewer:
         # Sort sessions by time
         sessions.sort(key=lambda x: x['timestamp'] if x['timestamp'] else datetime.min)
         
-        # Group sessions (combine if gap between them is less than specified seconds)
-        grouped_sessions = []
-        current_group = []
+        # Gaps between consecutive sessions are computed and sorted once; grouping
+        # for any gap value is then a split at gaps above the threshold
+        gap_index = self.build_gap_index(self.compute_session_gaps(sessions))
         try:
             gap_between_recording_sec = int(self.session_gap_var.get())
         except:
             gap_between_recording_sec = 15  # Default value
         
-        for session in sessions:
-            if not current_group:
-                current_group.append(session)
-            else:
-                # Check time between end of last session and start of current
-                last_session = current_group[-1]
-                if last_session['end_time'] and session['timestamp']:
-                    time_gap = (session['timestamp'] - last_session['end_time']).total_seconds()
-                    
-                    if time_gap <= gap_between_recording_sec:
-                        current_group.append(session)
-                    else:
-                        # Save current group and start new
-                        grouped_sessions.append(current_group)
-                        current_group = [session]
-                else:
-                    current_group.append(session)
-        
-        # Add last group
-        if current_group:
-            grouped_sessions.append(current_group)
+        grouped_sessions = self.group_sessions(sessions, gap_index, gap_between_recording_sec)
         
         return {
             'file_path': file_path,
             'filename': os.path.basename(file_path),
             'frequency': frequency,
             'sessions': grouped_sessions,
+            'all_sessions': sessions,
+            'gap_index': gap_index,
+            'session_gap': gap_between_recording_sec,
             'events': events,
             'timeslots': timeslots,
             'color_codes': color_codes,
@@ -1040,6 +1288,69 @@ class DMRDataViewer:
             'keys': keys
         }
     
+    def compute_session_gaps(self, sessions):
+        """Compute gap (sec) between each session and the previous one"""
+        epoch = datetime(1970, 1, 1)
+        starts = [(s['timestamp'] - epoch).total_seconds() if s['timestamp'] else math.nan for s in sessions]
+        ends = [(s['end_time'] - epoch).total_seconds() if s['end_time'] else math.nan for s in sessions]
+        
+        # gaps[i] is the gap before session i + 1; NaN never splits a group
+        if NUMPY_AVAILABLE:
+            return np.array(starts[1:], dtype=float) - np.array(ends[:-1], dtype=float)
+        return [start - end for start, end in zip(starts[1:], ends[:-1])]
+    
+    def build_gap_index(self, session_gaps):
+        """Sort gaps once - the single-linkage merge order of sessions"""
+        # Sessions are ordered in time, so single linkage only ever merges neighbours:
+        # merging in ascending gap order gives the whole hierarchy, and the groups
+        # for threshold T are split exactly at the gaps greater than T.
+        if NUMPY_AVAILABLE:
+            gaps = np.nan_to_num(session_gaps, nan=-np.inf)
+            order = np.argsort(gaps, kind='stable')
+            return {'order': order, 'sorted': gaps[order]}
+        
+        gaps = [-math.inf if math.isnan(gap) else gap for gap in session_gaps]
+        order = sorted(range(len(gaps)), key=gaps.__getitem__)
+        return {'order': order, 'sorted': [gaps[idx] for idx in order]}
+    
+    def count_groups(self, gap_index, gap_sec):
+        """Number of groups for a gap threshold in O(log n)"""
+        sorted_gaps = gap_index['sorted']
+        if NUMPY_AVAILABLE:
+            position = int(np.searchsorted(sorted_gaps, gap_sec, side='right'))
+        else:
+            position = bisect.bisect_right(sorted_gaps, gap_sec)
+        return len(sorted_gaps) - position + 1
+    
+    def get_split_points(self, gap_index, gap_sec):
+        """Sorted session indices that start a new group for a gap threshold"""
+        sorted_gaps = gap_index['sorted']
+        if NUMPY_AVAILABLE:
+            position = np.searchsorted(sorted_gaps, gap_sec, side='right')
+            return np.sort(gap_index['order'][position:]) + 1
+        position = bisect.bisect_right(sorted_gaps, gap_sec)
+        return sorted(idx + 1 for idx in gap_index['order'][position:])
+    
+    def group_sessions(self, sessions, gap_index, gap_sec, kept_indices=None):
+        """Split sorted sessions into groups where gap exceeds gap_sec"""
+        if not sessions:
+            return []
+        
+        split_points = self.get_split_points(gap_index, gap_sec)
+        
+        if kept_indices is None:
+            bounds = [0] + list(split_points) + [len(sessions)]
+            return [sessions[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        
+        # Filtered view: keep original group boundaries, drop emptied groups
+        if NUMPY_AVAILABLE:
+            positions = np.searchsorted(kept_indices, split_points).tolist()
+        else:
+            positions = [bisect.bisect_left(kept_indices, point) for point in split_points]
+        bounds = [0] + positions + [len(kept_indices)]
+        return [[sessions[idx] for idx in kept_indices[start:end]]
+                for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    
     def update_comboboxes(self):
         """Update comboboxes with unique values"""
         # EVENT
@@ -1072,96 +1383,120 @@ class DMRDataViewer:
         if self.selected_key.get() not in key_values:
             self.selected_key.set('All')
     
-    def apply_filters(self):
-        """Apply filters to data"""
-        date_from_str = self.date_from_var.get()
-        date_to_str = self.date_to_var.get()
-        
-        date_from = self.parse_date(date_from_str)
-        date_to = self.parse_date(date_to_str)
+    def get_filter_settings(self):
+        """Read filter widgets on the main thread (None if dates are invalid)"""
+        date_from = self.parse_date(self.date_from_var.get())
+        date_to = self.parse_date(self.date_to_var.get())
         
         if not date_from or not date_to:
-            self.filter_status.config(text="Invalid date format", fg="red")
-            return
+            return None
         
-        # Get filter values
+        # Convert duration from seconds to milliseconds
         duration_from = self.duration_from_var.get()
         duration_to = self.duration_to_var.get()
-        event_filter = self.selected_event.get()
-        timeslot_filter = self.selected_timeslot.get()
-        color_code_filter = self.selected_color_code.get()
-        algorithm_filter = self.selected_algorithm.get()
-        key_filter = self.selected_key.get()
-        
-        # Convert duration from seconds to milliseconds
         try:
             dur_from_ms = float(duration_from) * 1000 if duration_from else None
             dur_to_ms = float(duration_to) * 1000 if duration_to else None
         except:
             dur_from_ms = dur_to_ms = None
         
-        # Filter data
-        self.filtered_file_data = []
+        return {
+            'date_from': date_from,
+            'date_to': date_to,
+            'dur_from_ms': dur_from_ms,
+            'dur_to_ms': dur_to_ms,
+            'event': self.selected_event.get(),
+            'timeslot': self.selected_timeslot.get(),
+            'color_code': self.selected_color_code.get(),
+            'algorithm': self.selected_algorithm.get(),
+            'key': self.selected_key.get()
+        }
+    
+    def compute_filtered_data(self, settings, token=None):
+        """Find kept session indices per file with a settings snapshot (runs in a worker, no Tk calls)"""
+        date_from = settings['date_from']
+        date_to = settings['date_to']
+        dur_from_ms = settings['dur_from_ms']
+        dur_to_ms = settings['dur_to_ms']
+        
+        kept_by_file = []
         total_sessions = 0
         total_filtered = 0
         
         for data in self.file_data:
-            filtered_sessions = []
+            # Newer filter request supersedes this one
+            if token:
+                token.check()
             
-            for group in data['sessions']:
-                filtered_group = []
+            kept_indices = []
+            
+            for session_idx, session in enumerate(data['all_sessions']):
+                total_sessions += 1
+                passes_filter = True
                 
-                for session in group:
-                    total_sessions += 1
-                    passes_filter = True
-                    
-                    # Filter by date
-                    if session['timestamp']:
-                        if not (date_from <= session['timestamp'] <= date_to):
-                            passes_filter = False
-                    else:
-                        passes_filter = False
-                    
-                    # Filter by duration
-                    if dur_from_ms is not None or dur_to_ms is not None:
-                        duration_ms = session.get('duration_ms', 0)
-                        if dur_from_ms is not None and duration_ms < dur_from_ms:
-                            passes_filter = False
-                        if dur_to_ms is not None and duration_ms > dur_to_ms:
-                            passes_filter = False
-                    
-                    # Filter by EVENT
-                    if event_filter != 'All' and session['event'] != event_filter:
-                        passes_filter = False
-                    
-                    # Filter by TIMESLOT
-                    if timeslot_filter != 'All' and session['timeslot'] != timeslot_filter:
+                # Filter by date
+                if session['timestamp']:
+                    if not (date_from <= session['timestamp'] <= date_to):
                         passes_filter = False
-                    
-                    # Filter by COLOR_CODE
-                    if color_code_filter != 'All' and session['color_code'] != color_code_filter:
+                else:
+                    passes_filter = False
+                
+                # Filter by duration
+                if dur_from_ms is not None or dur_to_ms is not None:
+                    duration_ms = session.get('duration_ms', 0)
+                    if dur_from_ms is not None and duration_ms < dur_from_ms:
                         passes_filter = False
-                    
-                    # Filter by ALGORITHM
-                    if algorithm_filter != 'All' and session['algorithm'] != algorithm_filter:
+                    if dur_to_ms is not None and duration_ms > dur_to_ms:
                         passes_filter = False
-                    
-                    # Filter by KEY
-                    if key_filter != 'All' and session['key'] != key_filter:
-                        passes_filter = False
-                    
-                    if passes_filter:
-                        filtered_group.append(session)
-                        total_filtered += 1
                 
-                if filtered_group:
-                    filtered_sessions.append(filtered_group)
+                # Filter by EVENT
+                if settings['event'] != 'All' and session['event'] != settings['event']:
+                    passes_filter = False
+                
+                # Filter by TIMESLOT
+                if settings['timeslot'] != 'All' and session['timeslot'] != settings['timeslot']:
+                    passes_filter = False
+                
+                # Filter by COLOR_CODE
+                if settings['color_code'] != 'All' and session['color_code'] != settings['color_code']:
+                    passes_filter = False
+                
+                # Filter by ALGORITHM
+                if settings['algorithm'] != 'All' and session['algorithm'] != settings['algorithm']:
+                    passes_filter = False
+                
+                # Filter by KEY
+                if settings['key'] != 'All' and session['key'] != settings['key']:
+                    passes_filter = False
+                
+                if passes_filter:
+                    kept_indices.append(session_idx)
+                    total_filtered += 1
+            
+            kept_by_file.append((data, kept_indices))
+        
+        return kept_by_file, total_sessions, total_filtered
+    
+    def show_filtered_result(self, settings, result):
+        """Group kept sessions with the current gap, update status and redraw (main thread)"""
+        kept_by_file, total_sessions, total_filtered = result
+        latency_ms = (time.perf_counter() - settings['started']) * 1000
+        
+        self.filtered_file_data = []
+        for data, kept_indices in kept_by_file:
+            # Keep the current group boundaries for the filtered sessions
+            filtered_sessions = self.group_sessions(data['all_sessions'], data['gap_index'],
+                                                    data['session_gap'], kept_indices)
             
             filtered_data = {
                 'file_path': data['file_path'],
                 'filename': data['filename'],
                 'frequency': data['frequency'],
                 'sessions': filtered_sessions,
+                'all_sessions': data['all_sessions'],
+                'gap_index': data['gap_index'],
+                'session_gap': data['session_gap'],
+                'kept_indices': kept_indices,
                 'events': data['events'],
                 'timeslots': data['timeslots'],
                 'color_codes': data['color_codes'],
@@ -1174,7 +1509,7 @@ class DMRDataViewer:
         if total_sessions > 0:
             percent = int((total_filtered / total_sessions) * 100) if total_sessions > 0 else 0
             self.filter_status.config(
-                text=f"Filtered: {total_filtered}/{total_sessions} ({percent}%)",
+                text=f"Filtered: {total_filtered}/{total_sessions} ({percent}%) · {latency_ms:.0f} ms",
                 fg="green" if total_filtered > 0 else "orange"
             )
         else:
@@ -1182,12 +1517,20 @@ class DMRDataViewer:
                 text="No data found",
                 fg="red"
             )
+        print(f"Filtered {total_filtered}/{total_sessions} sessions in {latency_ms:.1f} ms")
         
         # Redraw with filtered data
         self.display_data(use_filtered=True)
     
+    def apply_filters(self):
+        """Apply filters to data in a background job (a newer request cancels older ones)"""
+        self.live_filter.submit(self.get_filter_settings, self.compute_filtered_data,
+                                self.show_filtered_result, self.filter_status)
+    
     def clear_filters(self):
         """Clear all filters"""
+        # Незавершенная фильтрация больше не нужна
+        self.scheduler.cancel('filter')
         self.filtered_file_data = []
         
         # Reset filter values
@@ -1198,6 +1541,7 @@ class DMRDataViewer:
         self.selected_color_code.set("All")
         self.selected_algorithm.set("All")
         self.selected_key.set("All")
+        self.live_filter.cancel()
         
         # Update status
         self.filter_status.config(text="No filter applied", fg="#606060")
@@ -1214,6 +1558,13 @@ class DMRDataViewer:
         
         self.canvas.delete("all")
         
+        # Reset virtualized table state - data may have changed
+        self.table_layout = None
+        self.drawn_cells = {}
+        self.drawn_date_headers = set()
+        self.group_header_keys = {}
+        self.cell_height_cache = {}
+        
         # If use_filtered not specified, determine automatically
         if use_filtered is None:
             use_filtered = len(self.filtered_file_data) > 0
@@ -1334,137 +1685,232 @@ class DMRDataViewer:
         # Move to next row after headers
         current_y += base_cell_height + 10
         
-        all_dates_data = []
+        # Lay out date blocks and hour rows once - cells are drawn lazily
+        blocks = []
+        rows = []
         
         for date_str, hours_data in time_data.items():
-            # Find the actual range of hours with data
-            hours_with_data = set()
-            for hour in range(24):
-                for data in files_with_data:
-                    hour_sessions = hours_data.get(hour, {}).get(data['filename'], [])
-                    if hour_sessions:
-                        hours_with_data.add(hour)
+            # Hours that have sessions in any file
+            hours_with_data = sorted(hour for hour, files in hours_data.items() if any(files.values()))
             
             if not hours_with_data:
                 continue  # Skip dates with no data
             
-            # Calculate total height needed for this date
-            max_hour_height = 0
-            
-            # First pass: calculate heights for each hour with data
+            block_index = len(blocks)
+            first_row = len(rows)
             hour_heights = {}
-            for hour in sorted(hours_with_data):
-                hour_height = base_cell_height
-                
-                # Check if any cell in this hour has sessions
-                for data in files_with_data:
-                    hour_sessions = hours_data.get(hour, {}).get(data['filename'], [])
-                    if hour_sessions:
-                        cell_key = (date_str, hour, data['filename'])
-                        # Calculate height needed for content (always show groups)
-                        content_height = self.calculate_cell_content_height(hour_sessions, cell_key)
-                        hour_height = max(hour_height, content_height)
-                
-                hour_heights[hour] = hour_height
-                max_hour_height = max(max_hour_height, hour_height)
-            
-            # Calculate total height for this date (sum of actual hour heights)
-            date_height = sum(hour_heights[hour] for hour in hours_with_data)
+            hour_y = current_y
+            for hour in hours_with_data:
+                hour_heights[hour] = self.calculate_row_height(date_str, hour, hours_data, files_with_data, base_cell_height)
+                rows.append({'block': block_index, 'hour': hour, 'y': hour_y, 'height': hour_heights[hour]})
+                hour_y += hour_heights[hour]
             
-            # Store data for left headers
-            all_dates_data.append({
+            date_height = hour_y - current_y
+            blocks.append({
                 'date': date_str,
-                'height': date_height,
                 'hours': hours_with_data,
-                'hour_heights': hour_heights
+                'hour_heights': hour_heights,
+                'hours_data': hours_data,
+                'y': current_y,
+                'height': date_height,
+                'first_row': first_row
             })
             
-            # Draw date and hour headers on main canvas
-            hour_y = current_y
-            for hour in sorted(hours_with_data):
-                hour_height = hour_heights[hour]
-                
-                # Draw date header (only for first hour of each date)
-                if hour == min(hours_with_data):
-                    self.canvas.create_rectangle(
-                        start_x, current_y,
-                        start_x + date_column_width, current_y + date_height,
-                        outline="#000000", width=1, fill="#f0f0f0"
-                    )
-                    
-                    self.canvas.create_text(
-                        start_x + date_column_width // 2, current_y + date_height // 2,
-                        text=date_str,
-                        font=("Arial", 10, "bold"),
-                        fill="#000000"
-                    )
-                
-                # Draw hour header
-                self.canvas.create_rectangle(
-                    start_x + date_column_width, hour_y,
-                    start_x + date_column_width + hour_column_width, hour_y + hour_height,
-                    outline="#000000", width=1, fill="#f8f8f8"
-                )
-                
-                self.canvas.create_text(
-                    start_x + date_column_width + hour_column_width // 2, hour_y + hour_height // 2,
-                    text=f"{hour:02d}",
-                    font=("Arial", 9, "bold"),
-                    fill="#000000"
-                )
-                
-                # Draw data cells for this hour
-                cell_x = start_x + date_column_width + hour_column_width  # Start after date and hour columns
-                
-                for data in files_with_data:
-                    # Get sessions for this hour
-                    hour_sessions = hours_data.get(hour, {}).get(data['filename'], [])
-                    cell_key = (date_str, hour, data['filename'])
-                    
-                    # Determine cell color based on session count
-                    if hour_sessions:
-                        session_count = sum(len(group) for group in hour_sessions)
-                        if session_count > 10:
-                            fill_color = "#ffcccc"  # Light red for many sessions
-                        elif session_count > 5:
-                            fill_color = "#ffffcc"  # Light yellow for medium sessions
-                        else:
-                            fill_color = "#ccffcc"  # Light green for few sessions
-                    else:
-                        fill_color = "#ffffff"  # White for no sessions
-                    
-                    # Draw cell
-                    cell_rect = self.canvas.create_rectangle(
-                        cell_x, hour_y,
-                        cell_x + cell_width, hour_y + hour_height,
-                        outline="#cccccc", width=1, fill=fill_color,
-                        tags=f"cell_{date_str}_{hour}_{data['filename']}"
-                    )
-                    
-                    # Display content in cell
-                    if hour_sessions:
-                        self.draw_cell_content(cell_x, hour_y, cell_width, hour_height, 
-                                             hour_sessions, cell_key, True)
-                    
-                    cell_x += cell_width
-                
-                # Draw empty cells for empty files
-                for data in empty_files:
-                    self.canvas.create_rectangle(
-                        cell_x, hour_y,
-                        cell_x + cell_width, hour_y + hour_height,
-                        outline="#cccccc", width=1, fill="#f9f9f9"
-                    )
-                    cell_x += cell_width
-                
-                hour_y += hour_height
-            
             current_y += date_height + 10  # Add spacing between dates
         
+        self.table_layout = {
+            'files_with_data': files_with_data,
+            'empty_files': empty_files,
+            'blocks': blocks,
+            'block_index': {block['date']: idx for idx, block in enumerate(blocks)},
+            'rows': rows,
+            'row_tops': [row['y'] for row in rows],
+            'cell_width': cell_width,
+            'base_cell_height': base_cell_height,
+            'date_column_width': date_column_width,
+            'hour_column_width': hour_column_width,
+            'start_x': start_x,
+            'cells_x': start_x + date_column_width + hour_column_width,
+            'total_height': current_y + 20
+        }
+        
         # Update scroll region
         total_width = len(data_to_display) * cell_width + start_x + date_column_width + hour_column_width
-        total_height = current_y + 20
-        self.canvas.configure(scrollregion=(0, 0, total_width, total_height))
+        self.table_layout['total_width'] = total_width
+        self.canvas.configure(scrollregion=(0, 0, total_width, self.table_layout['total_height']))
+        
+        print(f"Table layout: {len(blocks)} dates, {len(rows)} hour rows")
+        self.render_visible_cells()
+    
+    def calculate_row_height(self, date_str, hour, hours_data, files_with_data, base_cell_height):
+        """Height of an hour row - tallest cell in the row"""
+        hour_height = base_cell_height
+        for data in files_with_data:
+            hour_sessions = hours_data.get(hour, {}).get(data['filename'], [])
+            if hour_sessions:
+                cell_key = (date_str, hour, data['filename'])
+                # Calculate height needed for content (always show groups)
+                hour_height = max(hour_height, self.calculate_cell_content_height(hour_sessions, cell_key))
+        return hour_height
+    
+    def schedule_table_render(self):
+        """Schedule drawing of cells that scrolled into view"""
+        if self.table_layout and not self.table_render_pending:
+            self.table_render_pending = True
+            self.root.after_idle(self.render_visible_cells)
+    
+    def render_visible_cells(self):
+        """Draw cells near the viewport and drop the ones far away"""
+        self.table_render_pending = False
+        layout = self.table_layout
+        if not layout or not layout['rows']:
+            return
+        
+        # Viewport plus one screen in every direction
+        view_top = self.canvas.canvasy(0)
+        view_height = max(self.canvas.winfo_height(), 1)
+        view_left = self.canvas.canvasx(0)
+        view_width = max(self.canvas.winfo_width(), 1)
+        keep_top = view_top - view_height
+        keep_bottom = view_top + 2 * view_height
+        keep_left = view_left - view_width
+        keep_right = view_left + 2 * view_width
+        
+        rows = layout['rows']
+        first_row = max(bisect.bisect_right(layout['row_tops'], keep_top) - 1, 0)
+        last_row = bisect.bisect_left(layout['row_tops'], keep_bottom)
+        
+        column_count = len(layout['files_with_data']) + len(layout['empty_files'])
+        first_col = max(int((keep_left - layout['cells_x']) // layout['cell_width']), 0)
+        last_col = min(int((keep_right - layout['cells_x']) // layout['cell_width']) + 1, column_count)
+        
+        # Column -1 is the hour header of the row
+        visible_cells = set()
+        visible_blocks = set()
+        for row_index in range(first_row, last_row):
+            visible_blocks.add(rows[row_index]['block'])
+            visible_cells.add((row_index, -1))
+            for col in range(first_col, last_col):
+                visible_cells.add((row_index, col))
+        
+        # Release cells that left the viewport
+        for cell in [cell for cell in self.drawn_cells if cell not in visible_cells]:
+            self.delete_table_cell(cell)
+        
+        for block_index in [idx for idx in self.drawn_date_headers if idx not in visible_blocks]:
+            self.canvas.delete(f"date_{block_index}")
+            self.drawn_date_headers.discard(block_index)
+        
+        # Draw cells that entered the viewport
+        for block_index in visible_blocks - self.drawn_date_headers:
+            self.draw_date_header(block_index)
+        
+        for cell in visible_cells:
+            if cell not in self.drawn_cells:
+                self.draw_table_cell(*cell)
+    
+    def draw_date_header(self, block_index):
+        """Draw date header spanning all hours of a date block"""
+        layout = self.table_layout
+        block = layout['blocks'][block_index]
+        start_x = layout['start_x']
+        date_column_width = layout['date_column_width']
+        tags = (f"block_{block_index}", f"date_{block_index}")
+        
+        self.canvas.create_rectangle(
+            start_x, block['y'],
+            start_x + date_column_width, block['y'] + block['height'],
+            outline="#000000", width=1, fill="#f0f0f0", tags=tags
+        )
+        
+        self.canvas.create_text(
+            start_x + date_column_width // 2, block['y'] + block['height'] // 2,
+            text=block['date'],
+            font=("Arial", 10, "bold"),
+            fill="#000000", tags=tags
+        )
+        
+        self.drawn_date_headers.add(block_index)
+    
+    def draw_table_cell(self, row_index, col):
+        """Draw one table cell (col -1 is the hour header)"""
+        layout = self.table_layout
+        row = layout['rows'][row_index]
+        block = layout['blocks'][row['block']]
+        hour = row['hour']
+        hour_y = row['y']
+        hour_height = row['height']
+        cell_width = layout['cell_width']
+        tags = (f"block_{row['block']}", f"vc_{row_index}_{col}")
+        
+        if col < 0:
+            # Draw hour header
+            hour_x = layout['start_x'] + layout['date_column_width']
+            hour_column_width = layout['hour_column_width']
+            self.canvas.create_rectangle(
+                hour_x, hour_y,
+                hour_x + hour_column_width, hour_y + hour_height,
+                outline="#000000", width=1, fill="#f8f8f8", tags=tags
+            )
+            
+            self.canvas.create_text(
+                hour_x + hour_column_width // 2, hour_y + hour_height // 2,
+                text=f"{hour:02d}",
+                font=("Arial", 9, "bold"),
+                fill="#000000", tags=tags
+            )
+        
+        elif col < len(layout['files_with_data']):
+            data = layout['files_with_data'][col]
+            cell_x = layout['cells_x'] + col * cell_width
+            
+            # Get sessions for this hour
+            hour_sessions = block['hours_data'].get(hour, {}).get(data['filename'], [])
+            cell_key = (block['date'], hour, data['filename'])
+            
+            # Determine cell color based on session count
+            if hour_sessions:
+                session_count = sum(len(group) for group in hour_sessions)
+                if session_count > 10:
+                    fill_color = "#ffcccc"  # Light red for many sessions
+                elif session_count > 5:
+                    fill_color = "#ffffcc"  # Light yellow for medium sessions
+                else:
+                    fill_color = "#ccffcc"  # Light green for few sessions
+            else:
+                fill_color = "#ffffff"  # White for no sessions
+            
+            # Draw cell
+            self.canvas.create_rectangle(
+                cell_x, hour_y,
+                cell_x + cell_width, hour_y + hour_height,
+                outline="#cccccc", width=1, fill=fill_color,
+                tags=tags + (f"cell_{block['date']}_{hour}_{data['filename']}",)
+            )
+            
+            # Display content in cell
+            if hour_sessions:
+                self.draw_cell_content(cell_x, hour_y, cell_width, hour_height, 
+                                     hour_sessions, cell_key, True, tags)
+        
+        else:
+            # Empty cell for empty files
+            cell_x = layout['cells_x'] + col * cell_width
+            self.canvas.create_rectangle(
+                cell_x, hour_y,
+                cell_x + cell_width, hour_y + hour_height,
+                outline="#cccccc", width=1, fill="#f9f9f9", tags=tags
+            )
+        
+        self.drawn_cells[(row_index, col)] = row['block']
+    
+    def delete_table_cell(self, cell):
+        """Remove canvas items of a drawn cell"""
+        tag = f"vc_{cell[0]}_{cell[1]}"
+        for item in self.canvas.find_withtag(tag):
+            self.group_header_keys.pop(item, None)
+        self.canvas.delete(tag)
+        del self.drawn_cells[cell]
     
     def create_time_based_data(self, files_with_data):
         """Create time-based data structure grouped by date and hour"""
@@ -1493,10 +1939,13 @@ class DMRDataViewer:
         return time_data
     
     def calculate_cell_content_height(self, hour_sessions, cell_key):
-        """Calculate height needed for cell content"""
+        """Calculate height needed for cell content (cached per cell)"""
         if not hour_sessions:
             return 30
         
+        if cell_key in self.cell_height_cache:
+            return self.cell_height_cache[cell_key]
+        
         line_height = 12
         padding = 10
         base_height = 30
@@ -1515,12 +1964,12 @@ class DMRDataViewer:
             group_key = (*cell_key, group_index)
             if group_key in self.expanded_groups:
                 # Show sessions in group
-                for session in group:
-                    total_height += line_height
+                total_height += line_height * len(group)
         
-        return max(base_height, total_height + padding)
+        self.cell_height_cache[cell_key] = max(base_height, total_height + padding)
+        return self.cell_height_cache[cell_key]
     
-    def draw_cell_content(self, x, y, width, height, hour_sessions, cell_key, is_expanded):
+    def draw_cell_content(self, x, y, width, height, hour_sessions, cell_key, is_expanded, tags=()):
         """Draw content inside cell"""
         if not hour_sessions:
             return
@@ -1550,26 +1999,16 @@ class DMRDataViewer:
             if len(group_header) > 25:
                 group_header = group_header[:22] + "..."
             
-            # Create a safe tag name (replace special characters)
-            safe_filename = filename.replace("/", "_").replace("\\", "_").replace(":", "_").replace(" ", "_")
-            safe_tag = f"group_header_{date_str}_{hour}_{safe_filename}_{group_index}"
-            
-            # Draw clickable group header
+            # Draw clickable group header (click handled by "group_header" tag binding)
             header_text = self.canvas.create_text(
                 x + padding, current_y,
                 text=group_header,
                 font=("Arial", 8, "bold"),
                 fill="#0000ff",
                 anchor="w",
-                tags=safe_tag
+                tags=tuple(tags) + ("group_header",)
             )
-            
-            # Add click event to group header
-            def on_group_click(event, key=group_key):
-                print(f"Group clicked: {key}")  # Debug info
-                self.toggle_group_collapse_in_cell(key)
-            
-            self.canvas.tag_bind(safe_tag, "<Button-1>", on_group_click)
+            self.group_header_keys[header_text] = group_key
             
             current_y += line_height
             
@@ -1608,7 +2047,8 @@ class DMRDataViewer:
                         text=session_line,
                         font=("Courier", 7),
                         fill="#000000",
-                        anchor="w"
+                        anchor="w",
+                        tags=tags
                     )
                     
                     current_y += line_height
@@ -1625,8 +2065,60 @@ class DMRDataViewer:
             self.expanded_groups.add(group_key)
             print(f"Group expanded: {group_key}")
         
-        # Redraw the table
-        self.display_data()
+        # Re-lay-out only the date block of this group
+        self.cell_height_cache.pop(group_key[:3], None)
+        self.relayout_date_block(group_key[0], group_key[1])
+    
+    def on_group_header_click(self, event):
+        """Group header clicked - toggle the group under the cursor"""
+        current = self.canvas.find_withtag("current")
+        if current and current[0] in self.group_header_keys:
+            key = self.group_header_keys[current[0]]
+            print(f"Group clicked: {key}")  # Debug info
+            self.toggle_group_collapse_in_cell(key)
+    
+    def relayout_date_block(self, date_str, hour):
+        """Update height of one hour row and shift everything below it"""
+        layout = self.table_layout
+        if not layout or date_str not in layout['block_index']:
+            self.display_data()
+            return
+        
+        block_index = layout['block_index'][date_str]
+        block = layout['blocks'][block_index]
+        
+        new_height = self.calculate_row_height(date_str, hour, block['hours_data'],
+                                               layout['files_with_data'], layout['base_cell_height'])
+        delta = new_height - block['hour_heights'][hour]
+        block['hour_heights'][hour] = new_height
+        block['height'] += delta
+        
+        # Shift rows of this block after the changed hour and all rows below
+        rows = layout['rows']
+        row_index = block['first_row'] + block['hours'].index(hour)
+        rows[row_index]['height'] = new_height
+        if delta:
+            for row in rows[row_index + 1:]:
+                row['y'] += delta
+            layout['row_tops'][row_index + 1:] = [row['y'] for row in rows[row_index + 1:]]
+            for later_block in layout['blocks'][block_index + 1:]:
+                later_block['y'] += delta
+            layout['total_height'] += delta
+            self.canvas.configure(scrollregion=(0, 0, layout['total_width'], layout['total_height']))
+        
+        # Drop drawn items of this block, move items of later blocks
+        for cell in [cell for cell, idx in self.drawn_cells.items() if idx == block_index]:
+            self.delete_table_cell(cell)
+        self.canvas.delete(f"date_{block_index}")
+        self.drawn_date_headers.discard(block_index)
+        
+        if delta:
+            later_blocks = {idx for idx in self.drawn_cells.values() if idx > block_index}
+            later_blocks.update(idx for idx in self.drawn_date_headers if idx > block_index)
+            for idx in later_blocks:
+                self.canvas.move(f"block_{idx}", 0, delta)
+        
+        self.render_visible_cells()
     
     def draw_fixed_frequency_headers(self, files_with_data, empty_files, cell_width, base_cell_height, start_x, date_column_width, hour_column_width):
         """Draw fixed frequency headers at the top"""
@@ -1793,6 +2285,7 @@ class DMRDataViewer:
     
     def refresh_all(self):
         """Refresh all data"""
+        self.scheduler.cancel('filter')
         self.load_all_data()
         self.filtered_file_data = []
         
@@ -1801,6 +2294,7 @@ class DMRDataViewer:
         
         # Update comboboxes
         self.update_comboboxes()
+        self.live_filter.cancel()
         
         self.filter_status.config(text="No filter applied", fg="#606060")
         self.display_data()
@@ -1816,19 +2310,263 @@ class DMRDataViewer:
             messagebox.showwarning("Invalid Gap", "Please enter a valid number for session gap")
             return
         
-        # Reload all data with new gap
-        self.load_all_data()
-        self.filtered_file_data = []
+        self.session_gap_slider_var.set(gap_value)
         
-        # Update date range from new data
-        self.set_date_range_from_data()
+        # Regroup sessions kept in memory - no need to re-read files
+        self.regroup_sessions(gap_value)
+    
+    def regroup_sessions(self, gap_value):
+        """Regroup sessions of all files for a new gap without reloading"""
+        for data in self.file_data:
+            data['sessions'] = self.group_sessions(data['all_sessions'], data['gap_index'], gap_value)
+            data['session_gap'] = gap_value
         
-        # Update comboboxes
-        self.update_comboboxes()
+        # Filtered view keeps its filter, only the group boundaries change
+        for data in self.filtered_file_data:
+            data['sessions'] = self.group_sessions(data['all_sessions'], data['gap_index'],
+                                                   gap_value, data['kept_indices'])
+            data['session_gap'] = gap_value
         
-        self.filter_status.config(text=f"Data reloaded with {gap_value}s gap", fg="#4CAF50")
+        # Group indices changed, so expanded state is no longer valid
+        self.expanded_groups.clear()
+        
+        total_groups = sum(self.count_groups(data['gap_index'], gap_value)
+                           for data in self.file_data if data['all_sessions'])
+        self.filter_status.config(text=f"{total_groups} groups at {gap_value}s gap", fg="#4CAF50")
         self.display_data()
     
+    def on_gap_slider(self, value):
+        """Gap slider moved - regroup on next idle (coalesces drag events)"""
+        self.session_gap_var.set(str(int(float(value))))
+        if not self.gap_regroup_pending:
+            self.gap_regroup_pending = True
+            self.root.after_idle(self.apply_gap_slider)
+    
+    def apply_gap_slider(self):
+        """Apply latest slider gap value"""
+        self.gap_regroup_pending = False
+        self.regroup_sessions(int(self.session_gap_var.get()))
+    
+    def open_overlap_window(self):
+        """Find sessions on different frequencies that overlap in time and share FROM or TO"""
+        if self.overlap_window is not None and self.overlap_window.winfo_exists():
+            self.overlap_window.lift()
+            return
+        
+        window = self.overlap_window = tk.Toplevel(self.root)
+        window.title("Cross-Frequency Overlaps")
+        window.geometry("900x500")
+        window.transient(self.root)
+        
+        control_frame = tk.Frame(window, bg="#f5f5f5")
+        control_frame.pack(fill=tk.X)
+        tk.Label(control_frame, text="Tolerance:", bg="#f5f5f5", font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 5), pady=8)
+        tk.Entry(control_frame, textvariable=self.overlap_tolerance_var, width=6).pack(side=tk.LEFT)
+        tk.Label(control_frame, text="sec", bg="#f5f5f5", font=("Arial", 9)).pack(side=tk.LEFT, padx=(2, 10))
+        tk.Button(control_frame, text="FIND", command=self.run_overlap_search,
+                 bg="#4CAF50", fg="white", font=("Arial", 9, "bold"),
+                 relief=tk.RAISED, bd=1).pack(side=tk.LEFT)
+        self.overlap_status = tk.Label(control_frame, text="Double-click a row to show the session in the table",
+                                      bg="#f5f5f5", fg="#606060", font=("Arial", 8))
+        self.overlap_status.pack(side=tk.LEFT, padx=10)
+        
+        table_frame = tk.Frame(window)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        columns = {
+            'match': ("Match", 70), 'id': ("ID", 140),
+            'freq_a': ("Frequency A", 110), 'time_a': ("Start A", 140),
+            'freq_b': ("Frequency B", 110), 'time_b': ("Start B", 140),
+            'overlap': ("Overlap, s", 80)
+        }
+        self.overlap_tree = ttk.Treeview(table_frame, columns=list(columns), show="headings")
+        for column, (heading, width) in columns.items():
+            self.overlap_tree.heading(column, text=heading)
+            self.overlap_tree.column(column, width=width, anchor="w")
+        
+        tree_scroll = tk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.overlap_tree.yview)
+        self.overlap_tree.configure(yscrollcommand=tree_scroll.set)
+        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.overlap_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.overlap_tree.bind("<Double-1>", self.on_overlap_double_click)
+        
+        self.run_overlap_search()
+    
+    def run_overlap_search(self):
+        """Search the files shown in the table in a background job"""
+        try:
+            tolerance = max(0.0, float(self.overlap_tolerance_var.get()))
+        except ValueError:
+            self.overlap_status.config(text="Invalid tolerance", fg="red")
+            return
+        
+        layout = self.table_layout
+        if not layout or not layout['files_with_data']:
+            self.overlap_status.config(text="No data to analyze", fg="orange")
+            return
+        
+        settings = {
+            'files': list(layout['files_with_data']),
+            'layout': layout,
+            'tolerance': tolerance,
+            'started': time.perf_counter()
+        }
+        self.overlap_status.config(text="Searching...", fg="#606060")
+        self.scheduler.submit(
+            'overlaps',
+            lambda token: self.find_overlapping_sessions(settings, token),
+            lambda result: self.show_overlaps(settings, result),
+            lambda error: self.overlap_status.config(text=f"Error: {error}", fg="red")
+        )
+    
+    def find_overlapping_sessions(self, settings, token=None):
+        """Sweep line over session intervals of all files: pairs on different files sharing FROM or TO
+        that overlap or are closer than the tolerance, O(n log n + pairs) (worker, no Tk calls)"""
+        tolerance = settings['tolerance']
+        epoch = datetime(1970, 1, 1)
+        
+        intervals = []
+        for file_idx, data in enumerate(settings['files']):
+            for group in data['sessions']:
+                for session in group:
+                    if session['timestamp']:
+                        start = (session['timestamp'] - epoch).total_seconds()
+                        end = (session['end_time'] - epoch).total_seconds() if session['end_time'] else start
+                        intervals.append((start, end, file_idx, session))
+        intervals.sort(key=lambda interval: interval[0])
+        
+        # Активные интервалы по каждому ID: куча по времени окончания, устаревшие снимаются с вершины
+        active = defaultdict(list)
+        pairs = {}  # (earlier interval, later interval) -> result row
+        results = []
+        truncated = False
+        
+        for idx, (start, end, file_idx, session) in enumerate(intervals):
+            if token and idx % 10000 == 0:
+                token.check()
+            
+            for role in ('from', 'to'):
+                value = session[role]
+                if not value:
+                    continue
+                
+                heap = active[(role, value)]
+                while heap and heap[0][0] + tolerance < start:
+                    heapq.heappop(heap)
+                
+                # Everything left started earlier and ends within the tolerance of this start
+                for other_end, other_idx in heap:
+                    other_start, _, other_file, other_session = intervals[other_idx]
+                    if other_file == file_idx:
+                        continue
+                    row = pairs.get((other_idx, idx))
+                    if row is not None:
+                        # Same pair matched by FROM before - both IDs are shared
+                        row['match'] = "FROM+TO"
+                        row['id'] = f"{session['from']}→{session['to']}"
+                        continue
+                    if len(results) >= OVERLAP_MAX_ROWS:
+                        truncated = True
+                        continue
+                    row = {
+                        'match': role.upper(),
+                        'id': value,
+                        'first': (other_file, other_session),
+                        'second': (file_idx, session),
+                        'overlap': min(end, other_end) - max(start, other_start)
+                    }
+                    pairs[(other_idx, idx)] = row
+                    results.append(row)
+                
+                heapq.heappush(heap, (end, idx))
+        
+        return results, len(intervals), truncated
+    
+    def show_overlaps(self, settings, result):
+        """Fill the overlap table (main thread)"""
+        results, total_sessions, truncated = result
+        latency_ms = (time.perf_counter() - settings['started']) * 1000
+        self.overlap_search = {'settings': settings, 'results': results}
+        print(f"Overlaps: {len(results)} pairs in {total_sessions} sessions, {latency_ms:.1f} ms")
+        
+        if self.overlap_window is None or not self.overlap_window.winfo_exists():
+            return
+        
+        self.overlap_tree.delete(*self.overlap_tree.get_children())
+        files = settings['files']
+        for row_idx, row in enumerate(results):
+            file_a, session_a = row['first']
+            file_b, session_b = row['second']
+            self.overlap_tree.insert("", tk.END, iid=str(row_idx), values=(
+                row['match'], row['id'],
+                files[file_a]['frequency'], self.format_output_timestamp(session_a['timestamp']),
+                files[file_b]['frequency'], self.format_output_timestamp(session_b['timestamp']),
+                f"{row['overlap']:.1f}"
+            ))
+        
+        status = f"{len(results)} pairs in {total_sessions} sessions · {latency_ms:.0f} ms"
+        if truncated:
+            status += f" (first {OVERLAP_MAX_ROWS} shown)"
+        self.overlap_status.config(text=status, fg="green" if results else "orange")
+    
+    def on_overlap_double_click(self, event):
+        """Show the session of the clicked side (A or B columns) in the table"""
+        row_id = self.overlap_tree.identify_row(event.y)
+        if not row_id or not self.overlap_search:
+            return
+        row = self.overlap_search['results'][int(row_id)]
+        column = self.overlap_tree.identify_column(event.x)
+        file_idx, session = row['second'] if column in ('#5', '#6') else row['first']
+        self.show_session_cell(self.overlap_search['settings'], file_idx, session)
+    
+    def show_session_cell(self, settings, file_idx, session):
+        """Scroll to the cell holding a session, expand its group and outline the cell"""
+        layout = self.table_layout
+        if layout is not settings['layout']:
+            self.overlap_status.config(text="Table changed - press FIND again", fg="orange")
+            return
+        
+        # Group of the session: groups are in time order, start times are built once per file
+        data = settings['files'][file_idx]
+        groups = data['sessions']
+        group_starts = settings.setdefault('group_starts', {})
+        if file_idx not in group_starts:
+            group_starts[file_idx] = [group[0]['timestamp'] or datetime.min for group in groups]
+        position = bisect.bisect_right(group_starts[file_idx], session['timestamp']) - 1
+        while position >= 0 and not any(item is session for item in groups[position]):
+            position -= 1
+        if position < 0:
+            return
+        group = groups[position]
+        
+        # Cell of the group: date and hour of its first session
+        date_str = group[0]['timestamp'].strftime("%Y-%m-%d")
+        hour = group[0]['timestamp'].hour
+        block = layout['blocks'][layout['block_index'][date_str]]
+        cell_groups = block['hours_data'][hour][data['filename']]
+        group_index = next(idx for idx, cell_group in enumerate(cell_groups) if cell_group is group)
+        group_key = (date_str, hour, data['filename'], group_index)
+        if group_key not in self.expanded_groups:
+            self.toggle_group_collapse_in_cell(group_key)
+        
+        row_index = block['first_row'] + block['hours'].index(hour)
+        row = layout['rows'][row_index]
+        col = next(idx for idx, file_data in enumerate(layout['files_with_data']) if file_data is data)
+        cell_x = layout['cells_x'] + col * layout['cell_width']
+        
+        self.canvas.xview_moveto(max(cell_x - layout['cells_x'], 0) / layout['total_width'])
+        self.canvas.yview_moveto(max(row['y'] - layout['base_cell_height'], 0) / layout['total_height'])
+        self.render_visible_cells()
+        
+        # Outline lives with the cell - dropped when the cell scrolls away
+        self.canvas.delete("overlap_mark")
+        self.canvas.create_rectangle(
+            cell_x, row['y'],
+            cell_x + layout['cell_width'], row['y'] + row['height'],
+            outline="#ff00ff", width=3,
+            tags=(f"block_{row['block']}", f"vc_{row_index}_{col}", "overlap_mark")
+        )
+    
     def open_file_selector(self):
         """Open file selection window"""
         # Store reference to selector window
@@ -2154,115 +2892,124 @@ class DMRDataViewer:
             # Create progress window
             progress_window = ProgressWindow(self.root, "Exporting to TXT")
             
-            # Start export in background thread
-            export_thread = threading.Thread(
-                target=self._export_to_text_files_thread,
-                args=(data_to_export, progress_window, output_dir),
-                daemon=True
+            # Start export in background job
+            self.scheduler.submit(
+                'export_txt',
+                lambda token: self._export_to_text_files_thread(data_to_export, progress_window, output_dir, token),
+                lambda exported_files: self.finish_text_export(progress_window, output_dir, exported_files),
+                lambda error: self.fail_export(progress_window, f"Error creating text files: {error}")
             )
-            export_thread.start()
             
         except Exception as e:
             messagebox.showerror("Export Error", f"Error starting TXT export: {e}")
     
-    def _export_to_text_files_thread(self, data_to_export, progress_window, output_dir):
-        """Export to text files in background thread"""
-        try:
-            os.makedirs(output_dir, exist_ok=True)
+    def _export_to_text_files_thread(self, data_to_export, progress_window, output_dir, token):
+        """Export to text files in background job (one worker process per frequency), returns exported file names"""
+        os.makedirs(output_dir, exist_ok=True)
+        
+        generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        sections = []
+        used_names = set()
+        for data in data_to_export:
+            groups = [group for group in data['sessions'] if group]
+            if not groups:
+                continue
             
-            exported_files = []
-            total_files = len(data_to_export)
-            files_processed = 0
+            # Each worker needs its own output files - several sources can share a
+            # frequency (every unparsed name is "Unknown"), so add the source name
+            frequency = data.get('frequency', 'unknown')
+            name = frequency
+            if name in used_names or frequency.lower() == 'unknown':
+                name = f"{frequency}_{os.path.splitext(data['filename'])[0]}"
+            base_name, suffix = name, 2
+            while name in used_names:
+                name = f"{base_name}_{suffix}"
+                suffix += 1
+            used_names.add(name)
+            
+            sections.append({
+                'filename': data['filename'],
+                'frequency': frequency,
+                'name': name,
+                'group_starts': [self.format_output_timestamp(group[0]['timestamp']) if group[0]['timestamp'] else "Unknown time"
+                                 for group in groups],
+                'groups': groups,
+            })
+        
+        results = {}
+        total_files = len(data_to_export)
+        files_processed = total_files - len(sections)  # Files without sessions are done already
+        
+        # Workers can't see ProgressWindow.cancelled, so it is forwarded through a shared event
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor() as pool:
+            cancel_event = manager.Event()
+            futures = {pool.submit(write_session_text_files, output_dir, section, generated, cancel_event): section
+                       for section in sections}
+            pending = set(futures)
             
-            # Export each file with data
-            for idx, data in enumerate(data_to_export):
-                files_processed += 1
-                
-                # Update progress with all required arguments
-                progress_window.update_progress(
-                    f"Processing: {data['filename']}",
-                    (idx + 1) / total_files,
-                    files_processed,
-                    total_files
-                )
-                
-                if not data['sessions']:
-                    continue
-                
-                # Create filename using frequency (e.g., 421-300-000.txt)
-                frequency = data.get('frequency', 'unknown')
-                output_filename = f"{frequency}.txt"
-                output_path = os.path.join(output_dir, output_filename)
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    # Write header
-                    f.write(f"File: {data['filename']}\n")
-                    f.write(f"Frequency: {data['frequency']}\n")
-                    f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("=" * 80 + "\n\n")
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    
+                    if progress_window.cancelled or token.cancelled:
+                        cancel_event.set()
+                        for future in pending:
+                            future.cancel()
                     
-                    # Write sessions
-                    for group in data['sessions']:
-                        if not group:
+                    for future in done:
+                        if future.cancelled():
                             continue
+                        results[future] = future.result()
+                        files_processed += 1
                         
-                        # Group header
-                        timestamp_str = self.format_output_timestamp(group[0]['timestamp']) if group[0]['timestamp'] else "Unknown time"
-                        group_header = f"{timestamp_str} (Sessions: {len(group)})"
-                        f.write(group_header + "\n")
-                        
-                        # Sessions in group
-                        for session in group:
-                            # Format session line
-                            line_parts = []
-                            
-                            if session['timeslot']:
-                                line_parts.append(session['timeslot'])
-                            
-                            if session['color_code']:
-                                line_parts.append(f"CC{session['color_code']}")
-                            
-                            if session['from'] and session['to']:
-                                line_parts.append(f"{session['from']} ─▶ {session['to']}")
-                            
-                            if session['has_duration']:
-                                line_parts.append(f"({session['duration_sec']:.1f}s)")
-                            else:
-                                line_parts.append("(0.0s)")
-                            
-                            if session['event']:
-                                line_parts.append(session['event'])
-                            
-                            if session['algorithm'] and session['algorithm'].strip():
-                                line_parts.append(f"Alg: {session['algorithm']}")
-                                if session['key'] and session['key'].strip():
-                                    line_parts.append(f"Key: {session['key']}")
-                            
-                            session_line = " ".join(line_parts)
-                            f.write(session_line + "\n")
-                        
-                        f.write("\n")  # Empty line between groups
-                
-                exported_files.append(output_filename)
-            
-            # Close progress window
-            progress_window.close()
-            
-            # Show success message with only first 3 files
-            if exported_files:
-                # Show maximum 3 files in the message
-                files_preview = "\n".join(exported_files[:3])
-                if len(exported_files) > 3:
-                    files_preview += f"\n... и ещё {len(exported_files) - 3} файлов"
-                
-                messagebox.showinfo("Export Complete", 
-                                  f"Exported {len(exported_files)} files to:\n{output_dir}\n\n{files_preview}")
-            else:
-                messagebox.showwarning("Export Warning", "No files with data to export")
-                
-        except Exception as e:
-            progress_window.close()
-            messagebox.showerror("Export Error", f"Error creating text files: {e}")
+                        # Update progress on the main thread
+                        self.scheduler.post(token, progress_window.update_progress,
+                                            futures[future]['filename'],
+                                            files_processed / total_files * 100,
+                                            files_processed,
+                                            total_files)
+            finally:
+                # Failed - stop the other workers too
+                cancel_event.set()
+                for future in pending:
+                    future.cancel()
+        
+        # Same order as the file list
+        return [name for future in futures if future in results for name in results[future]]
+
+    def finish_text_export(self, progress_window, output_dir, exported_files):
+        """Close progress and report TXT export result (main thread)"""
+        progress_window.close()
+        
+        if progress_window.cancelled:
+            messagebox.showinfo("Export Cancelled", "TXT export was cancelled.")
+        # Show success message with only first 3 files
+        elif exported_files:
+            # Show maximum 3 files in the message
+            files_preview = "\n".join(exported_files[:3])
+            if len(exported_files) > 3:
+                files_preview += f"\n... и ещё {len(exported_files) - 3} файлов"
+            
+            messagebox.showinfo("Export Complete", 
+                              f"Exported {len(exported_files)} files to:\n{output_dir}\n\n{files_preview}")
+        else:
+            messagebox.showwarning("Export Warning", "No files with data to export")
+    
+    def finish_file_export(self, progress_window, kind, file_path):
+        """Close progress and report single-file export result (main thread)"""
+        progress_window.close()
+        if progress_window.cancelled:
+            messagebox.showinfo("Export Cancelled", f"{kind} export was cancelled.")
+        elif kind == "PDF":
+            messagebox.showinfo("Export Complete", f"PDF report saved to:\n{os.path.basename(file_path)}")
+        else:
+            messagebox.showinfo("Export Complete", 
+                              f"Exported to {kind} file:\n{os.path.basename(file_path)}")
+    
+    def fail_export(self, progress_window, message):
+        """Close progress and show export error (main thread)"""
+        progress_window.close()
+        messagebox.showerror("Export Error", message)
 
     def export_to_excel(self):
         """Export current view to Excel file with progress window"""
@@ -2309,160 +3056,174 @@ class DMRDataViewer:
             # Create progress window
             progress_window = ProgressWindow(self.root, "Exporting to Excel")
             
-            # Start export in background thread
-            export_thread = threading.Thread(
-                target=self._export_to_excel_thread,
-                args=(data_to_export, progress_window, file_path),
-                daemon=True
+            # Start export in background job
+            self.scheduler.submit(
+                'export_excel',
+                lambda token: self._export_to_excel_thread(data_to_export, progress_window, file_path, token),
+                lambda result: self.finish_file_export(progress_window, "Excel", file_path),
+                lambda error: self.fail_export(progress_window, f"Error creating Excel file: {error}")
             )
-            export_thread.start()
             
         except Exception as e:
             messagebox.showerror("Export Error", f"Error starting Excel export: {e}")
     
-    def _export_to_excel_thread(self, data_to_export, progress_window, file_path):
-        """Export to Excel in background thread"""
-        try:
-            import openpyxl
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            from openpyxl.utils import get_column_letter
-            
-            # Create workbook and worksheet
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "DMR Sessions"
-            
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
+    def _export_to_excel_thread(self, data_to_export, progress_window, file_path, token):
+        """Export to Excel in background job: write-only workbook, rows appended in batches"""
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+        from openpyxl.utils import get_column_letter
+        from openpyxl.worksheet.dimensions import RowDimension
+        from openpyxl.worksheet.properties import Outline
+        
+        # Rows are streamed to the file as they are appended
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("DMR Sessions")
+        
+        # Shared named styles instead of per-cell Font/Border objects
+        border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        wb.add_named_style(NamedStyle(
+            name="dmr_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=border
+        ))
+        wb.add_named_style(NamedStyle(
+            name="dmr_group",
+            font=Font(bold=True, size=12),
+            fill=PatternFill(start_color="E8F4FD", end_color="E8F4FD", fill_type="solid"),
+            border=border
+        ))
+        wb.add_named_style(NamedStyle(name="dmr_session", border=border))
+        
+        # Set column widths (written before the first row)
+        column_widths = [20, 15, 20, 10, 12, 12, 12, 12, 20, 15, 15]
+        for col, width in enumerate(column_widths, 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        
+        # Group header rows stay at outline level 0, their sessions fold under them
+        ws.sheet_properties.outlinePr = Outline(summaryBelow=False)
+        ws.sheet_format.outlineLevelRow = 1
+        session_dimension = RowDimension(ws, outlineLevel=1)
+        
+        def styled_cells(style, count):
+            cells = [WriteOnlyCell(ws) for _ in range(count)]
+            for cell in cells:
+                cell.style = style
+            return cells
+        
+        # Set column headers
+        headers = ["File", "Frequency", "Date/Time", "Timeslot", "Color Code", 
+                  "From", "To", "Duration (s)", "Event", "Algorithm", "Key"]
+        header_cells = styled_cells("dmr_header", len(headers))
+        for cell, header in zip(header_cells, headers):
+            cell.value = header
+        ws.append(header_cells)
+        
+        # Styled cells are reused row after row: append writes them out immediately
+        group_cell = styled_cells("dmr_group", 1)[0]
+        session_cells = styled_cells("dmr_session", len(headers))
+        
+        # Calculate total sessions for progress
+        total_sessions = sum(sum(len(group) for group in data['sessions']) for data in data_to_export)
+        processed_sessions = 0
+        files_processed = 0
+        row = 2
+        
+        def write_batch(batch):
+            """Append buffered rows; session rows get the outline level"""
+            nonlocal row
+            for is_session, values in batch:
+                if values is None:
+                    ws.append([])  # Empty row after group
+                elif is_session:
+                    for cell, value in zip(session_cells, values):
+                        cell.value = value
+                    ws.row_dimensions[row] = session_dimension
+                    ws.append(session_cells)
+                    del ws.row_dimensions[row]
+                else:
+                    group_cell.value = values
+                    ws.append([group_cell])
+                row += 1
+        
+        # Fill data
+        for data_idx, data in enumerate(data_to_export):
+            if progress_window.cancelled:
+                break
+            
+            # Update progress - current file
+            self.scheduler.post(token, progress_window.update_progress,
+                data['filename'], 
+                0, 
+                files_processed, 
+                len(data_to_export)
             )
             
-            # Set column headers
-            headers = ["File", "Frequency", "Date/Time", "Timeslot", "Color Code", 
-                      "From", "To", "Duration (s)", "Event", "Algorithm", "Key"]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # Set column widths
-            column_widths = [20, 15, 20, 10, 12, 12, 12, 12, 20, 15, 15]
-            for col, width in enumerate(column_widths, 1):
-                ws.column_dimensions[get_column_letter(col)].width = width
-            
-            # Calculate total sessions for progress
-            total_sessions = sum(sum(len(group) for group in data['sessions']) for data in data_to_export)
-            processed_sessions = 0
-            files_processed = 0
-            
-            # Fill data
-            row = 2
-            for data_idx, data in enumerate(data_to_export):
+            batch = []
+            for group in data['sessions']:
                 if progress_window.cancelled:
                     break
                 
-                # Update progress - current file
-                progress_window.update_progress(
-                    data['filename'], 
-                    0, 
-                    files_processed, 
-                    len(data_to_export)
-                )
-                
-                if not data['sessions']:
-                    files_processed += 1
+                if not group:
                     continue
                 
-                for group in data['sessions']:
-                    if progress_window.cancelled:
-                        break
-                    
-                    if not group:
-                        continue
-                    
-                    # Group header row
-                    timestamp_str = self.format_output_timestamp(group[0]['timestamp']) if group[0]['timestamp'] else "Unknown time"
-                    group_header = f"{timestamp_str} (Sessions: {len(group)})"
-                    
-                    # Merge cells for group header
-                    ws.merge_cells(f'A{row}:K{row}')
-                    group_cell = ws.cell(row=row, column=1, value=group_header)
-                    group_cell.font = Font(bold=True, size=12)
-                    group_cell.fill = PatternFill(start_color="E8F4FD", end_color="E8F4FD", fill_type="solid")
-                    group_cell.border = border
-                    row += 1
-                    
-                    # Individual sessions
-                    for session in group:
-                        if progress_window.cancelled:
-                            break
-                        
-                        ws.cell(row=row, column=1, value=data['filename']).border = border
-                        ws.cell(row=row, column=2, value=data['frequency']).border = border
-                        ws.cell(row=row, column=3, value=timestamp_str).border = border
-                        ws.cell(row=row, column=4, value=session.get('timeslot', '')).border = border
-                        ws.cell(row=row, column=5, value=session.get('color_code', '')).border = border
-                        ws.cell(row=row, column=6, value=session.get('from', '')).border = border
-                        ws.cell(row=row, column=7, value=session.get('to', '')).border = border
-                        duration = session.get('duration_sec', 0) if session.get('has_duration', False) else 0
-                        ws.cell(row=row, column=8, value=f"{duration:.1f}").border = border
-                        ws.cell(row=row, column=9, value=session.get('event', '')).border = border
-                        ws.cell(row=row, column=10, value=session.get('algorithm', '')).border = border
-                        ws.cell(row=row, column=11, value=session.get('key', '')).border = border
-                        row += 1
-                        
-                        processed_sessions += 1
-                        
-                        # Update progress every 10 sessions
-                        if processed_sessions % 10 == 0:
-                            progress = (processed_sessions / total_sessions) * 100
-                            progress_window.update_progress(
-                                data['filename'], 
-                                progress, 
-                                files_processed, 
-                                len(data_to_export)
-                            )
-                    
-                    # Empty row after group
-                    row += 1
+                # Group header row
+                timestamp_str = self.format_output_timestamp(group[0]['timestamp']) if group[0]['timestamp'] else "Unknown time"
+                batch.append((False, f"{timestamp_str} (Sessions: {len(group)})"))
                 
-                files_processed += 1
+                # Individual sessions
+                for session in group:
+                    duration = session.get('duration_sec', 0) if session.get('has_duration', False) else 0
+                    batch.append((True, (
+                        data['filename'],
+                        data['frequency'],
+                        timestamp_str,
+                        session.get('timeslot', ''),
+                        session.get('color_code', ''),
+                        session.get('from', ''),
+                        session.get('to', ''),
+                        f"{duration:.1f}",
+                        session.get('event', ''),
+                        session.get('algorithm', ''),
+                        session.get('key', ''),
+                    )))
+                processed_sessions += len(group)
+                batch.append((False, None))
                 
-                # Update progress after each file
-                progress = (files_processed / len(data_to_export)) * 100
-                progress_window.update_progress(
-                    data['filename'], 
-                    progress, 
-                    files_processed, 
-                    len(data_to_export)
-                )
+                # Write and report progress once per batch
+                if len(batch) >= EXCEL_BATCH_ROWS:
+                    write_batch(batch)
+                    batch = []
+                    token.check()
+                    self.scheduler.post(token, progress_window.update_progress,
+                        data['filename'], 
+                        (processed_sessions / total_sessions) * 100, 
+                        files_processed, 
+                        len(data_to_export)
+                    )
             
-            if not progress_window.cancelled:
-                # Save file
-                wb.save(file_path)
-                
-                # Close progress window and show success
-                progress_window.close()
-                messagebox.showinfo("Export Complete", 
-                                  f"Exported to Excel file:\n{os.path.basename(file_path)}")
-            else:
-                # Export was cancelled
-                progress_window.close()
-                messagebox.showinfo("Export Cancelled", "Excel export was cancelled.")
+            write_batch(batch)
+            files_processed += 1
             
-        except Exception as e:
-            progress_window.close()
-            messagebox.showerror("Export Error", f"Error creating Excel file: {e}")
+            # Update progress after each file
+            progress = (files_processed / len(data_to_export)) * 100
+            self.scheduler.post(token, progress_window.update_progress,
+                data['filename'], 
+                progress, 
+                files_processed, 
+                len(data_to_export)
+            )
+        
+        if not progress_window.cancelled:
+            # Save file
+            wb.save(file_path)
 
     def export_to_pdf(self):
         """Export current view to PDF file with progress window"""
@@ -2494,170 +3255,96 @@ class DMRDataViewer:
             # Create progress window
             progress_window = ProgressWindow(self.root, "Exporting to PDF")
             
-            # Start export in background thread
-            export_thread = threading.Thread(
-                target=self._export_to_pdf_thread,
-                args=(data_to_export, progress_window, file_path),
-                daemon=True
+            # Start export in background job
+            self.scheduler.submit(
+                'export_pdf',
+                lambda token: self._export_to_pdf_thread(data_to_export, progress_window, file_path, token),
+                lambda result: self.finish_file_export(progress_window, "PDF", file_path),
+                lambda error: self.fail_export(progress_window, f"Error creating PDF: {error}")
             )
-            export_thread.start()
             
         except Exception as e:
             messagebox.showerror("Export Error", f"Error starting PDF export: {e}")
     
-    def _export_to_pdf_thread(self, data_to_export, progress_window, file_path):
-        """Export to PDF in background thread"""
-        try:
-            # Import ReportLab components
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.units import inch
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                file_path,
-                pagesize=A4,
-                rightMargin=50,
-                leftMargin=50,
-                topMargin=50,
-                bottomMargin=30,
-            )
-            
-            elements = []
+    def _export_to_pdf_thread(self, data_to_export, progress_window, file_path, token):
+        """Export to PDF in background job: one section per file, rendered in worker processes"""
+        sections = []
+        
+        # Session lines are formatted here, layout is left to the workers
+        for files_processed, data in enumerate(data_to_export):
+            if progress_window.cancelled:
+                return
+            token.check()
             
-            # Title
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Title'],
-                fontSize=16,
-                spaceAfter=30,
-                textColor=colors.HexColor('#000080')
+            self.scheduler.post(token, progress_window.update_progress,
+                data['filename'], 
+                0, 
+                files_processed, 
+                len(data_to_export)
             )
             
-            title = Paragraph("DMR Data Report", title_style)
-            elements.append(title)
-            
-            date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            subtitle = Paragraph(f"Generated: {date_str}", styles['Normal'])
-            elements.append(subtitle)
-            elements.append(Spacer(1, 0.2*inch))
-            
-            # Calculate total sessions for progress
-            total_sessions = sum(sum(len(group) for group in data['sessions']) for data in data_to_export)
-            processed_sessions = 0
-            files_processed = 0
-            
-            # Export files with data
-            for data_idx, data in enumerate(data_to_export):
-                if progress_window.cancelled:
-                    break
-                
-                # Update progress - current file
-                progress_window.update_progress(
-                    data['filename'], 
-                    0, 
-                    files_processed, 
-                    len(data_to_export)
-                )
-                
-                if not data['sessions']:
-                    files_processed += 1
-                    continue
-                    
+            if data['sessions']:
+                sections.append(self.get_pdf_section(data))
+        
+        styles = get_pdf_styles()
+        title_elements = build_pdf_title(styles, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        
+        if not PYPDF_AVAILABLE:
+            # Один документ в текущем потоке
+            elements = title_elements
+            for section in sections:
                 elements.append(PageBreak())
-                elements.append(Paragraph(f"File: {data['filename']}", styles['Heading2']))
-                elements.append(Paragraph(f"Frequency: {data['frequency']}", styles['Normal']))
-                elements.append(Spacer(1, 0.1*inch))
-                
-                # Export sessions
-                for group in data['sessions']:
-                    if progress_window.cancelled:
-                        break
-                    
-                    if not group:
-                        continue
-                    
-                    # Group header
-                    timestamp_str = self.format_output_timestamp(group[0]['timestamp']) if group[0]['timestamp'] else "Unknown time"
-                    group_header = f"{timestamp_str} (Sessions: {len(group)})"
-                    elements.append(Paragraph(group_header, styles['Heading3']))
-                    
-                    # Sessions in group
-                    for session in group:
+                elements.extend(build_pdf_section(section, styles))
+            if not progress_window.cancelled:
+                create_pdf_document(file_path).build(elements)
+            return
+        
+        # Временные части рядом с итоговым файлом
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(file_path))) as temp_dir:
+            title_path = os.path.join(temp_dir, "title.pdf")
+            part_paths = [os.path.join(temp_dir, f"section_{idx:04d}.pdf") for idx in range(len(sections))]
+            
+            with ProcessPoolExecutor() as pool:
+                futures = {pool.submit(render_pdf_section, path, section): section
+                           for path, section in zip(part_paths, sections)}
+                try:
+                    create_pdf_document(title_path).build(title_elements)
+                    for done, future in enumerate(as_completed(futures), 1):
+                        future.result()
                         if progress_window.cancelled:
-                            break
-                        
-                        # Format session line
-                        line_parts = []
-                        
-                        if session['timeslot']:
-                            line_parts.append(session['timeslot'])
-                        
-                        if session['color_code']:
-                            line_parts.append(f"CC{session['color_code']}")
+                            return
+                        token.check()
                         
-                        if session['from'] and session['to']:
-                            line_parts.append(f"{session['from']} --> {session['to']}")
-                        
-                        if session['has_duration']:
-                            line_parts.append(f"({session['duration_sec']:.1f}s)")
-                        else:
-                            line_parts.append("(0.0s)")
-                        
-                        if session['event']:
-                            line_parts.append(session['event'])
-                        
-                        if session['algorithm'] and session['algorithm'].strip():
-                            line_parts.append(f"Alg: {session['algorithm']}")
-                            if session['key'] and session['key'].strip():
-                                line_parts.append(f"Key: {session['key']}")
-                        
-                        session_line = " ".join(line_parts)
-                        elements.append(Paragraph(session_line, styles['Normal']))
-                        
-                        processed_sessions += 1
-                        
-                        # Update progress every 10 sessions
-                        if processed_sessions % 10 == 0:
-                            progress = (processed_sessions / total_sessions) * 100
-                            progress_window.update_progress(
-                                data['filename'], 
-                                progress, 
-                                files_processed, 
-                                len(data_to_export)
-                            )
-                    
-                    elements.append(Spacer(1, 0.1*inch))
-                
-                files_processed += 1
-                
-                # Update progress after each file
-                progress = (files_processed / len(data_to_export)) * 100
-                progress_window.update_progress(
-                    data['filename'], 
-                    progress, 
-                    files_processed, 
-                    len(data_to_export)
-                )
+                        self.scheduler.post(token, progress_window.update_progress,
+                            futures[future]['filename'], 
+                            done / len(sections) * 100, 
+                            done, 
+                            len(sections)
+                        )
+                finally:
+                    # Cancelled or failed - don't start the remaining sections
+                    for future in futures:
+                        future.cancel()
+            
+            merge_pdf_files(file_path, [title_path] + part_paths)
+    
+    def get_pdf_section(self, data):
+        """Group headers and formatted session lines of one file for build_pdf_section"""
+        groups = []
+        for group in data['sessions']:
+            if not group:
+                continue
             
-            if not progress_window.cancelled:
-                # Build PDF
-                doc.build(elements)
-                
-                # Close progress window and show success
-                progress_window.close()
-                messagebox.showinfo("Export Complete", f"PDF report saved to:\n{os.path.basename(file_path)}")
-            else:
-                # Export was cancelled
-                progress_window.close()
-                messagebox.showinfo("Export Cancelled", "PDF export was cancelled.")
+            timestamp_str = self.format_output_timestamp(group[0]['timestamp']) if group[0]['timestamp'] else "Unknown time"
+            lines = [format_session_line(session, "-->") for session in group]
             
-        except Exception as e:
-            progress_window.close()
-            messagebox.showerror("Export Error", f"Error creating PDF: {e}")
+            groups.append((f"{timestamp_str} (Sessions: {len(group)})", lines))
+        
+        return {
+            'filename': data['filename'],
+            'frequency': data['frequency'],
+            'groups': groups,
+        }
 
 
 def main():
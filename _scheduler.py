@@ -0,0 +1,199 @@
+"""
+BACKGROUND SCHEDULER - фоновые задачи для окон просмотра
+Вычисления идут в рабочем потоке, результаты и отрисовка - только в главном потоке Tk
+"""
+
+import queue
+import threading
+import time
+import tkinter as tk
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was superseded or cancelled"""
+
+
+class JobToken:
+    """Generation token of one submitted job"""
+    def __init__(self, scheduler, channel, generation):
+        self.scheduler = scheduler
+        self.channel = channel
+        self.generation = generation
+
+    @property
+    def cancelled(self):
+        """True once a newer job was submitted on the channel or it was cancelled"""
+        return self.scheduler.generations.get(self.channel) != self.generation
+
+    def check(self):
+        """Stop the worker if this job is stale"""
+        if self.cancelled:
+            raise JobCancelled()
+
+
+class BackgroundScheduler:
+    """Runs compute in worker threads and delivers results via a queue polled with root.after"""
+    def __init__(self, root, poll_ms=30, slice_ms=15):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.slice_ms = slice_ms
+
+        self.results = queue.Queue()
+        self.generations = {}  # channel -> generation of the latest job
+        self.running = 0  # Workers still computing
+        self.polling = False
+        self.chunk_jobs = {}  # channel -> after id of time-sliced main thread work
+
+    def submit(self, channel, compute, on_done, on_error=None):
+        """Run compute(token) in a worker; on_done(result) is called on the main thread if still current"""
+        token = self.new_token(channel)
+
+        def worker():
+            try:
+                result = compute(token)
+                self.results.put((token, on_done, (result,)))
+            except JobCancelled:
+                print(f"Job '{channel}' #{token.generation} cancelled")
+            except Exception as e:
+                print(f"Job '{channel}' failed: {e}")
+                if on_error:
+                    self.results.put((token, on_error, (e,)))
+            finally:
+                self.results.put((None, self.worker_finished, ()))
+
+        self.running += 1
+        threading.Thread(target=worker, daemon=True).start()
+        self.start_polling()
+        return token
+
+    def new_token(self, channel):
+        """Start a new generation on a channel, superseding older jobs"""
+        generation = self.generations.get(channel, 0) + 1
+        self.generations[channel] = generation
+        self.cancel_chunks(channel)
+        return JobToken(self, channel, generation)
+
+    def cancel(self, channel):
+        """Cancel the running job and pending chunks of a channel"""
+        self.new_token(channel)
+
+    def post(self, token, callback, *args):
+        """Call callback(*args) on the main thread (safe to use from workers)"""
+        self.results.put((token, callback, args))
+
+    def worker_finished(self):
+        self.running -= 1
+
+    def start_polling(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self.poll)
+
+    def poll(self):
+        """Deliver queued results of current jobs on the main thread"""
+        while True:
+            try:
+                token, callback, args = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            # Results of superseded jobs are dropped
+            if token is not None and token.cancelled:
+                continue
+
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Scheduler callback error: {e}")
+
+        if self.running > 0:
+            self.root.after(self.poll_ms, self.poll)
+        else:
+            self.polling = False
+
+    def run_chunks(self, channel, items, step, on_finish=None):
+        """Call step(item) on the main thread in time slices; a new run on the channel cancels it"""
+        token = self.new_token(channel)
+        iterator = iter(items)
+
+        def run_slice():
+            self.chunk_jobs.pop(channel, None)
+            deadline = time.perf_counter() + self.slice_ms / 1000
+            for item in iterator:
+                step(item)
+                if time.perf_counter() > deadline:
+                    if not token.cancelled:
+                        self.chunk_jobs[channel] = self.root.after(1, run_slice)
+                    return
+            if on_finish:
+                on_finish()
+
+        # First slice runs right away so small jobs finish synchronously
+        run_slice()
+        return token
+
+    def cancel_chunks(self, channel):
+        after_id = self.chunk_jobs.pop(channel, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+
+
+class LiveFilter:
+    """Live filtering of a viewer: watched filter variables re-run the filter after a short pause"""
+    def __init__(self, root, scheduler, run, delay_ms=150, can_run=None, channel='filter'):
+        self.root = root
+        self.scheduler = scheduler
+        self.run = run
+        self.delay_ms = delay_ms
+        self.can_run = can_run  # e.g. "data is loaded"
+        self.channel = channel
+
+        self.enabled = tk.BooleanVar(master=root, value=False)
+        self.job = None
+
+    def watch(self, *variables):
+        """Re-run the filter when any of these Tk variables changes"""
+        for var in variables:
+            var.trace_add('write', self.on_change)
+
+    def on_change(self, *args):
+        """Debounce filter widget changes in live mode"""
+        if not self.enabled.get() or (self.can_run and not self.can_run()):
+            return
+        self.cancel()
+        self.job = self.root.after(self.delay_ms, self.run_pending)
+
+    def on_toggle(self):
+        """Filter right away when live mode is switched on"""
+        if self.enabled.get():
+            self.on_change()
+        else:
+            self.cancel()
+
+    def run_pending(self):
+        """Debounce timer fired - run the filter"""
+        self.job = None
+        self.run()
+
+    def cancel(self):
+        """Drop a pending live run (an explicit filter run or reset supersedes it)"""
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def submit(self, get_settings, compute, show, status_label):
+        """Filter with a settings snapshot in a background job (a newer request cancels older ones)"""
+        self.cancel()
+        settings = get_settings()
+        if settings is None:
+            status_label.config(text="Invalid date format", fg="red")
+            return
+
+        settings['started'] = time.perf_counter()
+        status_label.config(text="Filtering...", fg="#606060")
+        self.scheduler.submit(
+            self.channel,
+            lambda token: compute(settings, token),
+            lambda result: show(settings, result),
+            lambda error: status_label.config(text="Error applying filters", fg="red")
+        )